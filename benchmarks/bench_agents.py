@@ -0,0 +1,43 @@
+"""Benchmarks for agents."""
+
+import numpy
+
+from coopihc import Bundle
+from coopihc.interactiontask.ClassicControlTask import ClassicControlTask
+from coopihc.agents.lqrcontrollers.IHCT_LQGController import IHCT_LQGController
+
+
+def bench_ihct_lqg_finit(benchmark):
+    # Same model as in coopihc/examples/simple_examples/lqg_example.py
+    I, b, ta, te = 0.25, 0.2, 0.03, 0.04
+    a1 = b / (ta * te * I)
+    a2 = 1 / (ta * te) + (1 / ta + 1 / te) * b / I
+    a3 = b / I + 1 / ta + 1 / te
+    bu = 1 / (ta * te * I)
+    timestep = 0.01
+
+    Ac = numpy.array([[0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1], [0, -a1, -a2, -a3]])
+    Bc = numpy.array([[0, 0, 0, bu]]).reshape((-1, 1))
+    F = numpy.diag([0, 0, 0, 0.001])
+    G = 0.03 * numpy.diag([1, 1, 0, 0])
+    C = numpy.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 0]])
+    H = numpy.array(0.08)
+    D = numpy.array([[0.01, 0, 0, 0], [0, 0.01, 0, 0], [0, 0, 0.05, 0], [0, 0, 0, 0]])
+    Q = numpy.diag([1, 0.01, 0, 0])
+    R = numpy.array([[1e-3]])
+    U = numpy.diag([1, 0.1, 0.01, 0])
+
+    task = ClassicControlTask(
+        timestep,
+        Ac,
+        Bc,
+        F=F,
+        G=G,
+        H=H,
+        discrete_dynamics=False,
+        noise="off",
+        timespace="continuous",
+    )
+    user = IHCT_LQGController("user", timestep, Q, R, U, C, D, noise="on")
+    Bundle(task=task, user=user)
+    benchmark(user.finit)
@@ -0,0 +1,52 @@
+"""Benchmarks for bundles and their wrappers."""
+
+import pytest
+
+from coopihc import Bundle, State, BasePolicy, discrete_array_element
+from coopihc.examples.simplepointing.envs import SimplePointingTask
+from coopihc.examples.simplepointing.users import CarefulPointer
+from coopihc.examples.simplepointing.assistants import ConstantCDGain
+
+
+def make_pointing_bundle():
+    bundle = Bundle(
+        task=SimplePointingTask(gridsize=31, number_of_targets=8),
+        user=CarefulPointer(error_rate=0.05),
+        assistant=ConstantCDGain(1),
+        seed=0,
+    )
+    return (bundle,), {}
+
+
+def bench_pointing_episode(benchmark):
+    # A new bundle with the same seed for each round, so that the same episode is played every time. The task ends after at most 100 rounds.
+    benchmark.pedantic(
+        lambda bundle: bundle.rollout(101),
+        setup=make_pointing_bundle,
+        rounds=50,
+    )
+
+
+def bench_traingym_step(benchmark):
+    gym = pytest.importorskip("gym")
+    from coopihc.bundle.wrappers.Train import TrainGym
+
+    action_state = State()
+    action_state["action"] = discrete_array_element(low=-5, high=5)
+    user = CarefulPointer(override_policy=(BasePolicy, {"action_state": action_state}))
+    bundle = Bundle(
+        task=SimplePointingTask(gridsize=31, number_of_targets=8),
+        user=user,
+        assistant=ConstantCDGain(1),
+        reset_go_to=1,
+        seed=0,
+    )
+    env = TrainGym(bundle, train_user=True, train_assistant=False)
+    env.reset()
+
+    def _step():
+        obs, reward, is_done, info = env.step({"user_action": 0})
+        if is_done:
+            env.reset()
+
+    benchmark(_step)
@@ -0,0 +1,61 @@
+"""Benchmarks for inference engines."""
+
+import numpy
+
+from coopihc.inference.GoalInferenceWithUserPolicyGiven import (
+    GoalInferenceWithUserPolicyGiven,
+)
+from coopihc.policy.ELLDiscretePolicy import ELLDiscretePolicy
+from coopihc.base.State import State
+from coopihc.base.elements import discrete_array_element, array_element
+
+N = 31
+
+
+def compute_likelihood(self, action, observation, error_rate=0.05):
+    # user moves towards the goal, with some errors
+    position = observation["task_state"]["position"].tolist()
+    if action.squeeze().tolist() == -position:
+        return 1 - error_rate
+    return error_rate
+
+
+def make_engine(**kwargs):
+    action_state = State()
+    action_state["action"] = discrete_array_element(init=0, low=-N, high=N)
+    user_policy = ELLDiscretePolicy(action_state=action_state)
+    user_policy.attach_likelihood_function(compute_likelihood)
+
+    inference_engine = GoalInferenceWithUserPolicyGiven(
+        user_policy_model=user_policy, **kwargs
+    )
+    inference_engine.attach_set_theta(
+        [
+            {("task_state", "position"): discrete_array_element(init=t, low=-N, high=N)}
+            for t in range(-N, N + 1)
+        ]
+    )
+
+    assistant_state = State()
+    assistant_state["beliefs"] = array_element(
+        init=numpy.full((2 * N + 1,), 1 / (2 * N + 1)),
+        low=numpy.zeros((2 * N + 1,)),
+        high=numpy.ones((2 * N + 1,)),
+        out_of_bounds_mode="silent",
+    )
+    user_action = State()
+    user_action["action"] = discrete_array_element(init=1, low=-N, high=N)
+    observation = State(
+        **{"assistant_state": assistant_state, "user_action": user_action}
+    )
+    inference_engine.buffer = [observation]
+    return inference_engine
+
+
+def bench_goal_inference(benchmark):
+    benchmark(make_engine().infer)
+
+
+def bench_goal_inference_sparse(benchmark):
+    # the 8 most likely goals only are evaluated
+    benchmark(make_engine(top_k=8).infer)
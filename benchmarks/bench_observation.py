@@ -0,0 +1,44 @@
+"""Benchmarks for RuleObservationEngine."""
+
+from coopihc.observation.RuleObservationEngine import RuleObservationEngine
+from coopihc.observation.utils import base_user_engine_specification
+from coopihc.base.elements import example_game_state
+
+
+def bench_apply_mapping(benchmark):
+    obs_eng = RuleObservationEngine(
+        deterministic_specification=base_user_engine_specification
+    )
+    game_state = example_game_state()
+    obs_eng.mapping = obs_eng.create_mapping(game_state)
+    benchmark(obs_eng.apply_mapping, game_state)
+
+
+def bench_apply_mapping_rules(benchmark):
+    def f(observation, gamestate, *args):
+        return args[0] * observation
+
+    mapping = [
+        ("task_state", "position", slice(0, 1, 1), None, None, None, None),
+        ("task_state", "targets", slice(0, 2, 1), None, None, None, None),
+        ("user_state", "goal", slice(0, 1, 1), f, (2,), None, None),
+        ("user_action", "action", slice(0, 1, 1), None, None, None, None),
+        ("assistant_action", "action", slice(0, 1, 1), None, None, None, None),
+    ]
+    obs_eng = RuleObservationEngine(mapping=mapping)
+    benchmark(obs_eng.apply_mapping, example_game_state())
+
+
+def bench_observe_incremental(benchmark):
+    obs_eng = RuleObservationEngine(
+        deterministic_specification=base_user_engine_specification,
+        incremental=True,
+    )
+    game_state = example_game_state()
+    obs_eng.observe(game_state=game_state)
+
+    def _observe():
+        game_state["task_state"]["position"] = 1
+        return obs_eng.observe(game_state=game_state)
+
+    benchmark(_observe)
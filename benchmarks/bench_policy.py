@@ -0,0 +1,18 @@
+"""Benchmarks for policies."""
+
+from coopihc import Bundle
+from coopihc.examples.simplepointing.envs import SimplePointingTask
+from coopihc.examples.simplepointing.users import CarefulPointer
+from coopihc.examples.simplepointing.assistants import BIGGain
+
+
+def bench_big_find_best_action(benchmark):
+    bundle = Bundle(
+        task=SimplePointingTask(gridsize=31, number_of_targets=8, mode="position"),
+        user=CarefulPointer(error_rate=0.05),
+        assistant=BIGGain(),
+        seed=0,
+    )
+    # The assistant has observed the game state and updated its beliefs
+    bundle.reset(go_to=3)
+    benchmark(bundle.assistant.policy.find_best_action)
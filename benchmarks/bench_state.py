@@ -0,0 +1,118 @@
+"""Benchmarks for StateElement and State."""
+
+import copy
+
+import numpy
+
+from coopihc.base.State import State
+from coopihc.base.StateCodec import StateCodec
+from coopihc.base.elements import (
+    discrete_array_element,
+    array_element,
+    example_game_state,
+)
+
+# ============== StateElement construction, one per out_of_bounds_mode
+
+
+def make_element(out_of_bounds_mode):
+    return array_element(
+        init=numpy.full((4, 4), 0.5),
+        low=numpy.zeros((4, 4)),
+        high=numpy.ones((4, 4)),
+        out_of_bounds_mode=out_of_bounds_mode,
+    )
+
+
+def bench_construct_error(benchmark):
+    benchmark(make_element, "error")
+
+
+def bench_construct_warning(benchmark):
+    benchmark(make_element, "warning")
+
+
+def bench_construct_clip(benchmark):
+    benchmark(make_element, "clip")
+
+
+def bench_construct_silent(benchmark):
+    benchmark(make_element, "silent")
+
+
+def bench_construct_raw(benchmark):
+    benchmark(make_element, "raw")
+
+
+# ============== StateElement writes (in bounds), one per out_of_bounds_mode
+
+
+def write(out_of_bounds_mode):
+    element = make_element(out_of_bounds_mode)
+    value = numpy.full((4, 4), 0.25)
+
+    def _write():
+        element[...] = value
+
+    return _write
+
+
+def bench_write_error(benchmark):
+    benchmark(write("error"))
+
+
+def bench_write_warning(benchmark):
+    benchmark(write("warning"))
+
+
+def bench_write_clip(benchmark):
+    benchmark(write("clip"))
+
+
+def bench_write_silent(benchmark):
+    benchmark(write("silent"))
+
+
+def bench_write_raw(benchmark):
+    benchmark(write("raw"))
+
+
+def bench_write_through_state(benchmark):
+    state = State()
+    state["x"] = discrete_array_element(init=0, low=-10, high=10)
+
+    def _write():
+        state["x"] = 3
+
+    benchmark(_write)
+
+
+# ====================== State
+
+
+def bench_state_copy(benchmark):
+    benchmark(copy.copy, example_game_state())
+
+
+def bench_state_deepcopy(benchmark):
+    benchmark(copy.deepcopy, example_game_state())
+
+
+def bench_state_filter(benchmark):
+    filterdict = dict(
+        {
+            "task_state": dict({"targets": slice(0, 1, 1)}),
+            "assistant_state": dict({"beliefs": slice(0, 4, 1)}),
+        }
+    )
+    benchmark(example_game_state().filter, mode="stateelement", filterdict=filterdict)
+
+
+def bench_state_serialize(benchmark):
+    benchmark(example_game_state().serialize)
+
+
+def bench_state_serialize_codec(benchmark):
+    state = example_game_state()
+    codec = StateCodec()
+    benchmark(state.serialize, codec=codec)
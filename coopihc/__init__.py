@@ -9,6 +9,12 @@ from .agents.lqrcontrollers.LQRController import LQRController
 
 from .bundle.BaseBundle import BaseBundle
 from .bundle.Bundle import Bundle
+from .bundle.BatchedBundle import BatchedBundle
+from .bundle.Trajectory import Trajectory
+from .bundle.Checkpoint import Checkpoint
+from .bundle.Recorder import Recorder
+from .bundle.Profiler import Profiler
+from .bundle.ParallelRunner import ParallelRunner
 from .bundle.wrappers.Train import TrainGym
 from .bundle.WsServer import WsServer
 from .bundle.wrappers import PipedTaskBundleWrapper
@@ -18,6 +24,9 @@ from .inference.BaseInferenceEngine import BaseInferenceEngine
 from .inference.ExampleInferenceEngine import ExampleInferenceEngine
 from .inference.ContinuousKalmanUpdate import ContinuousKalmanUpdate
 from .inference.GoalInferenceWithUserPolicyGiven import GoalInferenceWithUserPolicyGiven
+from .inference.LogGoalInferenceWithUserPolicyGiven import (
+    LogGoalInferenceWithUserPolicyGiven,
+)
 from .inference.LinearGaussianContinuous import LinearGaussianContinuous
 
 from .interactiontask.ClassicControlTask import ClassicControlTask
@@ -46,6 +55,8 @@ from .base.Space import Space
 
 from .base.State import State
 from .base.StateElement import StateElement
+from .base.StateStore import StateStore
+from .base.StateCodec import StateCodec
 
 # ---------------- warnings
 from .base.utils import StateNotContainedWarning
@@ -60,6 +71,7 @@ from .base.utils import SpaceLengthError
 from .base.utils import StateNotContainedError
 from .base.utils import SpacesNotIdenticalError
 from .base.utils import NotASpaceError
+from .base.utils import UnknownSchemaError
 
 # -------------------- shortcuts
 # from .base.elements import lin_space
@@ -76,6 +88,8 @@ from .observation.utils import blind_engine_specification
 from .observation.utils import base_task_engine_specification
 from .observation.utils import base_user_engine_specification
 from .observation.utils import base_assistant_engine_specification
+from .observation.utils import LinearRule
+from .observation.utils import GaussianNoiseRule
 
 # ---------------------- pointing examples
 from .examples.simplepointing.envs import SimplePointingTask
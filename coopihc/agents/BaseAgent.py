@@ -6,6 +6,7 @@ from coopihc.observation.RuleObservationEngine import RuleObservationEngine
 from coopihc.observation.utils import base_user_engine_specification
 from coopihc.observation.utils import base_assistant_engine_specification
 from coopihc.inference.BaseInferenceEngine import BaseInferenceEngine
+from coopihc.helpers import spawn_seeds
 
 import numpy
 import copy
@@ -86,6 +87,9 @@ class BaseAgent:
         self._bundle_memory = None
         self.ax = None
         self._parameters = {}
+        self.rng = numpy.random.default_rng()
+        # Keys of the state overwritten by reset(), see State.fast_reset
+        self._reset_covered = None
 
         # Set role of agent
         if role not in ["user", "assistant"]:
@@ -381,17 +385,19 @@ class BaseAgent:
 
         self._inference_engine.host = self
 
-    def _base_reset(self, all=True, dic=None, random=True):
+    def _base_reset(self, all=True, dic=None, random=True, fast=False):
         """Reset function called by the Bundle.
 
         This method is called by the bundle to reset the agent. It defines a bunch of actions that should be performed upon each reset. It namely calls the reset method that can be modified by the end-user of the library.
 
-
+        In fast mode, the keys of the state whose values are changed by reset() are recorded, and are not randomized at the next resets (see :py:meth:`State.fast_reset<coopihc.base.State.State.fast_reset>`). If reset() does not always write the same keys, reset() may be called twice.
 
         :param all: which components to reset, defaults to True
         :type all: bool, optional
         :param dic: reset dictionary, defaults to None.
         :type dic: [type], optional
+        :param fast: whether to skip randomizing states that are overwritten anyway, defaults to False
+        :type fast: bool, optional
 
         :meta private:
         """
@@ -401,9 +407,14 @@ class BaseAgent:
             self.observation_engine.reset(random=random)
 
         if not dic:
-            if random:
-                self.state.reset()
-            self.reset()
+            if not fast:
+                if random:
+                    self.state.reset()
+                self.reset()
+            else:
+                self._reset_covered = self.state.fast_reset(
+                    self.reset, self._reset_covered, random=random
+                )
 
             return
 
@@ -426,6 +437,31 @@ class BaseAgent:
                 except:
                     raise NotImplementedError
 
+    def seed(self, seed):
+        """seed
+
+        Derive independent seeds for the agent's generator ``self.rng`` (which should be used for all sampling done by the agent itself), the spaces of the agent's state, its policy, observation engine and inference engine.
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        (
+            rng_seed,
+            state_seed,
+            policy_seed,
+            observation_seed,
+            inference_seed,
+        ) = spawn_seeds(seed, 5)
+        self.rng = numpy.random.default_rng(rng_seed)
+        self.state.seed(state_seed)
+        for component, component_seed in (
+            (self.policy, policy_seed),
+            (self.observation_engine, observation_seed),
+            (self.inference_engine, inference_seed),
+        ):
+            if component is not None:
+                component.seed(component_seed)
+
     def reset(self):
         """reset the agent --- Override this
 
@@ -441,6 +477,20 @@ class BaseAgent:
         """
         pass
 
+    def reset_batch(self, game_state, mask):
+        """reset the agent in a batch of games --- Override this together with ``reset``
+
+        Batched counterpart of ``reset``, used by :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`. The leaves of ``game_state`` are arrays with a leading batch axis, and ``mask`` is a boolean array that selects the games to reset. If you override ``reset`` but not ``reset_batch``, the bundle will fall back to calling ``reset`` game by game.
+
+        :param game_state: batched game state
+        :type game_state: :py:class:`State<coopihc.base.State>`
+        :param mask: games to reset
+        :type mask: numpy.ndarray
+
+        :meta public:
+        """
+        pass
+
     def reset_all(self, dic=None, random=True):
         """reset the agent and all its components
 
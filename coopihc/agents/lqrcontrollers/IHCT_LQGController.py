@@ -3,6 +3,7 @@ import copy
 import warnings
 from coopihc.agents.BaseAgent import BaseAgent
 from coopihc.observation.RuleObservationEngine import RuleObservationEngine
+from coopihc.observation.utils import LinearRule, GaussianNoiseRule
 from coopihc.base.State import State
 from coopihc.base.elements import discrete_array_element, array_element, cat_element
 from coopihc.policy.LinearFeedback import LinearFeedback
@@ -164,40 +165,20 @@ class IHCT_LQGController(BaseAgent):
         ]
 
         # Add rule for matrix observation y += Cx
-        def observation_linear_combination(_obs, game_state, C):
-            return C @ _obs
-
-        C_rule = {
-            ("task_state", "x"): (
-                observation_linear_combination,
-                (C,),
-            )
-        }
+        C_rule = {("task_state", "x"): (LinearRule(C), ())}
         extradeterministicrules = {}
         extradeterministicrules.update(C_rule)
 
         # Add rule for noisy observation y += D * epsilon ~ N(mu, sigma)
-
-        def additive_gaussian_noise(_obs, gamestate, D, *args):
-            try:
-                mu, sigma = args
-            except ValueError:
-                mu, sigma = numpy.zeros(_obs.shape), numpy.eye(max(_obs.shape))
-            return _obs + D @ numpy.random.multivariate_normal(
-                mu, sigma, size=1
-            ).reshape(-1, 1)
-
         # Instantiate previous rule so that epsilon ~ N(0, sqrt(dt))
         agn_rule = {
             ("task_state", "x"): (
-                additive_gaussian_noise,
-                (
+                GaussianNoiseRule(
                     D,
-                    numpy.zeros((C.shape[0], 1)).reshape(
-                        -1,
-                    ),
+                    numpy.zeros((C.shape[0],)),
                     numpy.sqrt(timestep) * numpy.eye(C.shape[0]),
                 ),
+                (),
             )
         }
 
@@ -243,7 +224,7 @@ class IHCT_LQGController(BaseAgent):
             ],
             [task.A, task.B, task.F, task.G, task.H],
         ):
-            if getattr(self, elem) == None:
+            if getattr(self, elem) is None:
                 setattr(self, elem, taskelem)
 
         # ---- init xhat state
@@ -323,8 +304,8 @@ class IHCT_LQGController(BaseAgent):
         Y = B @ H.reshape(1, -1)
         Lnorm = []
         Knorm = []
-        K = numpy.random.rand(*C.T.shape)
-        L = numpy.random.rand(1, A.shape[1])
+        K = self.rng.random(C.T.shape)
+        L = self.rng.random((1, A.shape[1]))
         for i in range(N):
             Lnorm.append(numpy.linalg.norm(L))
             Knorm.append(numpy.linalg.norm(K))
@@ -441,13 +422,13 @@ class IHCT_LQGController(BaseAgent):
             mode="full",
         )[-5]
         if average_delta > 0.01:  # Arbitrary threshold
+            # Grow the search from the number of iterations of this try. The call count of _check_KL is shared by all instances and all calls to finit.
+            N = int(1.3 * len(Knorm))
             print(
                 "Warning: the K and L matrices computations did not converge. Retrying with different starting point and a N={:d} search".format(
-                    int(20 * 1.3 ** self._check_KL.calls)
+                    N
                 )
             )
-            K, L = self._compute_Kalman_matrices(
-                matrices, N=int(20 * 1.3 ** self.check_KL.calls)
-            )
+            return self._compute_Kalman_matrices(matrices, N=N)
         else:
             return K, L
@@ -1,8 +1,28 @@
 import numpy
 import itertools
+import collections
 import warnings
 
 
+def _hashable_index(key):
+    """Hashable representation of a numpy index, used to cache sub-spaces. Raises TypeError if the index can not be cached (e.g. fancy indexing with arrays)."""
+    if isinstance(key, tuple):
+        return tuple(_hashable_index(k) for k in key)
+    if isinstance(key, slice):
+        return (
+            slice,
+            _hashable_index(key.start),
+            _hashable_index(key.stop),
+            _hashable_index(key.step),
+        )
+    if isinstance(key, (bool, numpy.bool_)):
+        # hash(True) == hash(1), but True adds an axis instead of indexing
+        return (bool, bool(key))
+    if key is Ellipsis or key is None or isinstance(key, (int, numpy.integer)):
+        return key
+    raise TypeError("Index {} can not be cached".format(key))
+
+
 class BaseSpace:
     """Base space from which other spaces inherit.
 
@@ -14,6 +34,9 @@ class BaseSpace:
     :type contains: str, optional
     """
 
+    subspace_cache_size = 32
+    cast_cache_size = 32
+
     def __init__(
         self,
         seed=None,
@@ -23,9 +46,97 @@ class BaseSpace:
         self.seed = seed
         self.contains = contains
 
-        self.rng = numpy.random.default_rng(seed)
+        self._rng = None
+        self._rng_parent = None
         self._shape = None
         self._spacetype = None
+        self._subspaces = collections.OrderedDict()
+        self._checker = None
+        self._cast_cache = collections.OrderedDict()
+
+    def __getstate__(self):
+        # The checker, the sub-spaces and the casters are caches (the checker and the casters are closures, which can't be pickled), they are rebuilt on first use
+        state = self.__dict__.copy()
+        state["_checker"] = None
+        state["_subspaces"] = collections.OrderedDict()
+        state["_cast_cache"] = collections.OrderedDict()
+        return state
+
+    @property
+    def rng(self):
+        """rng
+
+        Random generator used for sampling. The generator is created on first use. Sub-spaces obtained by indexing a space share the generator of their parent space.
+        """
+        if self._rng is None:
+            if self._rng_parent is not None:
+                return self._rng_parent.rng
+            self._rng = numpy.random.default_rng(self.seed)
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        self._rng = value
+
+    def subspace(self, key):
+        """subspace
+
+        Sub-space ``space[key]``. Sub-spaces are kept in a LRU cache keyed on the index (``subspace_cache_size`` entries per space), so that indexing the same space repeatedly (e.g. on each write to a StateElement) does not create a new space each time.
+
+        .. code-block:: python
+
+            s = Numeric(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)))
+            assert s.subspace((0, slice(None))) == s[0, :]
+            assert s.subspace((0, slice(None))) is s.subspace((0, slice(None)))
+
+        :param key: numpy index
+        :type key: any valid numpy index
+        :return: sub-space
+        :rtype: `Numeric<coopihc.base.Space.Numeric>` or `CatSet<coopihc.base.Space.CatSet>`
+        """
+        try:
+            hkey = _hashable_index(key)
+        except TypeError:
+            return self._make_subspace(key)
+        cache = self._subspaces
+        try:
+            subspace = cache[hkey]
+            cache.move_to_end(hkey)
+            return subspace
+        except KeyError:
+            subspace = self._make_subspace(key)
+            cache[hkey] = subspace
+            if len(cache) > self.subspace_cache_size:
+                cache.popitem(last=False)
+            return subspace
+
+    def _make_subspace(self, key):
+        return self[key]
+
+    @property
+    def check(self):
+        """check
+
+        Precompiled membership check, equivalent to ``value in space`` for values that have already been cast to the space's shape and dtype. The checker is built once per space.
+
+        .. code-block:: python
+
+            s = Numeric(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)))
+            assert s.check(numpy.zeros((2, 2)))
+            assert not s.check(2 * numpy.ones((2, 2)))
+
+        :return: checker function
+        :rtype: callable
+        """
+        if self._checker is None:
+            if self.contains == "numpy":
+                self._checker = self._make_checker()
+            else:
+                self._checker = self.__contains__
+        return self._checker
+
+    def _make_checker(self):
+        return self.__contains__
 
     @property
     def spacetype(self):
@@ -271,20 +382,17 @@ class Numeric(BaseSpace):
 
     def __iter__(self):
         """__iter__"""
-        self._iter_low = iter(self.low)
-        self._iter_high = iter(self.high)
-
+        if self.shape == ():
+            raise TypeError("iteration over a 0-d space")
+        self._iter_index = 0
         return self
 
     def __next__(self):
         """__next__"""
-        return type(self)(
-            low=next(self._iter_low),
-            high=next(self._iter_high),
-            seed=self.seed,
-            dtype=self.dtype,
-            contains=self.contains,
-        )
+        if self._iter_index >= self.shape[0]:
+            raise StopIteration
+        self._iter_index += 1
+        return self.subspace(self._iter_index - 1)
 
     def __getitem__(self, key):
         """__getitem__
@@ -317,14 +425,21 @@ class Numeric(BaseSpace):
             )
             assert s[:, :] == s
             assert s[...] == s
+
+        Sub-spaces are cached and share the random generator of the space, see ``subspace``.
         """
-        return type(self)(
+        return self.subspace(key)
+
+    def _make_subspace(self, key):
+        subspace = type(self)(
             low=self.low[key],
             high=self.high[key],
             seed=self.seed,
             dtype=self.dtype,
             contains=self.contains,
         )
+        subspace._rng_parent = self
+        return subspace
 
     def __eq__(self, other):
         """__eq__
@@ -387,6 +502,49 @@ class Numeric(BaseSpace):
         else:
             raise NotImplementedError
 
+    def contains_batch(self, values):
+        """contains_batch
+
+        Vectorized membership test for a batch of values stacked along a leading axis.
+
+        .. code-block:: python
+
+            s = Numeric(low=-numpy.ones((2,)), high=numpy.ones((2,)))
+            values = numpy.array([[0, 0], [0, 2], [-1, 1]])
+            assert (s.contains_batch(values) == numpy.array([True, False, True])).all()
+
+        :param values: values, with shape (N,) + space.shape
+        :type values: numpy.ndarray
+        :return: boolean mask of shape (N,)
+        :rtype: numpy.ndarray
+        """
+        values = numpy.asarray(values)
+        inside = (values >= self.low) & (values <= self.high)
+        if inside.ndim > 1:
+            inside = inside.reshape(inside.shape[0], -1).all(axis=1)
+        return inside
+
+    def _make_checker(self):
+        low, high = self.low, self.high
+        if self.shape == ():
+            low, high = low.item(), high.item()
+
+            def check(value):
+                try:
+                    return bool(low <= value <= high)
+                except (TypeError, ValueError):
+                    return value in self
+
+        else:
+
+            def check(value):
+                try:
+                    return bool((value >= low).all() and (value <= high).all())
+                except (TypeError, ValueError, AttributeError):
+                    return value in self
+
+        return check
+
     def __repr__(self):
         if self.seed is None:
             return f"{type(self).__name__}([{self.low}, {self.high}]) -- {self.dtype}"
@@ -399,11 +557,27 @@ class Numeric(BaseSpace):
         else:
             return f"{type(self).__name__}({self.shape}) -- {self.dtype} -- seed: {self.seed}"
 
-    def sample(self):
+    @staticmethod
+    def _sample_size(n, size):
+        if n is not None:
+            return (n,)
+        if size is None:
+            return None
+        return tuple(numpy.atleast_1d(size).tolist())
+
+    def sample(self, n=None, size=None):
         """sample
 
         Generate values by sampling from the interval. If the interval represents integers, sampling is uniform. Otherwise, sampling is Gaussian. You can set the seed to sample, see keyword arguments at init.
 
+        Several values can be drawn in a single call to the rng, by specifying either ``n`` or ``size``. The draws are then stacked along leading axes:
+
+        .. code-block:: python
+
+            s = Numeric(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)))
+            assert s.sample(100).shape == (100, 2, 2)
+            assert s.sample(size=(10, 5)).shape == (10, 5, 2, 2)
+
         .. code-block:: python
 
             s = Numeric(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)), seed=123)
@@ -417,17 +591,32 @@ class Numeric(BaseSpace):
             assert (_s == _q).all()
             assert (_s != _r).any()
 
+        :param n: number of draws, defaults to None (single draw)
+        :type n: int, optional
+        :param size: shape of the batch of draws, defaults to None (single draw)
+        :type size: int or tuple, optional
+        :return: draws, with shape ``size + space.shape``
+        :rtype: numpy.ndarray
         """
+        size = self._sample_size(n, size)
         if numpy.issubdtype(self.dtype, numpy.integer):
-
+            if size is None:
+                return self.rng.integers(
+                    low=self.low, high=self.high, endpoint=True, dtype=self.dtype.type
+                )
             return self.rng.integers(
-                low=self.low, high=self.high, endpoint=True, dtype=self.dtype.type
+                low=self.low,
+                high=self.high,
+                size=size + self.shape,
+                endpoint=True,
+                dtype=self.dtype.type,
             )
 
         else:
+            shape = self.shape if size is None else size + self.shape
             return numpy.nan_to_num(
                 (self.high - self.low), nan=1, posinf=1
-            ) * self.rng.random(self.shape, dtype=self.dtype.type) + numpy.nan_to_num(
+            ) * self.rng.random(shape, dtype=self.dtype.type) + numpy.nan_to_num(
                 self.low, neginf=1
             )
 
@@ -475,6 +664,7 @@ class CatSet(BaseSpace):
 
         super().__init__(seed=seed, contains=contains)
         self.array = array.astype(self.dtype)
+        self._sorted_array = None
 
     @property
     def N(self):
@@ -588,16 +778,57 @@ class CatSet(BaseSpace):
         else:
             raise NotImplementedError
 
+    @property
+    def sorted_array(self):
+        """Sorted copy of the set, used for vectorized membership tests"""
+        if self._sorted_array is None:
+            self._sorted_array = numpy.sort(self.array)
+        return self._sorted_array
+
+    def contains_batch(self, values):
+        """contains_batch
+
+        Vectorized membership test for a batch of values stacked along a leading axis. Membership is resolved by binary search in the sorted set, rather than by a linear scan.
+
+        .. code-block:: python
+
+            s = CatSet(array=numpy.array([1, 2, 3], dtype=numpy.int16))
+            assert (s.contains_batch([1, 4, 3]) == numpy.array([True, False, True])).all()
+
+        :param values: values, with shape (N,) or (N, ...). In the latter case, all the values of a row have to belong to the set.
+        :type values: numpy.ndarray
+        :return: boolean mask of shape (N,)
+        :rtype: numpy.ndarray
+        """
+        values = numpy.asarray(values)
+        array = self.sorted_array
+        index = numpy.searchsorted(array, values)
+        inside = array[numpy.minimum(index, array.size - 1)] == values
+        if inside.ndim > 1:
+            inside = inside.reshape(inside.shape[0], -1).all(axis=1)
+        return inside
+
+    def _make_checker(self):
+        values = frozenset(self.array.tolist())
+
+        def check(value):
+            try:
+                return value.item() in values
+            except (AttributeError, ValueError):
+                return value in self
+
+        return check
+
     def __repr__(self):
         return f"{type(self).__name__}({self.array})"
 
     def __flat__(self):
         return f"{type(self).__name__}({self.name})"
 
-    def sample(self):
+    def sample(self, n=None, size=None):
         """sample
 
-        Generate values by sampling uniformly from the set. You can set the seed to the rng, see keyword arguments at init.
+        Generate values by sampling uniformly from the set. You can set the seed to the rng, see keyword arguments at init. Several values can be drawn in a single call by specifying either ``n`` or ``size``, see :py:meth:`Numeric.sample<coopihc.base.Space.Numeric.sample>`.
 
         .. code-block:: python
 
@@ -611,8 +842,17 @@ class CatSet(BaseSpace):
             assert _s == _q
             assert _s != _r
 
+        :param n: number of draws, defaults to None (single draw)
+        :type n: int, optional
+        :param size: shape of the batch of draws, defaults to None (single draw)
+        :type size: int or tuple, optional
+        :return: draws
+        :rtype: numpy.ndarray
         """
-        return self.rng.choice(self.array)
+        size = Numeric._sample_size(n, size)
+        if size is None:
+            return self.rng.choice(self.array)
+        return self.rng.choice(self.array, size=size)
 
     def serialize(self):
         return {
@@ -40,6 +40,9 @@ class State(dict):
         state["sub2"] = substate2
     """
 
+    # StateStore that backs this state, if any. See :py:class:`StateStore<coopihc.base.StateStore.StateStore>`
+    _store = None
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -104,6 +107,15 @@ class State(dict):
             raise AttributeError(name)
 
     def __setitem__(self, key, value):
+        cow = self.__dict__.get("_cow")
+        if cow and key in cow:
+            # Copy-on-write: detach the leaf shared with the parent state before writing to it
+            cow.discard(key)
+            dict.__setitem__(self, key, dict.__getitem__(self, key).copy())
+        old_value = dict.get(self, key)
+        if isinstance(old_value, StateElement):
+            # The element may have been modified in place before the assignment (e.g. state[key] += 1)
+            old_value._version += 1
         if isinstance(value, (State, StateElement)):
             if isinstance(value, StateElement):
                 try:
@@ -115,15 +127,79 @@ class State(dict):
                         )
                         self[key][...] = value[...]
                         return
+                    if self._store is not None:
+                        # Keep the StateElement backed by the store
+                        self[key].view(numpy.ndarray)[...] = value.view(numpy.ndarray)
+                        self[key].out_of_bounds_mode = value.out_of_bounds_mode
+                        return
                 except KeyError:
-                    return super().__setitem__(key, value)
-            return super().__setitem__(key, value)
+                    pass
+            super().__setitem__(key, value)
+            if self._store is not None:
+                self._store.build()
+            return
         try:
             self[key][...] = value
             return
         except KeyError:
             return super().__setitem__(key, value)
 
+    def fork(self):
+        """Copy-on-write copy of the state
+
+        The fork has the same structure as the state, but its StateElements are shared with the state, as read-only views. A StateElement is only copied when a value is assigned to it through the fork (``fork[key] = value``), so that the original state is never modified, and the cost of a fork is proportional to the number of modified elements rather than to the size of the state. Use this instead of ``copy.deepcopy`` for counterfactual evaluations.
+
+        .. code-block:: python
+
+            fork = state.fork()
+            fork["sub1"]["x1"] = 3  # state["sub1"]["x1"] is unchanged
+            fork["sub1"]["x3"][0, 0] = 2  # raises ValueError: write through the State instead
+
+        .. note::
+
+            The fork sees modifications that are made to the original state after the fork was created, for elements that it did not write to. Use ``snapshot`` for a frozen copy.
+
+        :return: forked state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        fork = type(self)()
+        cow = set()
+        for key, value in self.items():
+            if isinstance(value, State):
+                dict.__setitem__(fork, key, value.fork())
+            elif isinstance(value, numpy.ndarray):
+                view = value.view()
+                view.flags.writeable = False
+                dict.__setitem__(fork, key, view)
+                cow.add(key)
+            else:
+                dict.__setitem__(fork, key, value)
+        fork._cow = cow
+        return fork
+
+    def snapshot(self):
+        """Read-only copy of the current values of the state
+
+        Values are copied, but spaces are shared with the state (contrary to ``copy.deepcopy``, which also copies spaces and their random generators), which makes snapshots much cheaper than deep copies. Assignments to the snapshot are copy-on-write, see ``fork``.
+
+        :return: snapshot of the state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        snapshot = type(self)()
+        cow = set()
+        for key, value in self.items():
+            if isinstance(value, State):
+                dict.__setitem__(snapshot, key, value.snapshot())
+            elif isinstance(value, numpy.ndarray):
+                value = value.copy()
+                value.flags.writeable = False
+                dict.__setitem__(snapshot, key, value)
+                cow.add(key)
+            else:
+                dict.__setitem__(snapshot, key, value)
+        snapshot._cow = cow
+        return snapshot
+
     def reset(self, dic={}):
         """Initialize the state. See StateElement
 
@@ -148,6 +224,188 @@ class State(dict):
             reset_dic = dic.get(key)
             value.reset(reset_dic)
 
+    def resample(self, skip=()):
+        """resample
+
+        Reset the state to random values, like ``reset`` without a reset dictionnary, except for the keys in ``skip``. Samples drawn from an element's own space are valid by construction, so they are written in place without going through the validation of ``StateElement.__setitem__``.
+
+        .. code-block:: python
+
+            state.resample(skip={"x1"})  # state["x1"] is left untouched
+
+        :param skip: keys of the state (not of substates) that are not resampled, defaults to ()
+        :type skip: collection, optional
+        """
+        cow = self.__dict__.get("_cow")
+        for key, value in self.items():
+            if key in skip:
+                continue
+            if isinstance(value, State):
+                value.resample()
+                continue
+            if cow and key in cow:
+                cow.discard(key)
+                value = value.copy()
+                dict.__setitem__(self, key, value)
+            value.view(numpy.ndarray)[...] = numpy.reshape(
+                value.space.sample(), value.shape
+            )
+            value._version += 1
+
+    def versions(self, values=False):
+        """versions
+
+        Identity and write counter of each StateElement of the state (not of substates). Pass the result to ``written_since`` to find out which StateElements were written to or replaced in the meantime.
+
+        :param values: whether to also copy the values of each StateElement, for ``changed_since``, defaults to False
+        :type values: bool, optional
+        :return: key: (StateElement, version), or key: (StateElement, version, values)
+        :rtype: dict
+        """
+        if values:
+            return {
+                key: (value, value._version, value.view(numpy.ndarray).copy())
+                for key, value in self.items()
+                if isinstance(value, StateElement)
+            }
+        return {
+            key: (value, value._version)
+            for key, value in self.items()
+            if isinstance(value, StateElement)
+        }
+
+    def written_since(self, versions):
+        """written_since
+
+        Keys of the StateElements that were written to or replaced since ``versions`` was called.
+
+        .. code-block:: python
+
+            versions = state.versions()
+            state["x1"] = 3
+            state.written_since(versions)  # {"x1"}
+
+        :param versions: output of ``versions``
+        :type versions: dict
+        :return: keys
+        :rtype: set
+        """
+        written = set()
+        for key, value in self.items():
+            if not isinstance(value, StateElement):
+                continue
+            try:
+                element, version = versions[key]
+            except KeyError:
+                written.add(key)
+                continue
+            if value is not element or element._version != version:
+                written.add(key)
+        return written
+
+    def changed_since(self, versions):
+        """changed_since
+
+        Keys of the StateElements that were replaced, or whose values changed, since ``versions(values=True)`` was called. Unlike ``written_since``, elements that were only read (e.g. through a view, which counts as a write) are not reported, and neither are elements written to with their previous values.
+
+        :param versions: output of ``versions(values=True)``
+        :type versions: dict
+        :return: keys
+        :rtype: set
+        """
+        changed = set()
+        for key, value in self.items():
+            if not isinstance(value, StateElement):
+                continue
+            try:
+                element, version, values = versions[key]
+            except KeyError:
+                changed.add(key)
+                continue
+            if value is not element:
+                changed.add(key)
+            elif element._version != version and not numpy.array_equal(
+                element.view(numpy.ndarray), values
+            ):
+                changed.add(key)
+        return changed
+
+    def fast_reset(self, reset, covered=None, skip=(), random=True):
+        """fast_reset
+
+        Call ``reset``, after randomizing only the keys of the state that ``reset`` does not overwrite anyway (see ``resample``).
+
+        The keys overwritten by ``reset`` (``covered``) are those whose values it changed at every call so far: pass the returned set back at the next call. If ``reset`` did not change a covered key this time (e.g. a conditional write), that key was neither randomized nor written: it is removed from the covered keys, and the state is randomized again before a second call to ``reset``.
+
+        :param reset: function that resets the state, called without arguments
+        :type reset: callable
+        :param covered: keys overwritten by ``reset``, as returned by the previous call, defaults to None (first call, everything is randomized)
+        :type covered: set, optional
+        :param skip: other keys that are not randomized, defaults to ()
+        :type skip: collection, optional
+        :param random: whether to randomize the state, defaults to True
+        :type random: bool, optional
+        :return: keys overwritten by ``reset``
+        :rtype: set
+        """
+        if covered is None:
+            if random:
+                self.resample(skip=skip)
+            versions = self.versions(values=True)
+            reset()
+            return self.changed_since(versions)
+
+        if random:
+            self.resample(skip=set(covered).union(skip))
+        versions = self.versions(values=True)
+        reset()
+        if not random:
+            return covered
+        missing = set(covered) - self.changed_since(versions)
+        if missing:
+            covered = set(covered) - missing
+            self.resample(skip=covered.union(skip))
+            reset()
+        return covered
+
+    def seed(self, seed):
+        """seed
+
+        Route the sampling of all the spaces of the state (including substates) through a single generator.
+
+        :param seed: seed, or generator, see `numpy.random.default_rng <https://numpy.org/doc/stable/reference/random/generator.html>`_
+        :type seed: int, numpy.random.SeedSequence or numpy.random.Generator
+        """
+        rng = numpy.random.default_rng(seed)
+        for value in self.values():
+            if isinstance(value, State):
+                value.seed(rng)
+            elif isinstance(value, StateElement) and value.space is not None:
+                value.space.rng = rng
+
+    def sample_batch(self, n):
+        """Sample a batch of n states
+
+        Each StateElement is sampled with a single call to its space's ``sample``. The returned State has the same structure, but its leaves are numpy arrays with a leading batch axis of size n (the layout used by :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`).
+
+        .. code-block:: python
+
+            batch = state.sample_batch(1000)
+            assert batch["sub1"]["x3"].shape == (1000, 2, 2)
+
+        :param n: number of states
+        :type n: int
+        :return: batched state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        batch = State()
+        for key, value in self.items():
+            if isinstance(value, State):
+                dict.__setitem__(batch, key, value.sample_batch(n))
+            else:
+                dict.__setitem__(batch, key, value.space.sample(n))
+        return batch
+
     def filter(self, mode="array", filterdict=None):
         """Extract some part of the state information
 
@@ -243,6 +501,9 @@ class State(dict):
         cls = self.__class__
         copy_object = cls.__new__(cls)
         copy_object.__dict__.update(self.__dict__)
+        copy_object.__dict__.pop("_store", None)
+        if "_cow" in copy_object.__dict__:
+            copy_object._cow = set(self._cow)
         copy_object.update(self)
         return copy_object
 
@@ -251,30 +512,45 @@ class State(dict):
         deepcopy_object = cls.__new__(cls)
         memodict[id(self)] = deepcopy_object
         deepcopy_object.__dict__.update(self.__dict__)
+        # The copy is not backed by the store of the original state
+        deepcopy_object.__dict__.pop("_store", None)
+        deepcopy_object.__dict__.pop("_cow", None)
         for k, v in self.items():
             deepcopy_object[k] = copy.deepcopy(v, memodict)
         return deepcopy_object
 
-    def serialize(self):
+    def serialize(self, codec=None):
         """Makes the state serializable.
 
         .. code-block:: python
 
             state.serialize()
 
-        :return: serializable dictionnary
-        :rtype: dict
+            # binary encoding, see StateCodec
+            codec = StateCodec()
+            data = state.serialize(codec=codec)
+
+        :param codec: binary codec, defaults to None. If None, the state is serialized to a JSON-compatible dictionnary.
+        :type codec: :py:class:`StateCodec<coopihc.base.StateCodec.StateCodec>`, optional
+        :return: serializable dictionnary, or bytes if a codec is given
+        :rtype: dict or bytes
 
         """
+        if codec is not None:
+            return codec.encode(self)
+
         ret_dict = {}
         for key, value in dict(self).items():
+            if isinstance(value, (State, StateElement)):
+                ret_dict[key] = value.serialize()
+                continue
             try:
                 value_ = json.dumps(value)
             except TypeError:
                 try:
                     value_ = value.serialize()
                 except AttributeError:
-                    warnings.warns(
+                    warnings.warn(
                         NotKnownSerializationWarning(
                             "warning: I don't know how to serialize {}. I'm sending the whole internal dictionnary of the object. Consider adding a serialize() method to your custom object".format(
                                 value.__str__()
@@ -285,6 +561,25 @@ class State(dict):
             ret_dict[key] = value_
         return ret_dict
 
+    @staticmethod
+    def deserialize(data, codec, state=None):
+        """Rebuild a state from the output of ``serialize(codec=codec)``.
+
+        .. code-block:: python
+
+            state = State.deserialize(data, codec)
+
+        :param data: binary message
+        :type data: bytes
+        :param codec: codec of the receiving end, see :py:meth:`StateCodec.decode<coopihc.base.StateCodec.StateCodec.decode>`
+        :type codec: :py:class:`StateCodec<coopihc.base.StateCodec.StateCodec>`
+        :param state: state in which values are copied in place, defaults to None (a new state is built)
+        :type state: :py:class:`State<coopihc.base.State.State>`, optional
+        :return: state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        return codec.decode(data, state=state)
+
     def _tabulate(self):
         """_tabulate
 
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import struct
+
+import numpy
+
+from coopihc.base.Space import Space, CatSet
+from coopihc.base.StateElement import StateElement
+from coopihc.base.StateStore import StateStore
+from coopihc.base.utils import UnknownSchemaError
+
+
+class StateCodec:
+    """StateCodec
+
+    Binary encoding of :py:class:`States<coopihc.base.State.State>` for inter-process communication and logging, where the schema is sent once and values many times. The schema of a state (key paths, dtypes, shapes, spaces and out of bounds modes of its StateElements) is a JSON document identified by a hash. The first message encoded for a schema carries it; later messages only carry the hash and the raw bytes of the values.
+
+    .. code-block:: python
+
+        # sending end
+        encoder = StateCodec()
+        data = encoder.encode(state)  # or state.serialize(codec=encoder)
+
+        # receiving end
+        decoder = StateCodec()
+        state = decoder.decode(data)  # or State.deserialize(data, decoder)
+
+    Use one codec per channel and per direction: an encoder only sends each schema once, and a decoder has to receive every message of its channel in order.
+
+    Messages are laid out as follows: one byte for the message type (``S`` if the message carries the schema, ``V`` otherwise), 8 bytes of schema hash, then for ``S`` messages the length of the schema (4 bytes, little endian) followed by the schema, then the values of each StateElement in schema order (C order, native dtype).
+    """
+
+    def __init__(self):
+        # Encoding: layout of the last encoded state, and hashes of the schemas already sent
+        self._leaves = None
+        self._header = None
+        self._sent = set()
+        # Decoding: received schemas, by hash
+        self._schemas = {}
+
+    @staticmethod
+    def _leaves_of(state):
+        return [
+            (path, value)
+            for path, value in StateStore._walk(state)
+            if isinstance(value, StateElement)
+        ]
+
+    @staticmethod
+    def schema(state):
+        """schema
+
+        JSON-compatible description of the layout of a state.
+
+        :param state: state
+        :type state: :py:class:`State<coopihc.base.State.State>`
+        :return: schema
+        :rtype: dict
+        """
+        columns = []
+        for path, value in StateCodec._leaves_of(state):
+            array = value.view(numpy.ndarray)
+            space = value.space
+            if space is None:
+                space_schema = None
+            elif isinstance(space, CatSet):
+                space_schema = {"array": space.array.tolist()}
+            else:
+                space_schema = {"low": space.low.tolist(), "high": space.high.tolist()}
+            if space_schema is not None:
+                space_schema["dtype"] = space.dtype.str
+            columns.append(
+                {
+                    "path": list(path),
+                    "dtype": array.dtype.str,
+                    "shape": list(array.shape),
+                    "space": space_schema,
+                    "out_of_bounds_mode": value.out_of_bounds_mode,
+                }
+            )
+        return {"columns": columns}
+
+    def _layout(self, state):
+        """Leaves of the state, and the header of its messages. Cached, and rebuilt when StateElements are added, removed or replaced."""
+        leaves = self._leaves_of(state)
+        if (
+            self._leaves is not None
+            and len(leaves) == len(self._leaves)
+            and all(
+                path == _path and value is _value
+                for (path, value), (_path, _value) in zip(leaves, self._leaves)
+            )
+        ):
+            return self._leaves, self._header
+        schema = json.dumps(self.schema(state), sort_keys=True).encode()
+        digest = hashlib.sha1(schema).digest()[:8]
+        self._leaves = leaves
+        self._header = (digest, schema)
+        return self._leaves, self._header
+
+    def encode(self, state):
+        """encode
+
+        Encode the values of a state. The schema is included the first time a state with this schema is encoded by this codec.
+
+        :param state: state
+        :type state: :py:class:`State<coopihc.base.State.State>`
+        :return: message
+        :rtype: bytes
+        """
+        leaves, (digest, schema) = self._layout(state)
+        chunks = [
+            numpy.ascontiguousarray(value.view(numpy.ndarray)).tobytes()
+            for path, value in leaves
+        ]
+        if digest in self._sent:
+            return b"V" + digest + b"".join(chunks)
+        self._sent.add(digest)
+        return (
+            b"S" + digest + struct.pack("<I", len(schema)) + schema + b"".join(chunks)
+        )
+
+    def _read_schema(self, schema):
+        """Spaces and offsets of each column of a received schema."""
+        columns = []
+        offset = 0
+        for column in json.loads(schema)["columns"]:
+            dtype = numpy.dtype(column["dtype"])
+            shape = tuple(column["shape"])
+            space = column["space"]
+            if space is not None:
+                space_dtype = numpy.dtype(space["dtype"])
+                if "array" in space:
+                    space = Space(
+                        array=numpy.array(space["array"], dtype=space_dtype),
+                        dtype=space_dtype,
+                    )
+                else:
+                    space = Space(
+                        low=numpy.array(space["low"], dtype=space_dtype),
+                        high=numpy.array(space["high"], dtype=space_dtype),
+                        dtype=space_dtype,
+                    )
+            count = int(numpy.prod(shape))
+            columns.append(
+                (
+                    tuple(column["path"]),
+                    dtype,
+                    shape,
+                    count,
+                    offset,
+                    space,
+                    column["out_of_bounds_mode"],
+                )
+            )
+            offset += count * dtype.itemsize
+        return columns, offset
+
+    def decode(self, data, state=None):
+        """decode
+
+        Decode a message produced by ``encode``. Spaces are rebuilt once per schema, and shared by all the states decoded with that schema.
+
+        :param data: message
+        :type data: bytes
+        :param state: state with the same schema, in which values are copied in place (without validation) instead of building a new state, defaults to None
+        :type state: :py:class:`State<coopihc.base.State.State>`, optional
+        :raises UnknownSchemaError: if the schema of the message was not received by this codec
+        :return: decoded state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        data = memoryview(data)
+        kind = bytes(data[:1])
+        digest = bytes(data[1:9])
+        position = 9
+        if kind == b"S":
+            (length,) = struct.unpack("<I", data[9:13])
+            position = 13 + length
+            if digest not in self._schemas:
+                self._schemas[digest] = self._read_schema(bytes(data[13:position]))
+        elif kind != b"V":
+            raise ValueError("Not a message encoded by StateCodec")
+        try:
+            columns, size = self._schemas[digest]
+        except KeyError:
+            raise UnknownSchemaError(
+                "The schema of this message was never received by this codec. Messages of a channel should all be decoded, in order, by the same codec."
+            )
+        if len(data) - position != size:
+            raise ValueError(
+                "Expected {} bytes of values, got {}".format(size, len(data) - position)
+            )
+
+        if state is None:
+            # Imported here to avoid a circular import with State
+            from coopihc.base.State import State
+
+            state = State()
+            new = True
+        else:
+            new = False
+
+        for path, dtype, shape, count, offset, space, out_of_bounds_mode in columns:
+            values = numpy.frombuffer(
+                data, dtype=dtype, count=count, offset=position + offset
+            ).reshape(shape)
+            parent = state
+            if new:
+                for key in path[:-1]:
+                    if key not in parent:
+                        dict.__setitem__(parent, key, State())
+                    parent = parent[key]
+                element = values.copy().view(StateElement)
+                element.space = space
+                element.out_of_bounds_mode = out_of_bounds_mode
+                dict.__setitem__(parent, path[-1], element)
+            else:
+                for key in path[:-1]:
+                    parent = parent[key]
+                element = parent[path[-1]]
+                element.view(numpy.ndarray)[...] = values
+                element._version += 1
+        return state
@@ -76,6 +76,9 @@ class StateElement(numpy.ndarray):
     }
 
     HANDLED_FUNCTIONS = {}
+
+    # Write counter, incremented on each write through __setitem__, in-place operators (x += 1) or a State. Handing out a view of the values (x[0:2]) also counts as a write, since the view may be written to. Used to skip unchanged elements, e.g. by the incremental RuleObservationEngine.
+    _version = 0
     SAFE_FUNCTIONS = ["all"]
 
     @staticmethod
@@ -91,13 +94,16 @@ class StateElement(numpy.ndarray):
     def __new__(cls, input_object, space, out_of_bounds_mode="warning"):
         """__new__, see https://numpy.org/doc/stable/user/basics.subclassing.html"""
 
-        input_object = numpy.asarray(
-            StateElement._process_input_values(
-                input_object,
-                space,
-                out_of_bounds_mode,
-            )
+        processed_object = StateElement._process_input_values(
+            input_object,
+            space,
+            out_of_bounds_mode,
         )
+        if out_of_bounds_mode in ("raw", None) or space is None:
+            input_object = numpy.asarray(processed_object)
+        else:
+            # _process_input_values may return a view of the input, don't share memory with it
+            input_object = numpy.array(processed_object)
         obj = input_object.view(cls)
         obj.space = space
         obj.out_of_bounds_mode = out_of_bounds_mode
@@ -112,6 +118,16 @@ class StateElement(numpy.ndarray):
         self.space = space
         self.out_of_bounds_mode = out_of_bounds_mode
 
+    def __reduce__(self):
+        """__reduce__, keep the space and out_of_bounds_mode when pickling"""
+        reconstruct, arguments, state = super().__reduce__()
+        return reconstruct, arguments, (state, self.space, self.out_of_bounds_mode)
+
+    def __setstate__(self, state):
+        """__setstate__, see __reduce__"""
+        state, self.space, self.out_of_bounds_mode = state
+        super().__setstate__(state)
+
     @property
     def dtype(self):
         return self.space.dtype
@@ -243,6 +259,9 @@ class StateElement(numpy.ndarray):
             except SpaceNotSeparableError:
                 return self
 
+            if self.out_of_bounds_mode in ("raw", None):
+                # The new StateElement shares memory with this one
+                self._version += 1
             return StateElement(
                 item.view(numpy.ndarray),
                 space,
@@ -250,14 +269,20 @@ class StateElement(numpy.ndarray):
             )
         else:
             try:
-                return self.view(numpy.ndarray)[key]
+                item = self.view(numpy.ndarray)[key]
             except IndexError:
                 # If one-element slice
                 try:
                     if key.start == 0 and key.stop == 1 and self.shape == ():
-                        return self.view(numpy.ndarray)
+                        item = self.view(numpy.ndarray)
+                    else:
+                        item = None
                 except AttributeError:
-                    return self.view(numpy.ndarray)[...]
+                    item = self.view(numpy.ndarray)[...]
+            if isinstance(item, numpy.ndarray):
+                # Writes through the view are not seen, count it as one
+                self._version += 1
+            return item
 
     def __setitem__(self, key, value):
         """__setitem__
@@ -273,12 +298,51 @@ class StateElement(numpy.ndarray):
                 x[...] = 4
 
         """
-        # The except clause is here to support numpy broadcasting when indexing.
+        self._version += 1
+        mode = self.out_of_bounds_mode
+        if mode == "raw" or mode is None or self.space is None:
+            super().__setitem__(key, value)
+            return
+        out = None
+        if mode == "clip":
+            # Out of bounds values are clipped directly into the values of the element
+            target = self.view(numpy.ndarray)[key]
+            if isinstance(target, numpy.ndarray) and numpy.may_share_memory(
+                target, self
+            ):
+                out = target
         value = StateElement._process_input_values(
-            value, self.space[key], self.out_of_bounds_mode
+            value, self.space.subspace(key), mode, out=out
         )
+        if value is out:
+            return
         super().__setitem__(key, value)
 
+    def _inplace(name):
+        """In-place operator of numpy arrays, which also increments the write counter."""
+        operator = getattr(numpy.ndarray, name)
+
+        def _operator(self, other):
+            self._version += 1
+            return operator(self, other)
+
+        _operator.__name__ = name
+        return _operator
+
+    __iadd__ = _inplace("__iadd__")
+    __isub__ = _inplace("__isub__")
+    __imul__ = _inplace("__imul__")
+    __imatmul__ = _inplace("__imatmul__")
+    __itruediv__ = _inplace("__itruediv__")
+    __ifloordiv__ = _inplace("__ifloordiv__")
+    __imod__ = _inplace("__imod__")
+    __ipow__ = _inplace("__ipow__")
+    __ilshift__ = _inplace("__ilshift__")
+    __irshift__ = _inplace("__irshift__")
+    __iand__ = _inplace("__iand__")
+    __ixor__ = _inplace("__ixor__")
+    __ior__ = _inplace("__ior__")
+
     def __iter__(self):
         """Numpy-style __iter__
 
@@ -518,75 +582,148 @@ class StateElement(numpy.ndarray):
         else:
             mix_outbounds = self.out_of_bounds_mode
 
-        if self.spacetype == "discrete" and other.spacetype == "continuous":
-            value = self._discrete2continuous(other, mode=mode)
-        elif self.spacetype == "continuous" and other.spacetype == "continuous":
-            value = self._continuous2continuous(other)
-        elif self.spacetype == "continuous" and other.spacetype == "discrete":
-            value = self._continuous2discrete(other, mode=mode)
-        elif self.spacetype == "discrete" and other.spacetype == "discrete":
-            if self.space.N == other.N:
-                value = self._discrete2discrete(other)
+        value = StateElement.cast_array(self[...], self.space, other, mode=mode)
+
+        return StateElement(
+            numpy.atleast_2d(numpy.array(value)),
+            other,
+            out_of_bounds_mode=mix_outbounds,
+        )
+
+    @staticmethod
+    def cast_array(values, space, other, mode="center"):
+        """cast_array
+
+        Array version of ``cast``: convert values that belong to ``space`` to values of ``other``. Values are converted elementwise, so that a whole batch of values (e.g. actions of several environments) can be cast in one call.
+
+        The conversion is backed by a lookup table (discrete source space) or an affine transform (continuous source space), which is computed once per (space, other, mode) and cached on ``space``. The casters to the last ``cast_cache_size`` target spaces are kept.
+
+        .. code-block:: python
+
+            discr_box_space = box_space(low=numpy.int8(1), high=numpy.int8(3))
+            cont_box_space = box_space(low=numpy.float64(-1.5), high=numpy.float64(1.5))
+            StateElement.cast_array(numpy.array([1, 2, 3]), discr_box_space, cont_box_space)
+            # array([-1., 0., 1.])
+
+        :param values: values to convert
+        :type values: numpy.ndarray
+        :param space: space where values belong
+        :type space: :py:class:`Space <coopihc.base.Space.Space>`
+        :param other: space to cast values to
+        :type other: :py:class:`Space <coopihc.base.Space.Space>`
+        :param mode: how to map discrete and continuous space, defaults to "center". See ``cast``.
+        :type mode: str, optional
+        :return: converted values
+        :rtype: numpy.ndarray
+        """
+        key = (id(other), mode)
+        cache = space._cast_cache
+        try:
+            _other, caster = cache[key]
+            if _other is not other:
+                raise KeyError
+            cache.move_to_end(key)
+        except KeyError:
+            caster = StateElement._make_caster(space, other, mode)
+            cache[key] = (other, caster)
+            if len(cache) > space.cast_cache_size:
+                cache.popitem(last=False)
+        return caster(numpy.asarray(values))
+
+    @staticmethod
+    def _make_caster(space, other, mode):
+        if space.spacetype == "discrete" and other.spacetype == "continuous":
+            table = StateElement._discrete2continuous(space, other, mode=mode)
+            index = StateElement._discrete_index(space)
+            return lambda values: table[index(values)]
+        elif space.spacetype == "continuous" and other.spacetype == "continuous":
+            return StateElement._continuous2continuous(space, other)
+        elif space.spacetype == "continuous" and other.spacetype == "discrete":
+            return StateElement._continuous2discrete(space, other, mode=mode)
+        elif space.spacetype == "discrete" and other.spacetype == "discrete":
+            if space.N == other.N:
+                table = numpy.asarray(other.array).ravel()
+                index = StateElement._discrete_index(space)
+                return lambda values: table[index(values)]
             else:
                 raise ValueError(
                     "You are trying to match a discrete space to another discrete space of different size {} != {}.".format(
-                        self.space.N, other.N
+                        space.N, other.N
                     )
                 )
         else:
             raise NotImplementedError
 
-        return StateElement(
-            numpy.atleast_2d(numpy.array(value)),
-            other,
-            out_of_bounds_mode=mix_outbounds,
-        )
+    @staticmethod
+    def _discrete_index(space):
+        """Map values of a discrete space to their position in space.array, by binary search"""
+        array = numpy.asarray(space.array).ravel()
+        order = numpy.argsort(array, kind="stable")
+        sorted_array = array[order]
+
+        def index(values):
+            position = numpy.minimum(
+                numpy.searchsorted(sorted_array, values), sorted_array.size - 1
+            )
+            if not (sorted_array[position] == values).all():
+                raise ValueError("{} is not in {}".format(values, space))
+            return order[position]
 
-    def _discrete2continuous(self, other, mode="center"):
+        return index
+
+    @staticmethod
+    def _discrete2continuous(space, other, mode="center"):
 
         if mode == "edges":
-            ls = numpy.linspace(other.low, other.high, self.space.N)
+            ls = numpy.linspace(other.low, other.high, space.N)
             shift = 0
         elif mode == "center":
-            ls = numpy.linspace(other.low, other.high, self.space.N + 1)
+            ls = numpy.linspace(other.low, other.high, space.N + 1)
             shift = (ls[1] - ls[0]) / 2
 
-        value = shift + ls[self.space.array.tolist().index(self[...])]
-        return numpy.array(value).reshape((-1, 1))
+        return shift + ls
 
-    def _continuous2discrete(self, other, mode="center"):
+    @staticmethod
+    def _continuous2discrete(space, other, mode="center"):
 
-        _range = (self.space.high - self.space.low).squeeze()
+        _range = (space.high - space.low).squeeze()
+        low = space.low.squeeze()
+        array = numpy.asarray(other.array).ravel()
         if mode == "edges":
-            _remainder = (self[...] - self.space.low.squeeze()) % (_range / other.N)
-            index = min(
-                int((self[...] - self.space.low - _remainder) / _range * other.N),
-                other.N - 1,
-            )
+            N = other.N
+            step = _range / N
+
+            def caster(values):
+                _remainder = (values - low) % step
+                index = numpy.minimum(
+                    ((values - low - _remainder) / _range * N).astype(int), N - 1
+                )
+                return array[index]
+
         elif mode == "center":
             N = other.N - 1
-            _remainder = (self[...] - self.space.low + (_range / 2 / N)) % (
-                _range / (N)
-            )
+            step = _range / N
+
+            def caster(values):
+                _remainder = (values - low + (_range / 2 / N)) % step
+                index = (
+                    (values - low - _remainder + _range / 2 / N) / _range * N + 1e-5
+                ).astype(
+                    int
+                )  # 1e-5 --> Hack to get around floating point arithmetic
+                return array[index]
 
-            index = int(
-                (self[...] - self.space.low - _remainder + _range / 2 / N) / _range * N
-                + 1e-5
-            )  # 1e-5 --> Hack to get around floating point arithmetic
-        return other.array.tolist()[index]
+        return caster
 
-    def _continuous2continuous(self, other):
+    @staticmethod
+    def _continuous2continuous(space, other):
 
-        s_range = self.space.high - self.space.low
+        s_range = space.high - space.low
         o_range = other.high - other.low
-        s_mid = (self.space.high + self.space.low) / 2
+        s_mid = (space.high + space.low) / 2
         o_mid = (other.high + other.low) / 2
 
-        return (self[...] - s_mid) / s_range * o_range + o_mid
-
-    def _discrete2discrete(self, other):
-
-        return other.array[self.space.array.tolist().index(self[...].tolist())]
+        return lambda values: (values - s_mid) / s_range * o_range + o_mid
 
     def _tabulate(self):
         """_tabulate
@@ -703,20 +840,23 @@ class StateElement(numpy.ndarray):
     #     return decorator
 
     @staticmethod
-    def _process_input_values(input_object, space, out_of_bounds_mode):
+    def _process_input_values(input_object, space, out_of_bounds_mode, out=None):
+        """Cast the input to the dtype and shape of the space, and handle out of bounds values. In clip mode, if ``out`` is given, out of bounds values are clipped into it (in place) and ``out`` is returned."""
         if space is None or out_of_bounds_mode is None:
             return input_object
         if out_of_bounds_mode == "raw":
             return input_object
         try:
             input_object = (
-                numpy.asarray(input_object).reshape(space.shape).astype(space.dtype)
+                numpy.asarray(input_object)
+                .reshape(space.shape)
+                .astype(space.dtype, copy=False)
             )
         except ValueError:
             if numpy.atleast_1d(numpy.asarray(input_object)).shape == 1:
                 input_object = numpy.full(space.shape, input_object, space.dtype)
 
-        if input_object not in space:
+        if not space.check(input_object):
             if out_of_bounds_mode == "error":
                 raise StateNotContainedError(
                     "Instantiated Value {}({}) is not contained in corresponding space {} (low = {}, high = {})".format(
@@ -740,8 +880,9 @@ class StateElement(numpy.ndarray):
                     )
                 )
             elif out_of_bounds_mode == "clip":
-
-                input_object = StateElement._clip(input_object, space)
+                if out is not None and out.shape == input_object.shape:
+                    return numpy.clip(input_object, space.low, space.high, out=out)
+                input_object = numpy.clip(input_object, space.low, space.high)
             else:
                 pass
 
@@ -0,0 +1,193 @@
+import numpy
+
+from coopihc.base.StateElement import StateElement
+
+
+class StateStore:
+    """StateStore
+
+    Compact, array-backed storage for a :py:class:`State<coopihc.base.State.State>`. All the StateElements of the (nested) state are moved into a single contiguous structured numpy buffer, and are replaced by StateElements that are zero-copy views into that buffer. The State keeps working as usual (reads and validated writes go through the StateElements), but snapshots, copies and serialization become a single copy of the buffer.
+
+    .. code-block:: python
+
+        store = StateStore(state)
+        snapshot = store.snapshot()
+        state["sub1"]["x1"] = 3
+        store.restore(snapshot)  # state["sub1"]["x1"] is back to its previous value
+
+    The layout maps each key path to the position of its values in the buffer:
+
+    .. code-block:: python
+
+        store.layout[("sub1", "x1")]
+        # {'offset': 0, 'shape': (), 'dtype': dtype('int64'), 'space': ...}
+
+    .. note::
+
+        Assigning a StateElement to a store-backed State copies the values in place, instead of replacing the StateElement, so that the buffer stays in sync. Adding a new key (or a StateElement with an incompatible shape or dtype) re-lays out the buffer; snapshots taken before are then no longer compatible.
+
+    :param state: the state to back with a buffer
+    :type state: :py:class:`State<coopihc.base.State.State>`
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.layout = None
+        self.buffer = None
+        self.build()
+
+    @staticmethod
+    def _walk(state, path=()):
+        yield path, state
+        for key, value in state.items():
+            if isinstance(value, StateElement):
+                yield path + (key,), value
+            elif isinstance(value, type(state)):
+                yield from StateStore._walk(value, path + (key,))
+
+    @staticmethod
+    def _field_name(path):
+        return "/".join(str(key) for key in path)
+
+    def build(self):
+        """build
+
+        (Re)compute the layout of the state and move all StateElements into a new buffer.
+        """
+        substates = []
+        leaves = []
+        for path, value in self._walk(self.state):
+            if isinstance(value, StateElement):
+                leaves.append((path, value))
+            else:
+                substates.append((path, value))
+
+        dtype = numpy.dtype(
+            [
+                (
+                    self._field_name(path),
+                    value.view(numpy.ndarray).dtype,
+                    value.shape,
+                )
+                for path, value in leaves
+            ],
+            align=True,
+        )
+        buffer = numpy.zeros((), dtype=dtype)
+        layout = {}
+        for path, value in leaves:
+            name = self._field_name(path)
+            view = buffer[name]
+            view[...] = value.view(numpy.ndarray)
+            element = view.view(StateElement)
+            element.space = value.space
+            element.out_of_bounds_mode = value.out_of_bounds_mode
+            substate = self.state
+            for key in path[:-1]:
+                substate = substate[key]
+            dict.__setitem__(substate, path[-1], element)
+            layout[path] = {
+                "offset": dtype.fields[name][1],
+                "shape": value.shape,
+                "dtype": view.dtype,
+                "space": value.space,
+            }
+
+        for path, substate in substates:
+            substate._store = self
+
+        self.buffer = buffer
+        self.layout = layout
+
+    @property
+    def nbytes(self):
+        """Size of the buffer in bytes"""
+        return self.buffer.nbytes
+
+    def snapshot(self):
+        """snapshot
+
+        Copy of the buffer, which can be passed to ``restore``.
+
+        :return: copy of the buffer
+        :rtype: numpy.ndarray
+        """
+        return self.buffer.copy()
+
+    def restore(self, snapshot):
+        """restore
+
+        Restore the values of the state from a snapshot (or from any array with the same layout). Values are copied without validation.
+
+        :param snapshot: snapshot obtained with ``snapshot``
+        :type snapshot: numpy.ndarray
+        """
+        if snapshot.dtype != self.buffer.dtype:
+            raise ValueError(
+                "The snapshot layout does not match the current layout of the store. The store was probably re-laid out since the snapshot was taken."
+            )
+        self.buffer[...] = snapshot
+        self._touch()
+
+    def _touch(self):
+        """Mark all StateElements as modified, after a write to the buffer that bypassed them"""
+        for path in self.layout:
+            substate = self.state
+            try:
+                for key in path:
+                    substate = substate[key]
+            except KeyError:
+                continue
+            substate._version += 1
+
+    def tobytes(self):
+        """tobytes
+
+        :return: the raw content of the buffer
+        :rtype: bytes
+        """
+        return self.buffer.tobytes()
+
+    def frombytes(self, data):
+        """frombytes
+
+        Restore the values of the state from the output of ``tobytes``.
+
+        :param data: raw content of a buffer with the same layout
+        :type data: bytes
+        """
+        self.restore(numpy.frombuffer(data, dtype=self.buffer.dtype).reshape(()))
+
+    def clone(self):
+        """clone
+
+        Copy the state with a single copy of the buffer. The new state is backed by its own store.
+
+        :return: new state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        buffer = self.snapshot()
+
+        def _clone(state, path=()):
+            new_state = type(state)()
+            for key, value in state.items():
+                if isinstance(value, StateElement):
+                    element = buffer[self._field_name(path + (key,))].view(
+                        StateElement
+                    )
+                    element.space = value.space
+                    element.out_of_bounds_mode = value.out_of_bounds_mode
+                    dict.__setitem__(new_state, key, element)
+                else:
+                    dict.__setitem__(new_state, key, _clone(value, path + (key,)))
+            return new_state
+
+        new_state = _clone(self.state)
+        store = StateStore.__new__(StateStore)
+        store.state = new_state
+        store.layout = self.layout
+        store.buffer = buffer
+        for path, substate in self._walk(new_state):
+            if not isinstance(substate, StateElement):
+                substate._store = store
+        return new_state
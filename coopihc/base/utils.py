@@ -75,3 +75,9 @@ class SpaceNotSeparableError(Exception):
     """Error raised when the space can not be indexed."""
 
     __module__ = Exception.__module__
+
+
+class UnknownSchemaError(Exception):
+    """Error raised when decoding a message whose schema was not received."""
+
+    __module__ = Exception.__module__
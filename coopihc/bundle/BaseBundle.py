@@ -1,5 +1,11 @@
 from random import random
 from coopihc.base.State import State
+from coopihc.base.StateElement import StateElement
+from coopihc.base.StateStore import StateStore
+from coopihc.bundle.Checkpoint import Checkpoint
+from coopihc.bundle.Profiler import Profiler
+from coopihc.bundle.Trajectory import Trajectory
+from coopihc.helpers import spawn_seeds
 from coopihc.base.elements import discrete_array_element, array_element, cat_element
 from coopihc.base.elements import discrete_array_element, cat_element
 
@@ -26,6 +32,11 @@ class BaseBundle:
     :param task: (:py:class:`coopihc.interactiontask.InteractionTask.InteractionTask`) A task that inherits from ``InteractionTask``
     :param user: (:py:class:`coopihc.agents.BaseAgent.BaseAgent`) a user which inherits from ``BaseAgent``
     :param assistant: (:py:class:`coopihc.agents.BaseAgent.BaseAgent`) an assistant which inherits from ``BaseAgent``
+    :param reset_fast: (bool) whether resets only randomize the states that are not overwritten anyway by the reset dic or by the reset() methods of the components, see :py:meth:`reset`. Defaults to False.
+    :param compact_state: (bool) whether to back the game state with a single contiguous buffer, see :py:class:`StateStore<coopihc.base.StateStore.StateStore>`. Defaults to False.
+    :param seed: (int) seed from which independent seeds are derived for the task, both agents and their components, see :py:meth:`seed`. Defaults to None (not seeded).
+    :param recorder: (:py:class:`Recorder<coopihc.bundle.Recorder.Recorder>`) recorder to which the game state and rewards are appended at the end of each round. Can also be set later through the ``recorder`` attribute. Defaults to None.
+    :param profile: (bool) whether to time the observation, inference and action of each agent and the task's responses to the actions, see :py:meth:`stats`. Can also be switched later through the ``profiler`` attribute. Defaults to False.
 
     :meta public:
     """
@@ -37,6 +48,17 @@ class BaseBundle:
         "before_assistant_action": 3,
     }
 
+    reward_keys = (
+        "user_observation_reward",
+        "user_inference_reward",
+        "user_policy_reward",
+        "first_task_reward",
+        "assistant_observation_reward",
+        "assistant_inference_reward",
+        "assistant_policy_reward",
+        "second_task_reward",
+    )
+
     def __init__(
         self,
         task,
@@ -46,11 +68,17 @@ class BaseBundle:
         reset_random=False,
         reset_start_after=-1,
         reset_go_to=0,
+        reset_fast=False,
+        compact_state=False,
+        seed=None,
+        recorder=None,
+        profile=False,
         **kwargs,
     ):
         self._reset_random = reset_random
         self._reset_start_after = reset_start_after
         self._reset_go_to = reset_go_to
+        self._reset_fast = reset_fast
 
         self.kwargs = kwargs
         self.task = task
@@ -61,6 +89,7 @@ class BaseBundle:
         self.assistant.bundle = self
 
         # Form complete game state
+        self._dirty_counters = set()
         self.game_state = State()
 
         turn_index = cat_element(
@@ -73,12 +102,22 @@ class BaseBundle:
         self.game_state["game_info"] = State()
         self.game_state["game_info"]["turn_index"] = turn_index
         self.game_state["game_info"]["round_index"] = round_index
+        self._turn_number = 0
+        self._round_number = 0
+        self._mirrored = {
+            "turn_index": (turn_index, turn_index._version, 0),
+            "round_index": (round_index, round_index._version, 0),
+        }
         self.game_state["task_state"] = task.state
         self.game_state["user_state"] = user.state
         self.game_state["assistant_state"] = assistant.state
 
         # here there is a small caveat: you can not access action states in the game_state at finit, you have to pass through the agent instead. This is due to the current way of creating the game_state.
 
+        # Seed before finit, for sampling done there. Seeded again below, once the game state is complete.
+        if seed is not None:
+            self.seed(seed)
+
         self.task.finit()
         self.user.finit()
         self.assistant.finit()
@@ -100,6 +139,20 @@ class BaseBundle:
         # self.user.finit()
         # self.assistant.finit()
 
+        if seed is not None:
+            self.seed(seed)
+
+        # Compact game state
+        self.store = StateStore(self.game_state) if compact_state else None
+
+        # What is played at each turn, for this configuration
+        self._turn_plan = self._compile_turn_plan()
+        self._rewards_template = dict.fromkeys(self.reward_keys, 0)
+        self.recorder = recorder
+        self.profiler = Profiler(self)
+        if profile:
+            self.profiler.enable()
+
         # Needed for render
         self.active_render_figure = None
         self.figure_layout = [211, 223, 224]
@@ -141,42 +194,103 @@ class BaseBundle:
             **self.assistant._parameters,
         }
 
+    @property
+    def game_state(self):
+        """game_state
+
+        The game state. Changes to the turn and round counters are written to its game_info substate when it is accessed, see :py:meth:`turn_number`.
+
+        :return: game state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        if self._dirty_counters:
+            self._sync_counters()
+        return self._game_state
+
+    @game_state.setter
+    def game_state(self, value):
+        self._game_state = value
+
     @property
     def turn_number(self):
         """turn_number
 
-        The turn number in the game (0 to 3)
+        The turn number in the game (0 to 3). The bundle counts turns and rounds with plain ints, which are written to the game_info substate of the game state only when it is handed out (``game_state``, checkpoints, rollout records), so that playing a turn does not cost a validated write.
 
         :return: turn number
         :rtype: numpy.ndarray
         """
-        return self.game_state["game_info"]["turn_index"]
+        self._sync_counters()
+        return self._game_state["game_info"]["turn_index"]
 
     @turn_number.setter
     def turn_number(self, value):
-        self._turn_number = value
-        self.game_state["game_info"]["turn_index"] = value
+        self._turn_number = int(value)
+        self._dirty_counters.add("turn_index")
 
     @property
     def round_number(self):
         """round_number
 
-        The round number in the game (0 to N)
+        The round number in the game (0 to N), see :py:meth:`turn_number`.
 
         :return: turn number
         :rtype: numpy.ndarray
         """
-        return self.game_state["game_info"]["round_index"]
+        self._sync_counters()
+        return self._game_state["game_info"]["round_index"]
 
     @round_number.setter
     def round_number(self, value):
-        self._round_number = value
-        self.game_state["game_info"]["round_index"] = value
+        self._round_number = int(value)
+        self._dirty_counters.add("round_index")
+
+    def _sync_counters(self):
+        """Write the counters that changed since the last sync to ``game_info``, and pick up writes to ``game_info`` that did not go through the counters (e.g. restoring a :py:class:`StateStore<coopihc.base.StateStore.StateStore>` snapshot). Those take precedence."""
+        game_info = self._game_state["game_info"]
+        for key, attr in (
+            ("turn_index", "_turn_number"),
+            ("round_index", "_round_number"),
+        ):
+            element = game_info[key]
+            mirrored, version, value = self._mirrored.get(key, (None, None, None))
+            if element is not mirrored or (
+                element._version != version and int(element) != value
+            ):
+                value = int(element)
+                setattr(self, attr, value)
+            elif key in self._dirty_counters:
+                value = getattr(self, attr)
+                element[...] = value
+            elif element._version == version:
+                continue
+            self._dirty_counters.discard(key)
+            self._mirrored[key] = (element, element._version, value)
 
     @property
     def state(self):
         return self.game_state
 
+    def seed(self, seed):
+        """seed
+
+        Seed all the randomness of the bundle from a single seed. Independent seeds (`SeedSequence <https://numpy.org/doc/stable/reference/random/parallel.html>`_ children) are derived for the task, the user and the assistant, which in turn derive seeds for their policy, observation and inference engines and the spaces of their states. Components should do all their sampling through their generator ``self.rng`` and their spaces, so that two bundles seeded identically play identically.
+
+        .. code-block:: python
+
+            bundle = Bundle(task=task, user=user, seed=123)
+            # or later on
+            bundle.seed(123)
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        task_seed, user_seed, assistant_seed, game_info_seed = spawn_seeds(seed, 4)
+        self.task.seed(task_seed)
+        self.user.seed(user_seed)
+        self.assistant.seed(assistant_seed)
+        self.game_state["game_info"].seed(game_info_seed)
+
     def reset(
         self,
         go_to=None,
@@ -186,6 +300,7 @@ class BaseBundle:
         assistant=True,
         dic={},
         random_reset=False,
+        fast=None,
     ):
         """Reset bundle.
 
@@ -226,6 +341,8 @@ class BaseBundle:
         :type dic: dict, optional
         :param random_reset: whether during resetting values should be randomized or not if not set by a reset dic, default to False
         :type random_reset: bool, optional
+        :param fast: whether to use the fast reset of the components, which only randomizes the states that are not overwritten by the reset dic or by the reset() methods of the components (those are learned from the previous resets, see :py:meth:`State.fast_reset<coopihc.base.State.State.fast_reset>`). Defaults to None, which uses the "reset_fast" keyword argument of the bundle.
+        :type fast: bool, optional
         :return: new game state
         :rtype: :py:class:`State<coopihc.base.State.State>`
         """
@@ -237,12 +354,15 @@ class BaseBundle:
             start_after = self._reset_start_after
 
         random_reset = self._reset_random or random_reset
+        if fast is None:
+            fast = self._reset_fast
 
         if task:
             task_dic = dic.get("task_state")
             self.task._base_reset(
                 dic=task_dic,
                 random=random_reset,
+                fast=fast,
             )
 
         if user:
@@ -250,6 +370,7 @@ class BaseBundle:
             self.user._base_reset(
                 dic=user_dic,
                 random=random_reset,
+                fast=fast,
             )
 
         if assistant:
@@ -257,6 +378,7 @@ class BaseBundle:
             self.assistant._base_reset(
                 dic=assistant_dic,
                 random=random_reset,
+                fast=fast,
             )
 
         self.round_number = 0
@@ -308,92 +430,319 @@ class BaseBundle:
         :return: gamestate, reward, game finished flag
         :rtype: tuple(:py:class:`State<coopihc.base.State.State>`, collections.OrderedDict, boolean)
         """
+        self._sync_counters()
 
         if go_to is None:
-            go_to = int(self.turn_number)
+            go_to = self._turn_number
 
         if not isinstance(go_to, (numpy.integer, int)):
             go_to = self.turn_dict[go_to]
 
-        _started = False
-        rewards = {}
-        rewards["user_observation_reward"] = 0
-        rewards["user_inference_reward"] = 0
-        rewards["user_policy_reward"] = 0
-        rewards["first_task_reward"] = 0
-        rewards["assistant_observation_reward"] = 0
-        rewards["assistant_inference_reward"] = 0
-        rewards["assistant_policy_reward"] = 0
-        rewards["second_task_reward"] = 0
-
-        while self.turn_number != go_to or (not _started):
-
-            _started = True
-            # User observes and infers
-            if self.turn_number == 0 and "no-user" != self.kwargs.get("name"):
-                (
-                    user_obs_reward,
-                    user_infer_reward,
-                ) = self._user_first_half_step()
-                (
-                    rewards["user_observation_reward"],
-                    rewards["user_inference_reward"],
-                ) = (user_obs_reward, user_infer_reward)
-
-            # User takes action and receives reward from task
-            elif self.turn_number == 1 and "no-user" != self.kwargs.get("name"):
-                if user_action is None:
-                    user_action, user_policy_reward = self.user.take_action(
-                        increment_turn=False
-                    )
-                else:
-                    self.user.action = user_action
-                    user_policy_reward = 0
-
-                task_reward, is_done = self._user_second_half_step(user_action)
-                rewards["user_policy_reward"] = user_policy_reward
-                rewards["first_task_reward"] = task_reward
+        rewards = self._rewards_template.copy()
+        is_done = self._play_turns(go_to, rewards, [user_action, assistant_action])
+        return self.game_state, rewards, is_done
+
+    def _play_turns(self, go_to, rewards, actions):
+        """Play turns until go_to is reached (at least one turn), or the game is finished."""
+        plan = self._turn_plan
+        while True:
+            play = plan[self._turn_number]
+            if play is not None:
+                is_done = play(rewards, actions)
                 if is_done:
-                    return self.game_state, rewards, is_done
-
-            elif self.turn_number == 2 and "no-assistant" == self.kwargs.get("name"):
-                self.round_number = self.round_number + 1
-
-            # Assistant observes and infers
-            elif self.turn_number == 2 and "no-assistant" != self.kwargs.get("name"):
-                (
-                    assistant_obs_reward,
-                    assistant_infer_reward,
-                ) = self._assistant_first_half_step()
-                (
-                    rewards["assistant_observation_reward"],
-                    rewards["assistant_inference_reward"],
-                ) = (assistant_obs_reward, assistant_infer_reward)
-
-            # Assistant takes action and receives reward from task
-            elif self.turn_number == 3 and "no-assistant" != self.kwargs.get("name"):
-                if assistant_action is None:
-                    (
-                        assistant_action,
-                        assistant_policy_reward,
-                    ) = self.assistant.take_action(increment_turn=False)
+                    if self.recorder is not None:
+                        self.recorder.append(self.game_state, rewards)
+                    return is_done
+            self.turn_number = (self._turn_number + 1) % 4
+            if self._turn_number == 0 and self.recorder is not None:
+                self.recorder.append(self.game_state, rewards)
+            if self._turn_number == go_to:
+                return False
+
+    def stats(self):
+        """stats
+
+        Timing statistics of the components, collected while the profiler is enabled (``profile=True`` or ``bundle.profiler.enable()``). For each role ("user", "assistant", "task") and each timed method, gives the number of calls, total, mean, min and max time in nanoseconds, and a histogram of the durations. See :py:class:`Profiler<coopihc.bundle.Profiler.Profiler>`.
+
+        .. code-block:: python
+
+            bundle.profiler.enable()
+            bundle.rollout(100)
+            bundle.stats()["user"]["take_action"]["calls"]
+
+        :return: statistics
+        :rtype: dict
+        """
+        return self.profiler.stats()
+
+    def checkpoint(self):
+        """checkpoint
+
+        Save the bundle mid-episode, to come back to it later with ``restore``, e.g. to branch simulations or for tree search:
+
+        .. code-block:: python
+
+            token = bundle.checkpoint()
+            for action in candidate_actions:
+                bundle.step(user_action=action)
+                ...
+                bundle.restore(token)
+
+        A checkpoint holds the values of the game state (including both action states and the turn and round counters) in a single flat buffer, the content of the agents' inference engine buffers (i.e. their last observations) and the states of the random generators of the components and of the game state spaces. This is much cheaper than ``copy.deepcopy(bundle)``. Attributes of the components that live outside of their states, if any, are not saved.
+
+        :return: checkpoint
+        :rtype: :py:class:`Checkpoint<coopihc.bundle.Checkpoint.Checkpoint>`
+        """
+        self._sync_counters()
+        if self.store is not None:
+            values = self.store.snapshot()
+        else:
+            leaves, values = self._checkpoint_layout()
+            values = values.copy()
+            for name, element in leaves:
+                values[name] = element.view(numpy.ndarray)
+
+        buffers = []
+        for agent in (self.user, self.assistant):
+            engine = agent.inference_engine
+            buffer = engine.buffer
+            if buffer is not None:
+                if getattr(agent.observation_engine, "incremental", False):
+                    # The observation is updated in place by the engine
+                    buffer = [observation.snapshot() for observation in buffer]
                 else:
-                    self.assistant.action = assistant_action
-                    assistant_policy_reward = 0
+                    buffer = list(buffer)
+            buffers.append((agent, buffer))
+
+        rng_states = [
+            (rng, rng.bit_generator.state) for rng in self._generators().values()
+        ]
+        return Checkpoint(values, buffers, rng_states)
+
+    def restore(self, checkpoint):
+        """restore
+
+        Go back to a checkpoint obtained with ``checkpoint``. Values are copied in place into the StateElements of the game state, without validation.
 
-                task_reward, is_done = self._assistant_second_half_step(
-                    assistant_action
+        :param checkpoint: checkpoint
+        :type checkpoint: :py:class:`Checkpoint<coopihc.bundle.Checkpoint.Checkpoint>`
+        """
+        # Pending counter changes must not be written over the restored values
+        self._sync_counters()
+        if self.store is not None:
+            self.store.restore(checkpoint.values)
+        else:
+            leaves, values = self._checkpoint_layout()
+            if checkpoint.values.dtype != values.dtype:
+                raise ValueError(
+                    "The checkpoint does not match the current game state. StateElements were probably added to or removed from the game state since the checkpoint was made."
                 )
-                rewards["assistant_policy_reward"] = assistant_policy_reward
-                rewards["second_task_reward"] = task_reward
-                if is_done:
-                    return self.game_state, rewards, is_done
+            for name, element in leaves:
+                element.view(numpy.ndarray)[...] = checkpoint.values[name]
+                element._version += 1
+        self._sync_counters()
+
+        for agent, buffer in checkpoint.buffers:
+            if buffer is not None:
+                buffer = list(buffer)
+                if getattr(agent.observation_engine, "incremental", False):
+                    agent.observation_engine.invalidate()
+            agent.inference_engine.buffer = buffer
+
+        for rng, state in checkpoint.rng_states:
+            rng.bit_generator.state = state
+
+    def _checkpoint_layout(self):
+        """Field names and StateElements of the game state, and an empty structured array to hold their values. Cached, and rebuilt when StateElements of the game state are added, removed or replaced."""
+        leaves = [
+            (StateStore._field_name(path), value)
+            for path, value in StateStore._walk(self.game_state)
+            if isinstance(value, StateElement)
+        ]
+        cache = self.__dict__.get("_checkpoint_cache")
+        if (
+            cache is not None
+            and len(cache[0]) == len(leaves)
+            and all(
+                element is cached
+                for (_, element), (_, cached) in zip(leaves, cache[0])
+            )
+        ):
+            return cache
+
+        dtype = numpy.dtype(
+            [
+                (name, element.view(numpy.ndarray).dtype, element.shape)
+                for name, element in leaves
+            ]
+        )
+        self._checkpoint_cache = (leaves, numpy.zeros((), dtype=dtype))
+        return self._checkpoint_cache
+
+    def _generators(self):
+        """Random generators of the components and of the spaces of the game state, by id"""
+        generators = {}
+        components = [self.task]
+        for agent in (self.user, self.assistant):
+            components += [
+                agent,
+                agent.policy,
+                agent.observation_engine,
+                agent.inference_engine,
+            ]
+        for component in components:
+            rng = getattr(component, "rng", None)
+            if isinstance(rng, numpy.random.Generator):
+                generators[id(rng)] = rng
+        for path, value in StateStore._walk(self.game_state):
+            if isinstance(value, StateElement) and value.space is not None:
+                rng = value.space.rng
+                generators[id(rng)] = rng
+        return generators
+
+    def rollout(self, max_rounds, record=None, reset=True, **kwargs):
+        """rollout
+
+        Play rounds until the game is finished, or until ``max_rounds`` rounds were played. After each round, the values of the recorded paths, both agents' actions and each reward component are written into numpy arrays preallocated for ``max_rounds`` rounds, which are returned as a :py:class:`Trajectory<coopihc.bundle.Trajectory.Trajectory>`.
 
-                self.round_number = self.round_number + 1
+        .. code-block:: python
 
-            self.turn_number = (self.turn_number + 1) % 4
+            trajectory = bundle.rollout(100, record=[("task_state", "position")])
+            trajectory[("task_state", "position")]
+            trajectory[("user_action", "action")]
+            trajectory.rewards["first_task_reward"]
+
+        Rounds are played as with ``step``, but no game state or reward dictionnary is returned per round.
+
+        :param max_rounds: maximum number of rounds
+        :type max_rounds: int
+        :param record: paths (tuples of keys) of the StateElements of the game state to record, defaults to None. Both agents' actions are always recorded.
+        :type record: list(tuple), optional
+        :param reset: whether to reset the bundle first, defaults to True
+        :type reset: bool, optional
+        :param kwargs: passed to ``reset``
+        :return: trajectory
+        :rtype: :py:class:`Trajectory<coopihc.bundle.Trajectory.Trajectory>`
+        """
+        if reset:
+            self.reset(**kwargs)
+
+        paths = [("user_action", "action"), ("assistant_action", "action")]
+        for path in record or []:
+            path = tuple(path)
+            if path not in paths:
+                paths.append(path)
+
+        # Preallocate from the current values; parent states are looked up once
+        columns = {}
+        sources = []
+        for path in paths:
+            parent = self.game_state
+            for key in path[:-1]:
+                parent = parent[key]
+            value = numpy.asarray(parent[path[-1]].view(numpy.ndarray))
+            columns[path] = numpy.empty((max_rounds,) + value.shape, dtype=value.dtype)
+            sources.append((parent, path[-1], columns[path]))
+        reward_columns = {
+            key: numpy.zeros((max_rounds,)) for key in self.reward_keys
+        }
+        reward_sources = [(key, reward_columns[key]) for key in self.reward_keys]
+
+        self._sync_counters()
+        go_to = self._turn_number
+        rewards = self._rewards_template.copy()
+        template = self._rewards_template
+        is_done = False
+        n = 0
+        while n < max_rounds and not is_done:
+            rewards.update(template)
+            is_done = bool(self._play_turns(go_to, rewards, [None, None]))
+            if self._dirty_counters:
+                self._sync_counters()
+            for parent, key, column in sources:
+                column[n] = parent[key].view(numpy.ndarray)
+            for key, column in reward_sources:
+                value = rewards[key]
+                column[n] = value.item() if hasattr(value, "item") else value
+            n += 1
+
+        return Trajectory(columns, reward_columns, length=n, is_done=is_done)
+
+    def _compile_turn_plan(self):
+        """_compile_turn_plan
+
+        Resolve the bundle configuration (``name`` keyword argument: "full", "no-user", "no-assistant") once, into the list of what is played at each of the 4 turns. Each item is either None (nothing happens at that turn) or a callable ``play(rewards, actions)`` which fills in the rewards dictionnary and returns whether the game is finished.
+
+        :return: turn plan
+        :rtype: list
+        """
+        name = self.kwargs.get("name")
+        if name == "no-user":
+            plan = [None, None]
+        else:
+            plan = [self._play_user_observation, self._play_user_action]
+        if name == "no-assistant":
+            plan += [self._play_round_end, None]
+        else:
+            plan += [self._play_assistant_observation, self._play_assistant_action]
+        return plan
+
+    def _play_user_observation(self, rewards, actions):
+        # User observes and infers
+        (
+            rewards["user_observation_reward"],
+            rewards["user_inference_reward"],
+        ) = self._user_first_half_step()
+        return False
+
+    def _play_user_action(self, rewards, actions):
+        # User takes action and receives reward from task
+        user_action = actions[0]
+        if user_action is None:
+            user_action, user_policy_reward = self.user.take_action(
+                increment_turn=False
+            )
+            actions[0] = user_action
+        else:
+            self.user.action = user_action
+            user_policy_reward = 0
+
+        task_reward, is_done = self._user_second_half_step(user_action)
+        rewards["user_policy_reward"] = user_policy_reward
+        rewards["first_task_reward"] = task_reward
+        return is_done
+
+    def _play_assistant_observation(self, rewards, actions):
+        # Assistant observes and infers
+        (
+            rewards["assistant_observation_reward"],
+            rewards["assistant_inference_reward"],
+        ) = self._assistant_first_half_step()
+        return False
+
+    def _play_assistant_action(self, rewards, actions):
+        # Assistant takes action and receives reward from task
+        assistant_action = actions[1]
+        if assistant_action is None:
+            (
+                assistant_action,
+                assistant_policy_reward,
+            ) = self.assistant.take_action(increment_turn=False)
+            actions[1] = assistant_action
+        else:
+            self.assistant.action = assistant_action
+            assistant_policy_reward = 0
+
+        task_reward, is_done = self._assistant_second_half_step(assistant_action)
+        rewards["assistant_policy_reward"] = assistant_policy_reward
+        rewards["second_task_reward"] = task_reward
+        if is_done:
+            return is_done
+        return self._play_round_end(rewards, actions)
 
-        return self.game_state, rewards, False
+    def _play_round_end(self, rewards, actions):
+        self.round_number = self._round_number + 1
+        return False
 
     def render(self, mode, *args, **kwargs):
         """render
@@ -487,8 +836,10 @@ class BaseBundle:
     def close(self):
         """close
 
-        Close the bundle once the game is finished.
+        Close the bundle once the game is finished. The recorder, if any, is closed as well.
         """
+        if self.recorder is not None:
+            self.recorder.close()
 
         if self.active_render_figure:
             plt.close(self.fig)
@@ -0,0 +1,372 @@
+import warnings
+import numpy
+
+from coopihc.base.State import State
+from coopihc.base.utils import StateNotContainedError, StateNotContainedWarning
+from coopihc.bundle.Bundle import Bundle
+
+
+def _leaves(state, path=()):
+    """Iterate over (path, leaf) pairs of a (possibly nested) State."""
+    for key, value in state.items():
+        if isinstance(value, State):
+            yield from _leaves(value, path + (key,))
+        else:
+            yield path + (key,), value
+
+
+def _lookup(state, path):
+    for key in path:
+        state = state[key]
+    return state
+
+
+def batched_method(obj, name):
+    """batched_method
+
+    Return the batched counterpart ``<name>_batch`` of method ``name`` of ``obj``, if ``obj`` opted into the batched protocol. A component opts in when the class that defines ``<name>_batch`` is at least as specialized as the class that defines ``name``; this way a subclass that redefines e.g. ``observe`` without redefining ``observe_batch`` is correctly detected as not batched.
+
+    :param obj: component (task, agent, engine or policy)
+    :type obj: object
+    :param name: name of the serial method, e.g. "observe"
+    :type name: string
+    :return: bound batched method, or None if the component did not opt in
+    :rtype: method or None
+    """
+    batch_name = name + "_batch"
+    mro = type(obj).__mro__
+    owner = next((k for k in mro if name in k.__dict__), None)
+    batch_owner = next((k for k in mro if batch_name in k.__dict__), None)
+    if batch_owner is None:
+        return None
+    if owner is not None and not issubclass(batch_owner, owner):
+        return None
+    return getattr(obj, batch_name)
+
+
+class BatchedBundle:
+    """BatchedBundle
+
+    Steps N independent games in lockstep. The game state of the N games is held in a single :py:class:`State<coopihc.base.State.State>`, whose leaves are plain numpy arrays with a leading batch axis of size N (instead of StateElements). One call to ``step`` plays one round for all N games, with a handful of array operations per turn instead of N Python-level rounds.
+
+    .. code-block:: python
+
+        bundle = BatchedBundle(
+            task=SimplePointingTask(gridsize=31, number_of_targets=8),
+            user=CarefulPointer(error_rate=0.05),
+            assistant=ConstantCDGain(1),
+            n=1000,
+        )
+        bundle.reset()
+        game_state, rewards, is_done = bundle.step()
+        # is_done is a boolean array of shape (1000,)
+
+    Components drive the batched game state by opting into a batched protocol, where each batched method receives and returns arrays with a leading batch axis:
+
+        * task: ``on_user_action_batch(game_state, user_action)`` and ``on_assistant_action_batch(game_state, assistant_action)``, which modify ``game_state["task_state"]`` in place and return (rewards, is_done) arrays. Optionally ``reset_batch(game_state, mask)``.
+        * observation engine: ``observe_batch(game_state)`` which returns (observation, rewards)
+        * inference engine: ``infer_batch(observation, agent_state)`` which returns (agent_state, rewards)
+        * policy: ``sample_batch(observation, agent_state, n=1)`` which returns (actions, rewards)
+        * agent: optionally ``reset_batch(game_state, mask)``
+
+    Resets are rare compared to steps, so components that do not provide ``reset_batch`` are reset game by game with their serial ``reset`` method. The per-turn methods have no such fallback: a ``NotImplementedError`` is raised at initialization if one of them is missing.
+
+    Finished games are automatically reset at the end of the round in which they finished (``auto_reset=True``). The ``is_done`` flags returned by ``step`` mark those games.
+
+    .. note::
+
+        Games are always played from turn 0 (``go_to`` is not supported), and actions are always sampled from the agents' policies.
+
+    :param n: number of games
+    :type n: int
+    :param task: A task that inherits from ``InteractionTask``
+    :type task: :py:class:`coopihc.interactiontask.InteractionTask.InteractionTask`
+    :param user: a user which inherits from ``BaseAgent``, defaults to None
+    :type user: :py:class:`coopihc.agents.BaseAgent.BaseAgent`, optional
+    :param assistant: an assistant which inherits from ``BaseAgent``, defaults to None
+    :type assistant: :py:class:`coopihc.agents.BaseAgent.BaseAgent`, optional
+    :param auto_reset: whether finished games are reset automatically, defaults to True
+    :type auto_reset: bool, optional
+    """
+
+    reward_keys = Bundle.reward_keys
+
+    def __init__(
+        self,
+        *args,
+        n=1,
+        task=None,
+        user=None,
+        assistant=None,
+        auto_reset=True,
+        **kwargs,
+    ):
+        self.n = n
+        self.auto_reset = auto_reset
+
+        # The serial bundle connects components together (finit, bundle references) and serves as a template for the batched game state, as well as a scratch game for the serial reset fallback.
+        self.bundle = Bundle(*args, task=task, user=user, assistant=assistant, **kwargs)
+        self.task = self.bundle.task
+        self.user = self.bundle.user
+        self.assistant = self.bundle.assistant
+        name = self.bundle.kwargs.get("name")
+        self._has_user = "no-user" not in name
+        self._has_assistant = "no-assistant" not in name
+
+        self._paths = []
+        self._spaces = {}
+        self._modes = {}
+        self.game_state = State()
+        for path, leaf in _leaves(self.bundle.game_state):
+            self._paths.append(path)
+            self._spaces[path] = leaf.space
+            self._modes[path] = leaf.out_of_bounds_mode
+            substate = self.game_state
+            for key in path[:-1]:
+                if key not in substate:
+                    dict.__setitem__(substate, key, State())
+                substate = substate[key]
+            dict.__setitem__(
+                substate,
+                path[-1],
+                numpy.repeat(numpy.asarray(leaf)[numpy.newaxis, ...], n, axis=0).astype(
+                    leaf.dtype
+                ),
+            )
+        for key in ["user_state", "assistant_state", "user_action", "assistant_action"]:
+            if key not in self.game_state:
+                dict.__setitem__(self.game_state, key, State())
+
+        self.observations = {"user": None, "assistant": None}
+        self._check_batched_protocol()
+
+    def _check_batched_protocol(self):
+        missing = []
+        required = []
+        if self._has_user:
+            required += [
+                (self.task, "on_user_action"),
+                (self.user.observation_engine, "observe"),
+                (self.user.inference_engine, "infer"),
+                (self.user.policy, "sample"),
+            ]
+        if self._has_assistant:
+            required += [
+                (self.task, "on_assistant_action"),
+                (self.assistant.observation_engine, "observe"),
+                (self.assistant.inference_engine, "infer"),
+                (self.assistant.policy, "sample"),
+            ]
+        for component, name in required:
+            if batched_method(component, name) is None:
+                missing.append(f"{type(component).__name__}.{name}_batch")
+        if missing:
+            raise NotImplementedError(
+                "The following components do not implement the batched protocol: {}".format(
+                    ", ".join(missing)
+                )
+            )
+
+    def __repr__(self):
+        return "{}(n={})\n{}".format(self.__class__.__name__, self.n, self.bundle)
+
+    @property
+    def state(self):
+        return self.game_state
+
+    # ============================ Serial fallback
+    def _load(self, i):
+        """Copy game i into the game state of the serial bundle."""
+        template = self.bundle.game_state
+        for path in self._paths:
+            _lookup(template, path).view(numpy.ndarray)[...] = _lookup(
+                self.game_state, path
+            )[i]
+
+    def _store(self, i):
+        """Copy the game state of the serial bundle into game i."""
+        template = self.bundle.game_state
+        for path in self._paths:
+            _lookup(self.game_state, path)[i] = _lookup(template, path)
+
+    def _reset_component(self, component, mask, serial_reset):
+        reset_batch = batched_method(component, "reset")
+        if reset_batch is not None:
+            reset_batch(self.game_state, mask)
+            return
+        for i in numpy.flatnonzero(mask):
+            self._load(i)
+            serial_reset()
+            self._store(i)
+
+    # ============================ Reset
+    def reset(self, dic={}, mask=None):
+        """reset
+
+        Reset the games selected by ``mask`` (all games by default). Values of the reset dictionnary (same structure as for :py:meth:`BaseBundle.reset<coopihc.bundle.BaseBundle.BaseBundle.reset>`) are broadcasted to all reset games.
+
+        :param dic: reset dictionnary, defaults to {}
+        :type dic: dict, optional
+        :param mask: boolean array of shape (N,) that selects the games to reset, defaults to None (all games)
+        :type mask: numpy.ndarray, optional
+        :return: batched game state
+        :rtype: :py:class:`State<coopihc.base.State.State>`
+        """
+        if mask is None:
+            mask = numpy.ones((self.n,), dtype=bool)
+        if not mask.any():
+            return self.game_state
+
+        self._reset_component(
+            self.task, mask, lambda: self.task._base_reset(dic=None, random=False)
+        )
+        self._reset_component(
+            self.user, mask, lambda: self.user._base_reset(dic=None, random=False)
+        )
+        self._reset_component(
+            self.assistant,
+            mask,
+            lambda: self.assistant._base_reset(dic=None, random=False),
+        )
+
+        for substate, subdic in dic.items():
+            for key, value in subdic.items():
+                self.game_state[substate][key][mask] = numpy.asarray(value)
+
+        self.game_state["game_info"]["turn_index"][mask] = 0
+        self.game_state["game_info"]["round_index"][mask] = 0
+        return self.game_state
+
+    # ============================ Step
+    def _validate(self, substate):
+        """Apply each leaf's out_of_bounds_mode to the batched values of a substate."""
+        for key, value in self.game_state[substate].items():
+            path = (substate, key)
+            mode = self._modes.get(path)
+            if mode in (None, "silent", "raw"):
+                continue
+            space = self._spaces[path]
+            if space.contains_batch(value).all():
+                continue
+            if mode == "clip":
+                numpy.clip(value, space.low, space.high, out=value)
+            elif mode == "error":
+                raise StateNotContainedError(
+                    "Values of {} are not contained in corresponding space {}".format(
+                        path, space
+                    )
+                )
+            elif mode == "warning":
+                warnings.warn(
+                    StateNotContainedWarning(
+                        "Warning: values of {} are not contained in corresponding space {}".format(
+                            path, space
+                        )
+                    )
+                )
+
+    def _agent_step(self, agent):
+        observation, obs_reward = batched_method(agent.observation_engine, "observe")(
+            self.game_state
+        )
+        self.observations[agent.role] = observation
+        agent_state = self.game_state["{}_state".format(agent.role)]
+        new_state, infer_reward = batched_method(agent.inference_engine, "infer")(
+            observation, agent_state
+        )
+        if new_state is not agent_state:
+            for key, value in new_state.items():
+                if key in agent_state:
+                    numpy.copyto(agent_state[key], value, casting="unsafe")
+            self._validate("{}_state".format(agent.role))
+        return obs_reward, infer_reward
+
+    def _take_action(self, agent):
+        action_state = self.game_state["{}_action".format(agent.role)]
+        actions, policy_reward = batched_method(agent.policy, "sample")(
+            self.observations[agent.role],
+            self.game_state["{}_state".format(agent.role)],
+            n=self.n,
+        )
+        if not isinstance(actions, tuple):
+            actions = (actions,)
+        for key, action in zip(action_state.keys(), actions):
+            value = action_state[key]
+            numpy.copyto(
+                value,
+                numpy.asarray(action).reshape(value.shape),
+                casting="unsafe",
+            )
+        self._validate("{}_action".format(agent.role))
+        return action_state, policy_reward
+
+    def _gather(self, mask):
+        return [
+            (_lookup(self.game_state, path), _lookup(self.game_state, path)[mask])
+            for path in self._paths
+        ]
+
+    def _scatter(self, mask, gathered):
+        for value, rows in gathered:
+            value[mask] = rows
+
+    def step(self):
+        """Play a round for all games
+
+        :return: batched game state, rewards (dict of arrays of shape (N,)), is_done flags (boolean array of shape (N,))
+        :rtype: tuple(:py:class:`State<coopihc.base.State.State>`, dict, numpy.ndarray)
+        """
+        game_info = self.game_state["game_info"]
+        rewards = {key: numpy.zeros((self.n,)) for key in self.reward_keys}
+        is_done = numpy.zeros((self.n,), dtype=bool)
+        frozen = None
+
+        if self._has_user:
+            game_info["turn_index"][...] = 0
+            (
+                rewards["user_observation_reward"][...],
+                rewards["user_inference_reward"][...],
+            ) = self._agent_step(self.user)
+            game_info["turn_index"][...] = 1
+            user_action, rewards["user_policy_reward"][...] = self._take_action(
+                self.user
+            )
+            task_reward, done = self.task.on_user_action_batch(
+                self.game_state, user_action
+            )
+            self._validate("task_state")
+            rewards["first_task_reward"][...] = task_reward
+            is_done |= numpy.asarray(done, dtype=bool)
+            if is_done.any():
+                # Games finished after the user action do not play the assistant turns
+                frozen = (is_done.copy(), self._gather(is_done))
+
+        game_info["turn_index"][...] = 2
+        if self._has_assistant:
+            (
+                rewards["assistant_observation_reward"][...],
+                rewards["assistant_inference_reward"][...],
+            ) = self._agent_step(self.assistant)
+            game_info["turn_index"][...] = 3
+            assistant_action, rewards["assistant_policy_reward"][...] = (
+                self._take_action(self.assistant)
+            )
+            task_reward, done = self.task.on_assistant_action_batch(
+                self.game_state, assistant_action
+            )
+            self._validate("task_state")
+            rewards["second_task_reward"][...] = task_reward
+            is_done |= numpy.asarray(done, dtype=bool)
+
+        game_info["round_index"][...] += 1
+        game_info["turn_index"][...] = 0
+        if frozen is not None:
+            mask, gathered = frozen
+            self._scatter(mask, gathered)
+            for key in self.reward_keys[4:]:
+                rewards[key][mask] = 0
+
+        if self.auto_reset and is_done.any():
+            self.reset(mask=is_done)
+
+        return self.game_state, rewards, is_done
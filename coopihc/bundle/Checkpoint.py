@@ -0,0 +1,27 @@
+class Checkpoint:
+    """Checkpoint
+
+    Saved state of a bundle, as returned by :py:meth:`Bundle.checkpoint<coopihc.bundle.BaseBundle.BaseBundle.checkpoint>` and passed to :py:meth:`Bundle.restore<coopihc.bundle.BaseBundle.BaseBundle.restore>`. A checkpoint can be restored any number of times.
+
+    :param values: values of all the StateElements of the game state, in a single structured array
+    :type values: numpy.ndarray
+    :param buffers: content of the inference engine buffer of each agent
+    :type buffers: list(tuple(inference engine, list))
+    :param rng_states: random generators and their states
+    :type rng_states: list(tuple(numpy.random.Generator, dict))
+    """
+
+    def __init__(self, values, buffers, rng_states):
+        self.values = values
+        self.buffers = buffers
+        self.rng_states = rng_states
+
+    def __repr__(self):
+        return "{}(nbytes={}, generators={})".format(
+            type(self).__name__, self.nbytes, len(self.rng_states)
+        )
+
+    @property
+    def nbytes(self):
+        """Size of the saved game state values in bytes"""
+        return self.values.nbytes
@@ -0,0 +1,133 @@
+import pickle
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy
+
+# Bundles built in this (worker) process, see _get_bundle
+_bundle_cache = OrderedDict()
+_bundle_cache_size = 8
+
+
+def _get_bundle(bundle_factory, parameters):
+    """Return a bundle built by ``bundle_factory(**parameters)``, reusing the one built for a previous job of this process with the same factory and parameters."""
+    key = pickle.dumps((bundle_factory, sorted(parameters.items())))
+    try:
+        _bundle_cache.move_to_end(key)
+        return _bundle_cache[key]
+    except KeyError:
+        pass
+    bundle = bundle_factory(**parameters)
+    _bundle_cache[key] = bundle
+    if len(_bundle_cache) > _bundle_cache_size:
+        _bundle_cache.popitem(last=False)
+    return bundle
+
+
+def _run_chunk(bundle_factory, chunk, max_rounds, record):
+    """Play the episodes of a chunk of jobs; executed in the worker processes."""
+    results = []
+    for index, (seed, dic, parameters) in chunk:
+        bundle = _get_bundle(bundle_factory, parameters or {})
+        if seed is not None:
+            bundle.seed(seed)
+            random.seed(seed)
+            numpy.random.seed(seed)
+        trajectory = bundle.rollout(max_rounds, record=record, dic=dic or {})
+        results.append((index, trajectory))
+    return results
+
+
+class ParallelRunner:
+    """ParallelRunner
+
+    Play many independent episodes over a pool of processes. Each job is a tuple (seed, reset dic, parameters): a bundle is built with ``bundle_factory(**parameters)``, seeded, reset with the reset dic (see :py:meth:`Bundle.reset<coopihc.bundle.BaseBundle.BaseBundle.reset>`) and played with :py:meth:`Bundle.rollout<coopihc.bundle.BaseBundle.BaseBundle.rollout>`. Trajectories are streamed back as jobs complete.
+
+    .. code-block:: python
+
+        def make_bundle(error_rate=0.05):
+            return Bundle(task=SimplePointingTask(), user=CarefulPointer(error_rate=error_rate))
+
+        runner = ParallelRunner(make_bundle, max_rounds=100, record=[("task_state", "position")])
+        jobs = [(seed, None, {"error_rate": e}) for seed in range(1000) for e in (0.01, 0.05)]
+        for index, trajectory in runner.run(jobs):
+            ...
+
+    Jobs are sent to the workers in chunks of ``chunksize`` jobs, to amortize the cost of inter-process communication. Each worker keeps the bundles it built, so that consecutive jobs with the same parameters reuse the same bundle (and agents) instead of rebuilding it.
+
+    .. note::
+
+        ``bundle_factory`` is sent to the workers, so it has to be picklable, e.g. a function defined at the top level of a module. Seeds are applied with :py:meth:`Bundle.seed<coopihc.bundle.BaseBundle.BaseBundle.seed>`, and to the ``random`` and ``numpy.random`` global generators for components that still sample from them. A job then gives the same trajectory whatever the number of workers.
+
+    :param bundle_factory: callable which returns a bundle, given the parameters of a job as keyword arguments
+    :type bundle_factory: callable
+    :param max_rounds: maximum number of rounds per episode
+    :type max_rounds: int
+    :param record: paths of the game state to record, see ``Bundle.rollout``, defaults to None
+    :type record: list(tuple), optional
+    :param max_workers: number of processes, defaults to None (number of processors). With 0, jobs are played in the current process.
+    :type max_workers: int, optional
+    :param chunksize: number of jobs sent to a worker at once, defaults to None (jobs are split evenly, with about 4 chunks per worker)
+    :type chunksize: int, optional
+    """
+
+    def __init__(
+        self, bundle_factory, max_rounds, record=None, max_workers=None, chunksize=None
+    ):
+        self.bundle_factory = bundle_factory
+        self.max_rounds = max_rounds
+        self.record = record
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+
+    def _chunks(self, jobs, workers):
+        jobs = list(enumerate(jobs))
+        chunksize = self.chunksize
+        if chunksize is None:
+            chunksize = max(1, -(-len(jobs) // (4 * workers)))
+        return [jobs[i : i + chunksize] for i in range(0, len(jobs), chunksize)]
+
+    def run(self, jobs):
+        """run
+
+        Play the jobs, and yield the trajectories as they are completed.
+
+        :param jobs: list of (seed, reset dic, parameters). The reset dic and parameters can be None.
+        :type jobs: iterable
+        :return: generator of (index of the job, trajectory)
+        :rtype: generator(tuple(int, :py:class:`Trajectory<coopihc.bundle.Trajectory.Trajectory>`))
+        """
+        if self.max_workers == 0:
+            for chunk in self._chunks(jobs, 1):
+                yield from _run_chunk(
+                    self.bundle_factory, chunk, self.max_rounds, self.record
+                )
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            chunks = self._chunks(jobs, executor._max_workers)
+            futures = [
+                executor.submit(
+                    _run_chunk, self.bundle_factory, chunk, self.max_rounds, self.record
+                )
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def map(self, jobs):
+        """map
+
+        Play the jobs, and return the trajectories in the order of the jobs.
+
+        :param jobs: list of (seed, reset dic, parameters). The reset dic and parameters can be None.
+        :type jobs: iterable
+        :return: trajectories
+        :rtype: list(:py:class:`Trajectory<coopihc.bundle.Trajectory.Trajectory>`)
+        """
+        jobs = list(jobs)
+        trajectories = [None] * len(jobs)
+        for index, trajectory in self.run(jobs):
+            trajectories[index] = trajectory
+        return trajectories
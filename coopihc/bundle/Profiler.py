@@ -0,0 +1,133 @@
+from time import perf_counter_ns
+
+
+class _Timer:
+    """Callable that times the calls to a method of a component. Installed as an instance attribute of the component, it shadows the method of the class.
+
+    The method is looked up on the class at each call, so that copies of the component call their own method.
+    """
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+        self.clear()
+
+    def clear(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        # bin i counts the calls that took between 2**(i-1) (included) and 2**i (excluded) nanoseconds
+        self.histogram = [0] * 64
+
+    def __call__(self, *args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return getattr(type(self.owner), self.name)(self.owner, *args, **kwargs)
+        finally:
+            duration = perf_counter_ns() - start
+            self.calls += 1
+            self.total_ns += duration
+            if self.min_ns is None or duration < self.min_ns:
+                self.min_ns = duration
+            if duration > self.max_ns:
+                self.max_ns = duration
+            self.histogram[min(duration.bit_length(), 63)] += 1
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.calls if self.calls else 0,
+            "min_ns": self.min_ns or 0,
+            "max_ns": self.max_ns,
+            "histogram": [
+                (2**i, count) for i, count in enumerate(self.histogram) if count
+            ],
+        }
+
+
+class Profiler:
+    """Profiler
+
+    Per-component timing of a bundle. When enabled, the methods that a bundle calls at each turn are timed with ``time.perf_counter_ns``:
+
+        * ``observe``, ``infer`` and ``take_action`` of the user and the assistant,
+        * ``base_on_user_action`` and ``base_on_assistant_action`` of the task.
+
+    Timing is done by installing a timer as an instance attribute of the components, which shadows the method of the class; disabling the profiler removes it. A disabled profiler thus has no overhead at all.
+
+    .. code-block:: python
+
+        bundle = Bundle(task=task, user=user, assistant=assistant, profile=True)
+        bundle.rollout(100)
+        bundle.stats()["assistant"]["infer"]["mean_ns"]
+
+    The profiler of a bundle is its ``profiler`` attribute, see :py:meth:`Bundle.stats<coopihc.bundle.BaseBundle.BaseBundle.stats>`.
+
+    :param bundle: profiled bundle
+    :type bundle: :py:class:`Bundle<coopihc.bundle.Bundle.Bundle>`
+    """
+
+    components = {
+        "user": ("observe", "infer", "take_action"),
+        "assistant": ("observe", "infer", "take_action"),
+        "task": ("base_on_user_action", "base_on_assistant_action"),
+    }
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self._timers = {}
+
+    @property
+    def enabled(self):
+        """Whether the profiler is enabled"""
+        return any(
+            getattr(self.bundle, role).__dict__.get(name) is timer
+            for (role, name), timer in self._timers.items()
+        )
+
+    def enable(self):
+        """enable
+
+        Start timing. Statistics accumulated before the profiler was disabled are kept, see ``clear``.
+        """
+        for role, names in self.components.items():
+            owner = getattr(self.bundle, role)
+            for name in names:
+                timer = self._timers.get((role, name))
+                if timer is None or timer.owner is not owner:
+                    # New profiler, or the component was replaced
+                    timer = _Timer(owner, name)
+                    self._timers[(role, name)] = timer
+                owner.__dict__[name] = timer
+
+    def disable(self):
+        """disable
+
+        Stop timing. The statistics are kept.
+        """
+        for (role, name), timer in self._timers.items():
+            if timer.owner.__dict__.get(name) is timer:
+                del timer.owner.__dict__[name]
+
+    def clear(self):
+        """clear
+
+        Reset the statistics.
+        """
+        for timer in self._timers.values():
+            timer.clear()
+
+    def stats(self):
+        """stats
+
+        Statistics for each timed method, by role ("user", "assistant" or "task"): number of calls, total, mean, min and max time in nanoseconds, and a histogram of the durations with bins growing by powers of two, given as a list of (upper bound in nanoseconds, number of calls).
+
+        :return: statistics
+        :rtype: dict
+        """
+        stats = {}
+        for (role, name), timer in self._timers.items():
+            stats.setdefault(role, {})[name] = timer.stats()
+        return stats
@@ -0,0 +1,204 @@
+import json
+import os
+
+import numpy
+
+from coopihc.base.StateElement import StateElement
+from coopihc.base.StateStore import StateStore
+from coopihc.bundle.Trajectory import Trajectory
+
+
+class Recorder:
+    """Recorder
+
+    Log every round of a bundle to disk, column by column. Each recorded StateElement of the game state (and each reward component) is appended to its own raw binary file, and a ``schema.json`` file describes the columns (path, file, dtype, shape and space of each StateElement) and the number of rounds written. Rows are accumulated in memory and written by chunks of ``chunk_size`` rounds, so that writing costs about one ``write`` per column and chunk.
+
+    .. code-block:: python
+
+        with Recorder("logs/run", paths=[("task_state", "position")]) as recorder:
+            bundle.recorder = recorder
+            for i in range(1000):
+                bundle.rollout(100)
+
+        trajectory = Recorder.load("logs/run")
+        trajectory["task_state/position"]  # numpy.memmap, shape (number of rounds,)
+
+    The bundle appends a row at the end of each round, and when the game finishes. The game_info round_index column can be used to split the log into episodes.
+
+    :param directory: directory where the log is written (created if needed). Files of a previous log in this directory are overwritten.
+    :type directory: str
+    :param paths: paths (tuples of keys) of the StateElements of the game state to record, defaults to None (all StateElements of the game state at the first round)
+    :type paths: list(tuple), optional
+    :param rewards: whether to record the reward components, defaults to True
+    :type rewards: bool, optional
+    :param chunk_size: number of rounds written at once, defaults to 4096
+    :type chunk_size: int, optional
+    """
+
+    schema_file = "schema.json"
+
+    def __init__(self, directory, paths=None, rewards=True, chunk_size=4096):
+        self.directory = directory
+        self.paths = None if paths is None else [tuple(path) for path in paths]
+        self.record_rewards = rewards
+        self.chunk_size = chunk_size
+        self.rounds = 0
+        self._n = 0
+        self._columns = None
+        self._schema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _file_name(path):
+        return ".".join(str(key) for key in path) + ".bin"
+
+    def _open(self, game_state, rewards):
+        """Resolve the recorded columns from the first round, and create the files."""
+        if self.paths is None:
+            paths = [
+                path
+                for path, value in StateStore._walk(game_state)
+                if isinstance(value, StateElement)
+            ]
+        else:
+            paths = self.paths
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._columns = []
+        self._rewards = []
+        schema = {"rounds": 0, "columns": [], "rewards": []}
+        for path in paths:
+            # Parent states are looked up once
+            parent = game_state
+            for key in path[:-1]:
+                parent = parent[key]
+            value = parent[path[-1]]
+            array = value.view(numpy.ndarray)
+            file_name = self._file_name(path)
+            chunk = numpy.empty((self.chunk_size,) + array.shape, dtype=array.dtype)
+            self._columns.append(
+                (parent, path[-1], chunk, open(self._full(file_name), "wb"))
+            )
+            schema["columns"].append(
+                {
+                    "path": list(path),
+                    "file": file_name,
+                    "dtype": array.dtype.str,
+                    "shape": list(array.shape),
+                    "space": None if value.space is None else value.space.serialize(),
+                }
+            )
+        if self.record_rewards and rewards is not None:
+            for key in rewards:
+                file_name = self._file_name(("rewards", key))
+                chunk = numpy.zeros((self.chunk_size,))
+                self._rewards.append((key, chunk, open(self._full(file_name), "wb")))
+                schema["rewards"].append(
+                    {"key": key, "file": file_name, "dtype": chunk.dtype.str}
+                )
+        self._schema = schema
+        self._write_schema()
+
+    def _full(self, file_name):
+        return os.path.join(self.directory, file_name)
+
+    def _write_schema(self):
+        self._schema["rounds"] = self.rounds
+        with open(self._full(self.schema_file), "w") as _file:
+            json.dump(self._schema, _file, default=str)
+
+    def append(self, game_state, rewards=None):
+        """append
+
+        Append a round. Called by the bundle, at the end of each round.
+
+        :param game_state: game state
+        :type game_state: :py:class:`State<coopihc.base.State.State>`
+        :param rewards: reward components, defaults to None
+        :type rewards: dict, optional
+        """
+        if self._columns is None:
+            self._open(game_state, rewards)
+        n = self._n
+        for parent, key, chunk, _file in self._columns:
+            chunk[n] = parent[key].view(numpy.ndarray)
+        for key, chunk, _file in self._rewards:
+            value = rewards[key]
+            chunk[n] = value.item() if hasattr(value, "item") else value
+        self._n = n + 1
+        if self._n == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """flush
+
+        Write the rounds held in memory to disk, and update the number of rounds in the schema. Readers see the log up to the last flush.
+        """
+        if self._columns is None or self._n == 0:
+            return
+        n = self._n
+        for parent, key, chunk, _file in self._columns:
+            chunk[:n].tofile(_file)
+            _file.flush()
+        for key, chunk, _file in self._rewards:
+            chunk[:n].tofile(_file)
+            _file.flush()
+        self.rounds += n
+        self._n = 0
+        self._write_schema()
+
+    def close(self):
+        """close
+
+        Flush and close the files.
+        """
+        if self._columns is None:
+            return
+        self.flush()
+        for parent, key, chunk, _file in self._columns:
+            _file.close()
+        for key, chunk, _file in self._rewards:
+            _file.close()
+        self._columns = None
+
+    @classmethod
+    def load(cls, directory):
+        """load
+
+        Open a log without reading or parsing it: columns are memory-mapped.
+
+        :param directory: directory of the log
+        :type directory: str
+        :return: recorded rounds, where each column is a read-only ``numpy.memmap``
+        :rtype: :py:class:`Trajectory<coopihc.bundle.Trajectory.Trajectory>`
+        """
+        with open(os.path.join(directory, cls.schema_file)) as _file:
+            schema = json.load(_file)
+        rounds = schema["rounds"]
+
+        def _map(file_name, dtype, shape):
+            if rounds == 0:
+                return numpy.empty((0,) + shape, dtype=dtype)
+            return numpy.memmap(
+                os.path.join(directory, file_name),
+                dtype=dtype,
+                mode="r",
+                shape=(rounds,) + shape,
+            )
+
+        columns = {
+            tuple(column["path"]): _map(
+                column["file"], column["dtype"], tuple(column["shape"])
+            )
+            for column in schema["columns"]
+        }
+        rewards = {
+            reward["key"]: _map(reward["file"], reward["dtype"], ())
+            for reward in schema["rewards"]
+        }
+        return Trajectory(columns, rewards, length=rounds)
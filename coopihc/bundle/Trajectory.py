@@ -0,0 +1,83 @@
+import numpy
+
+
+class Trajectory:
+    """Trajectory
+
+    Columnar record of an episode, as returned by :py:meth:`Bundle.rollout<coopihc.bundle.BaseBundle.BaseBundle.rollout>`. Each recorded state path is a numpy array whose first axis is the round, and each reward component is a 1D array. No State or StateElement is kept, so that many trajectories can be held and analysed cheaply.
+
+    .. code-block:: python
+
+        trajectory = bundle.rollout(100, record=[("task_state", "position")])
+        trajectory[("task_state", "position")]  # shape (len(trajectory),)
+        trajectory["task_state/position"]  # same
+        trajectory.rewards["first_task_reward"]  # shape (len(trajectory),)
+
+    The buffers are allocated for the maximum number of rounds; only the first ``len(trajectory)`` rows are exposed.
+
+    :param columns: preallocated buffers for each recorded path
+    :type columns: dict(tuple, numpy.ndarray)
+    :param rewards: preallocated buffers for each reward component
+    :type rewards: dict(str, numpy.ndarray)
+    :param length: number of rounds written to the buffers, defaults to 0
+    :type length: int, optional
+    :param is_done: whether the episode finished, defaults to False
+    :type is_done: bool, optional
+    """
+
+    def __init__(self, columns, rewards, length=0, is_done=False):
+        self._columns = columns
+        self._rewards = rewards
+        self.length = length
+        self.is_done = is_done
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return "{}(length={}, is_done={}, paths={})".format(
+            type(self).__name__, self.length, self.is_done, list(self._columns)
+        )
+
+    def __getitem__(self, path):
+        if isinstance(path, str):
+            path = tuple(path.split("/"))
+        return self._columns[path][: self.length]
+
+    def __contains__(self, path):
+        if isinstance(path, str):
+            path = tuple(path.split("/"))
+        return path in self._columns
+
+    def __getstate__(self):
+        # Only pickle the rows that were written
+        state = self.__dict__.copy()
+        state["_columns"] = self.columns
+        state["_rewards"] = self.rewards
+        return state
+
+    def keys(self):
+        """Recorded state paths"""
+        return self._columns.keys()
+
+    @property
+    def columns(self):
+        """Recorded state paths and their values"""
+        return {path: value[: self.length] for path, value in self._columns.items()}
+
+    @property
+    def rewards(self):
+        """Reward components and their values"""
+        return {key: value[: self.length] for key, value in self._rewards.items()}
+
+    @property
+    def total_rewards(self):
+        """Sum of all reward components, per round"""
+        return numpy.sum(list(self.rewards.values()), axis=0)
+
+    @property
+    def nbytes(self):
+        """Size of the buffers in bytes"""
+        return sum(value.nbytes for value in self._columns.values()) + sum(
+            value.nbytes for value in self._rewards.values()
+        )
@@ -60,6 +60,8 @@ class TrainGym(gym.Env):
     :type reset_dic: dict, optional
     :param reset_turn: During training, the bundle will be repeatedly reset. Pass the reset_turn here (see Bundle reset_turn mechanism), defaults to None, which selects either 1 if the user is trained else 3
     :type reset_turn: int, optional
+    :param reset_fast: During training, use the fast reset of the bundle, which does not randomize the states that are overwritten anyway by the reset dic or by the reset() methods of the components (see Bundle reset). The reset() methods of the components may then be called twice when they do not always write the same keys. Defaults to False
+    :type reset_fast: bool, optional
     """
 
     def __init__(
@@ -71,6 +73,7 @@ class TrainGym(gym.Env):
         observation_dict=None,
         reset_dic={},
         reset_turn=None,
+        reset_fast=False,
         filter_observation=None,
         **kwargs,
     ):
@@ -79,6 +82,7 @@ class TrainGym(gym.Env):
         self.bundle = bundle
         self.observation_dict = observation_dict
         self.reset_dic = reset_dic
+        self.reset_fast = reset_fast
         self.filter_observation = filter_observation
 
         if reset_turn is None:
@@ -178,7 +182,9 @@ class TrainGym(gym.Env):
         return gym.spaces.Dict(observation_dict)
 
     def reset(self):
-        self.bundle.reset(dic=self.reset_dic, go_to=self.reset_turn)
+        self.bundle.reset(
+            dic=self.reset_dic, go_to=self.reset_turn, fast=self.reset_fast
+        )
         if self.train_user and self.train_assistant:
             raise NotImplementedError
         if self.train_user:
@@ -1,10 +1,11 @@
 import coopihc
 from coopihc.agents.BaseAgent import BaseAgent
 from coopihc.policy.BIGDiscretePolicy import BIGDiscretePolicy
-from coopihc.inference.GoalInferenceWithUserPolicyGiven import (
-    GoalInferenceWithUserPolicyGiven,
+from coopihc.inference.LogGoalInferenceWithUserPolicyGiven import (
+    LogGoalInferenceWithUserPolicyGiven,
 )
 from coopihc.base.Space import Space
+from coopihc.base.State import State
 from coopihc.base.StateElement import StateElement
 from coopihc.base.elements import discrete_array_element, array_element, cat_element
 
@@ -40,25 +41,31 @@ class BIGGain(BaseAgent):
     def __init__(self):
 
         super().__init__(
-            "assistant", agent_inference_engine=GoalInferenceWithUserPolicyGiven()  #
+            "assistant", agent_inference_engine=LogGoalInferenceWithUserPolicyGiven()
         )
 
     def finit(self):
-        action_state = self.bundle.game_state["assistant_action"]
+        # The action states are not part of the game state yet at finit. A new action state is used, since assigning to the default one would keep its space.
+        action_state = State()
         action_state["action"] = discrete_array_element(
-            init=0, low=0, high=self.bundle.task.gridsize, out_of_bounds_mode="error"
+            init=0,
+            low=0,
+            high=self.bundle.task.gridsize - 1,
+            out_of_bounds_mode="error",
         )
 
         user_policy_model = copy.deepcopy(self.bundle.user.policy)
-        agent_policy = BIGDiscretePolicy(action_state, user_policy_model)
-        self.attach_policy(agent_policy)
-        self.inference_engine.attach_policy(user_policy_model)
+        agent_policy = BIGDiscretePolicy(
+            action_state, user_policy_model, tensorized=True
+        )
+        self._attach_policy(agent_policy)
+        self.inference_engine._attach_policy(user_policy_model)
 
         self.state["beliefs"] = array_element(
             init=1 / self.bundle.task.number_of_targets,
             low=numpy.zeros((self.bundle.task.number_of_targets,)),
             high=numpy.ones((self.bundle.task.number_of_targets,)),
-            out_of_bounds_more="error",
+            out_of_bounds_mode="error",
         )
 
     def reset(self, dic=None):
@@ -93,6 +100,15 @@ class BIGGain(BaseAgent):
 
         self.policy.attach_transition_function(transition_function)
 
+        def transition_function_batch(assistant_actions, observation):
+            """Same as transition_function, for all assistant actions at once"""
+            return {
+                ("assistant_action", "action"): assistant_actions.reshape(-1),
+                ("task_state", "position"): assistant_actions.reshape(-1),
+            }
+
+        self.policy.attach_transition_function_batch(transition_function_batch)
+
     def render(self, *args, **kwargs):
         mode = kwargs.get("mode")
         if mode is None:
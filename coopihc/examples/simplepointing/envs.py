@@ -58,18 +58,15 @@ class SimplePointingTask(InteractionTask):
         :meta public:
         """
         self.grid = [" " for i in range(self.gridsize)]
-        targets = sorted(
-            numpy.random.choice(
-                list(range(self.gridsize)), size=self.number_of_targets, replace=False
-            )
+        # Targets and starting position are distinct cells of the grid
+        cells = self.rng.choice(
+            self.gridsize, size=self.number_of_targets + 1, replace=False
         )
+        targets = numpy.sort(cells[:-1])
         for i in targets:
             self.grid[i] = "T"
         # Define starting position
-        copy = list(range(len(self.grid)))
-        for i in targets:
-            copy.remove(i)
-        position = int(numpy.random.choice(copy))
+        position = cells[-1]
         self.state["position"][...] = position
         self.state["targets"][...] = targets
 
@@ -118,6 +115,53 @@ class SimplePointingTask(InteractionTask):
 
         return self.state, 0, False
 
+    def reset_batch(self, game_state, mask):
+        """Batched reset, see :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`
+
+        Each game draws a random permutation of the grid: the first cells are the (sorted) targets and the next one is the starting position.
+
+        :meta public:
+        """
+        n = int(numpy.count_nonzero(mask))
+        permutations = numpy.argsort(self.rng.random((n, self.gridsize)), axis=1)
+        game_state["task_state"]["targets"][mask] = numpy.sort(
+            permutations[:, : self.number_of_targets], axis=1
+        )
+        game_state["task_state"]["position"][mask] = permutations[
+            :, self.number_of_targets
+        ]
+
+    def on_user_action_batch(self, game_state, user_action):
+        """Batched on_user_action, see :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`
+
+        :meta public:
+        """
+        is_done = (
+            game_state["task_state"]["position"] == game_state["user_state"]["goal"]
+        )
+        return -numpy.ones(is_done.shape), is_done
+
+    def on_assistant_action_batch(self, game_state, assistant_action):
+        """Batched on_assistant_action, see :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`
+
+        :meta public:
+        """
+        position = game_state["task_state"]["position"]
+        n = position.shape[0]
+
+        # Stopping condition if too many turns
+        is_done = game_state["game_info"]["round_index"] >= 50
+
+        _assistant_action = assistant_action["action"].reshape(n, -1)[:, 0]
+        if self.mode == "position":
+            new_position = _assistant_action
+        elif self.mode == "gain":
+            _user_action = game_state["user_action"]["action"].reshape(n, -1)[:, 0]
+            new_position = numpy.round(position + _user_action * _assistant_action)
+
+        position[~is_done] = new_position[~is_done]
+        return numpy.zeros((n,)), is_done
+
     def render(self, *args, mode="text"):
         """Render the task.
 
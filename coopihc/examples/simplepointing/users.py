@@ -93,6 +93,30 @@ class CarefulPointer(BaseAgent):
 
         agent_policy.attach_likelihood_function(compute_likelihood)
 
+        def compute_likelihood_batch(self, actions, observation, *args, **kwargs):
+            # Same cases as compute_likelihood, for all actions and observations at once
+            error_rate = kwargs.get("error_rate", 0)
+            direction = numpy.sign(
+                observation["user_state"]["goal"]
+                - observation["task_state"]["position"]
+            )[..., numpy.newaxis]
+            actions = numpy.sign(actions.reshape(-1))
+            return numpy.where(
+                direction == 0,
+                numpy.where(actions == 0, 1.0, 0.0),
+                numpy.where(
+                    actions == 0,
+                    0.0,
+                    numpy.where(actions == direction, 1 - error_rate, error_rate),
+                ),
+            )
+
+        agent_policy.attach_likelihood_function_batch(compute_likelihood_batch)
+        # The likelihood only depends on the goal and the position
+        agent_policy.memoize_likelihood(
+            [("user_state", "goal"), ("task_state", "position")]
+        )
+
         # ---------- Observation engine ------------
         observation_engine = RuleObservationEngine(
             deterministic_specification=base_user_engine_specification,
@@ -119,9 +143,12 @@ class CarefulPointer(BaseAgent):
         return self.bundle.task.state["targets"]
 
     def reset(self, dic=None):
-        index = numpy.random.randint(0, self.targets.size)
-        self.state["goal"] = discrete_array_element(
-            init=self.targets[index],
-            low=self.targets.space[index].low,
-            high=self.targets.space[index].high - 1,
-        )
+        index = self.rng.integers(0, self.targets.size)
+        self.state["goal"][...] = self.targets.view(numpy.ndarray)[index]
+
+    def reset_batch(self, game_state, mask):
+        targets = game_state["task_state"]["targets"][mask]
+        index = self.rng.integers(0, targets.shape[1], size=targets.shape[0])
+        game_state["user_state"]["goal"][mask] = targets[
+            numpy.arange(targets.shape[0]), index
+        ]
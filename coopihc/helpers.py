@@ -1,3 +1,6 @@
+import numpy
+
+
 def flatten(l):
     out = []
     try:
@@ -11,6 +14,57 @@ def flatten(l):
     return out
 
 
+def observation_arrays(observation, ndim=0):
+    """observation_arrays
+
+    Values of an observation (or any state) as plain numpy arrays, in nested dictionnaries with the same keys. This is the form in which observations are passed to batched likelihood functions (see :py:class:`ELLDiscretePolicy<coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`). Arrays are views on the values, not copies.
+
+    :param observation: observation
+    :type observation: :py:class:`State<coopihc.base.State.State>`
+    :param ndim: number of leading axes of size 1 added to each value (for broadcasting), defaults to 0
+    :type ndim: int, optional
+    :return: values
+    :rtype: dict
+    """
+    leading = (numpy.newaxis,) * ndim
+    arrays = {}
+    for substate, subvalue in observation.items():
+        if isinstance(subvalue, dict):
+            arrays[substate] = {
+                key: numpy.asarray(value)[leading] for key, value in subvalue.items()
+            }
+    return arrays
+
+
+def active_hypotheses(beliefs, threshold=None, top_k=None):
+    """active_hypotheses
+
+    Indices of the hypotheses tracked explicitly in sparse belief mode: those with a belief above ``threshold``, and among them at most the ``top_k`` most likely. The most likely hypothesis is always active. The other hypotheses are lumped together.
+
+    :param beliefs: beliefs
+    :type beliefs: numpy.ndarray
+    :param threshold: smallest belief of an active hypothesis, defaults to None (no threshold)
+    :type threshold: float, optional
+    :param top_k: largest number of active hypotheses, defaults to None (no limit)
+    :type top_k: int, optional
+    :return: sorted indices of the active hypotheses, or None if all hypotheses are active (dense mode, when neither threshold nor top_k is given)
+    :rtype: numpy.ndarray
+    """
+    if threshold is None and top_k is None:
+        return None
+    beliefs = numpy.asarray(beliefs).reshape(-1)
+    if threshold is None:
+        active = numpy.arange(beliefs.size)
+    else:
+        active = numpy.flatnonzero(beliefs >= threshold)
+    if top_k is not None and active.size > top_k:
+        # argpartition is linear in the number of hypotheses
+        active = active[numpy.argpartition(beliefs[active], -top_k)[-top_k:]]
+    if active.size == 0:
+        active = numpy.array([numpy.argmax(beliefs)])
+    return numpy.sort(active)
+
+
 def sort_two_lists(list1, list2, *args, **kwargs):
     try:
         key = args[0]
@@ -23,3 +77,20 @@ def sort_two_lists(list1, list2, *args, **kwargs):
         ]
 
     return sortedlist1, sortedlist2
+
+
+def spawn_seeds(seed, n):
+    """spawn_seeds
+
+    Derive ``n`` independent seeds from a single seed, see `numpy's SeedSequence <https://numpy.org/doc/stable/reference/random/bit_generators/generated/numpy.random.SeedSequence.html>`_.
+
+    :param seed: seed
+    :type seed: int, None or numpy.random.SeedSequence
+    :param n: number of seeds
+    :type n: int
+    :return: independent seeds
+    :rtype: list(numpy.random.SeedSequence)
+    """
+    if not isinstance(seed, numpy.random.SeedSequence):
+        seed = numpy.random.SeedSequence(seed)
+    return seed.spawn(n)
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+import numpy
 
 
 # Base Inference Engine: does nothing but return the same state. Any new inference method can subclass InferenceEngine to have a buffer and add_observation method (required by the bundle)
@@ -13,7 +14,8 @@ class BaseInferenceEngine:
 
     """"""
 
-    def __init__(self, *args, buffer_depth=1, **kwargs):
+    def __init__(self, *args, buffer_depth=1, seed=None, **kwargs):
+        self.rng = numpy.random.default_rng(seed)
         self.buffer = None
         self.buffer_depth = buffer_depth
         self.render_flag = None
@@ -159,6 +161,33 @@ class BaseInferenceEngine:
             except KeyError:
                 return {}, 0
 
+    def infer_batch(self, agent_observation, agent_state):
+        """infer_batch
+
+        Batched counterpart of ``infer``, used by :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`. By default, returns the agent state as observed, with a null reward.
+
+        :param agent_observation: batched observation
+        :type agent_observation: :py:class:`State<coopihc.base.State.State>`
+        :param agent_state: batched agent state
+        :type agent_state: :py:class:`State<coopihc.base.State.State>`
+        :return: (new batched internal state, reward)
+        :rtype: tuple(:py:class:`State<coopihc.base.State.State>`, float)
+        """
+        try:
+            return agent_observation["{}_state".format(self.host.role)], 0
+        except KeyError:
+            return agent_state, 0
+
+    def seed(self, seed):
+        """seed
+
+        Seed the engine's generator ``self.rng``, which should be used for all sampling done by the engine.
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        self.rng = numpy.random.default_rng(seed)
+
     def reset(self, random=True):
         """reset _summary_
 
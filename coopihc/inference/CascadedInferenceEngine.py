@@ -1,4 +1,5 @@
 from coopihc.inference.BaseInferenceEngine import BaseInferenceEngine
+from coopihc.helpers import spawn_seeds
 
 
 class CascadedInferenceEngine(BaseInferenceEngine):
@@ -52,6 +53,19 @@ class CascadedInferenceEngine(BaseInferenceEngine):
         for eng in self.engine_list:
             eng.add_observation(observation)
 
+    def seed(self, seed):
+        """seed
+
+        Seed this engine and each of the cascaded engines independently.
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        seeds = spawn_seeds(seed, len(self.engine_list) + 1)
+        super().seed(seeds[0])
+        for engine, engine_seed in zip(self.engine_list, seeds[1:]):
+            engine.seed(engine_seed)
+
     def __content__(self):
         return {
             self.__class__.__name__: {
@@ -1,4 +1,5 @@
 from coopihc.inference.BaseInferenceEngine import BaseInferenceEngine
+from coopihc.helpers import spawn_seeds
 
 # Base Inference Engine: does nothing but return the same state. Any new inference method can subclass InferenceEngine to have a buffer and add_observation method (required by the bundle)
 class DualInferenceEngine(BaseInferenceEngine):
@@ -45,6 +46,12 @@ class DualInferenceEngine(BaseInferenceEngine):
         self.primary_engine.host = value
         self.dual_engine.host = value
 
+    def seed(self, seed):
+        rng_seed, primary_seed, dual_seed = spawn_seeds(seed, 3)
+        super().seed(rng_seed)
+        self.primary_engine.seed(primary_seed)
+        self.dual_engine.seed(dual_seed)
+
     # Set mode to read-only
     @property
     def mode(self):
@@ -2,6 +2,7 @@ import numpy
 import copy
 
 from coopihc.base.State import State
+from coopihc.helpers import observation_arrays, active_hypotheses
 from coopihc.inference.BaseInferenceEngine import BaseInferenceEngine
 
 
@@ -61,6 +62,12 @@ class GoalInferenceWithUserPolicyGiven(BaseInferenceEngine):
 
             inference_engine.attach_set_theta(set_theta)
 
+        If the user policy model has a batched likelihood model (``compute_likelihood_batch``, see :py:class:`ELLDiscretePolicy <coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`), the likelihood is evaluated for all :math:`\theta`'s in a single call, on the observation values stacked along the goals, instead of building one candidate observation per :math:`\theta`.
+
+    - **Sparse beliefs**
+
+        For large goal sets, most of the belief mass usually sits on a few goals. In sparse mode (``belief_threshold`` or ``top_k`` given), only the active goals, whose belief is above ``belief_threshold`` (and at most the ``top_k`` most likely ones), are evaluated by the likelihood model. The other goals are lumped together, and the lump is updated as if the user action carried no information about them: its likelihood is uniform over the user actions, :math:`1/|Y|`. The relative beliefs of lumped goals are thus kept, and a lumped goal becomes active again as soon as its belief rises above the threshold. The cost of inference then scales with the number of active goals rather than with the number of goals.
+
 
     - **Render**
 
@@ -80,12 +87,21 @@ class GoalInferenceWithUserPolicyGiven(BaseInferenceEngine):
 
     :param user_policy_model: a model of the user policy, defaults to None
     :type user_policy_model: :py:class:`EELDiscretePolicy <coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`, optional
+    :param belief_threshold: in sparse mode, smallest belief of an active goal, defaults to None
+    :type belief_threshold: float, optional
+    :param top_k: in sparse mode, largest number of active goals, defaults to None
+    :type top_k: int, optional
 
     """
 
-    def __init__(self, *args, user_policy_model=None, **kwargs):
+    def __init__(
+        self, *args, user_policy_model=None, belief_threshold=None, top_k=None, **kwargs
+    ):
         super().__init__(*args, **kwargs)
 
+        self.belief_threshold = belief_threshold
+        self.top_k = top_k
+
         self._attach_policy(user_policy_model)
         self.render_tag = ["plot", "text"]
 
@@ -216,13 +232,70 @@ class GoalInferenceWithUserPolicyGiven(BaseInferenceEngine):
             )
 
         state = agent_observation["assistant_state"]
+        beliefs = state["beliefs"].view(numpy.ndarray).reshape(-1)
+
+        old_beliefs = [
+            belief * likelihood
+            for belief, likelihood in zip(
+                beliefs.tolist(), self._update_likelihoods(agent_observation, beliefs)
+            )
+        ]
+        return self._normalize(state, old_beliefs)
+
+    def active_goals(self, beliefs):
+        """active_goals
+
+        Indices of the goals evaluated by the likelihood model in sparse mode, see :py:func:`active_hypotheses<coopihc.helpers.active_hypotheses>`.
 
-        old_beliefs = state["beliefs"].tolist()
+        :param beliefs: beliefs
+        :type beliefs: numpy.ndarray
+        :return: sorted indices of the active goals, or None in dense mode
+        :rtype: numpy.ndarray
+        """
+        return active_hypotheses(beliefs, self.belief_threshold, self.top_k)
+
+    @property
+    def lumped_likelihood(self):
+        """Likelihood of the user action for lumped goals in sparse mode: uniform over the user actions"""
+        return 1 / len(self.user_policy_model.action_set)
+
+    def _update_likelihoods(self, agent_observation, beliefs):
+        """Likelihoods used to update the beliefs: those of the active goals, and the lumped likelihood for the others."""
+        goals = self.active_goals(beliefs)
+        if goals is None:
+            return self.likelihoods(agent_observation)
+        likelihoods = numpy.full((len(self.set_theta),), self.lumped_likelihood)
+        likelihoods[goals] = self.likelihoods(agent_observation, goals=goals)
+        return likelihoods
+
+    def likelihoods(self, agent_observation, goals=None):
+        """likelihoods
+
+        Likelihood of the last user action for each goal, given by the user policy model. Computed in a single call if the model has a batched likelihood, else on one candidate observation per goal.
+
+        :param agent_observation: observation
+        :type agent_observation: :py:class:`State<coopihc.base.State.State>`
+        :param goals: indices of the goals for which the likelihood is computed, defaults to None (all goals)
+        :type goals: iterable, optional
+        :return: likelihoods, in the order of the goals
+        :rtype: numpy.ndarray
+        """
         user_action = agent_observation["user_action"]["action"]
+        if goals is None:
+            set_theta = self.set_theta
+        else:
+            set_theta = [self.set_theta[i] for i in goals]
+
+        if hasattr(self.user_policy_model, "compute_likelihood_batch"):
+            likelihoods = self.user_policy_model.compute_likelihood_batch(
+                numpy.asarray(user_action)[numpy.newaxis],
+                self.stacked_observation(agent_observation, set_theta=set_theta),
+            )
+            return numpy.broadcast_to(likelihoods, (len(set_theta), 1))[:, 0]
 
-        for nt, t in enumerate(self.set_theta):
-            # candidate_observation = copy.copy(observation)
-            candidate_observation = copy.deepcopy(agent_observation)
+        likelihoods = []
+        for nt, t in enumerate(set_theta):
+            candidate_observation = agent_observation.fork()
             for key, value in t.items():
                 try:
                     candidate_observation[key[0]][key[1]] = value
@@ -231,15 +304,41 @@ class GoalInferenceWithUserPolicyGiven(BaseInferenceEngine):
                     _state[key[1]] = value
                     candidate_observation[key[0]] = _state
 
-            old_beliefs[nt] *= self.user_policy_model.compute_likelihood(
-                user_action, candidate_observation
+            likelihoods.append(
+                self.user_policy_model.compute_likelihood(
+                    user_action, candidate_observation
+                )
+            )
+        return numpy.asarray(likelihoods, dtype=numpy.float64).reshape(-1)
+
+    def stacked_observation(self, agent_observation, set_theta=None):
+        """stacked_observation
+
+        Observation values for all goals, as passed to a batched likelihood model: the values of the observation with a leading axis of size 1, where the values given by the goals are replaced by their stack along that axis.
+
+        :param agent_observation: observation
+        :type agent_observation: :py:class:`State<coopihc.base.State.State>`
+        :param set_theta: goals, defaults to None (all goals)
+        :type set_theta: list, optional
+        :return: stacked observation
+        :rtype: dict
+        """
+        if set_theta is None:
+            set_theta = self.set_theta
+        stacked = observation_arrays(agent_observation, ndim=1)
+        for substate, key in set_theta[0]:
+            stacked.setdefault(substate, {})[key] = numpy.stack(
+                [numpy.asarray(t[(substate, key)]) for t in set_theta]
             )
+        return stacked
 
+    def _normalize(self, state, old_beliefs):
         if sum(old_beliefs) == 0:
             print(
                 "warning: beliefs sum up to 0 after updating. I'm resetting to uniform to continue behavior. You should check if the behavior model makes sense. Here are the latest results from the model"
             )
             old_beliefs = [1 for i in old_beliefs]
-        new_beliefs = [i / sum(old_beliefs) for i in old_beliefs]
+        total = sum(old_beliefs)
+        new_beliefs = [i / total for i in old_beliefs]
         state["beliefs"] = numpy.array(new_beliefs)
         return state, 0
@@ -0,0 +1,97 @@
+import warnings
+
+import numpy
+
+from coopihc.inference.BaseInferenceEngine import BaseInferenceEngine
+from coopihc.inference.GoalInferenceWithUserPolicyGiven import (
+    GoalInferenceWithUserPolicyGiven,
+)
+
+
+class LogGoalInferenceWithUserPolicyGiven(GoalInferenceWithUserPolicyGiven):
+    """LogGoalInferenceWithUserPolicyGiven
+
+    Same Bayesian goal inference as :py:class:`GoalInferenceWithUserPolicyGiven <coopihc.inference.GoalInferenceWithUserPolicyGiven.GoalInferenceWithUserPolicyGiven>` (and same usage), computed in log space:
+
+    .. math::
+
+        \\log P(\\Theta = \\theta | X=x, Y=y) = \\log p(Y = y | \\Theta = \\theta, X=x) + \\log P(\\Theta = \\theta) - \\log \\sum_{\\Theta} p(Y=y|\\Theta = \\theta, X=x) P(\\Theta = \\theta)
+
+    The log beliefs are kept by the engine as a numpy vector, and normalized with a log-sum-exp, so that beliefs which underflow to 0 in the 'beliefs' substate are still ranked correctly, however long the episode. The 'beliefs' substate is updated in place with the normalized beliefs. If it was modified by something else than the engine since the last inference (e.g. when the agent is reset, or the bundle restored from a checkpoint), the log beliefs start again from it.
+
+    The likelihood is evaluated for all goals in a single call if the user policy model has a batched likelihood model (``compute_likelihood_batch``, see :py:class:`ELLDiscretePolicy <coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`), on views of the observation values. Otherwise, it is evaluated on one candidate observation per goal.
+
+    Sparse mode (``belief_threshold``, ``top_k``) is also available. Active goals are selected on the beliefs, so that a goal whose belief underflows to 0 is never active with a positive threshold.
+
+    If no goal is compatible with the user action (all likelihoods are 0), a ``RuntimeWarning`` is issued and the beliefs are reset to uniform.
+
+    :param user_policy_model: a model of the user policy, defaults to None
+    :type user_policy_model: :py:class:`EELDiscretePolicy <coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`, optional
+    :param belief_threshold: in sparse mode, smallest belief of an active goal, defaults to None
+    :type belief_threshold: float, optional
+    :param top_k: in sparse mode, largest number of active goals, defaults to None
+    :type top_k: int, optional
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._log_beliefs = None
+        self._beliefs = None
+
+    @property
+    def log_beliefs(self):
+        """Log beliefs after the last inference, None before the first inference"""
+        return self._log_beliefs
+
+    def reset(self, random=True):
+        """reset
+
+        Empty the buffer and forget the log beliefs.
+
+        :param random: see BaseInferenceEngine, defaults to True
+        :type random: bool, optional
+        """
+        super().reset(random=random)
+        self._log_beliefs = None
+        self._beliefs = None
+
+    @BaseInferenceEngine.default_value
+    def infer(self, agent_observation=None):
+        """infer
+
+        Update the substate 'beliefs' with the likelihood of the last user action for each goal.
+
+        :return: (new internal state, reward)
+        :rtype: tuple(:py:class:`State<coopihc.base.State.State>`, float)
+        """
+        if self.user_policy_model is None:
+            raise RuntimeError(
+                "This inference engine requires a likelihood-based model of an user policy to function."
+            )
+
+        state = agent_observation["assistant_state"]
+        beliefs = state["beliefs"]
+        values = beliefs.view(numpy.ndarray).reshape(-1)
+
+        with numpy.errstate(divide="ignore"):
+            if self._beliefs is None or not numpy.array_equal(values, self._beliefs):
+                self._log_beliefs = numpy.log(values)
+            log_beliefs = self._log_beliefs + numpy.log(
+                self._update_likelihoods(agent_observation, values)
+            )
+
+        log_max = log_beliefs.max()
+        if not numpy.isfinite(log_max):
+            warnings.warn(
+                "Beliefs sum up to 0 after updating, resetting them to uniform. You should check if the user model makes sense.",
+                RuntimeWarning,
+            )
+            log_beliefs = numpy.zeros(log_beliefs.shape)
+            log_max = 0
+        # log-sum-exp
+        log_beliefs -= log_max + numpy.log(numpy.exp(log_beliefs - log_max).sum())
+
+        self._log_beliefs = log_beliefs
+        beliefs[...] = numpy.exp(log_beliefs).reshape(beliefs.shape)
+        self._beliefs = beliefs.view(numpy.ndarray).reshape(-1).copy()
+        return state, 0
@@ -190,11 +190,11 @@ class ClassicControlTask(InteractionTask):
 
         # Generate noise samples
         if self.noise == "on":
-            beta, gamma = numpy.random.normal(0, numpy.sqrt(self.timestep), (2, 1))
-            omega = numpy.random.normal(0, numpy.sqrt(self.timestep), (self.dim, 1))
+            beta, gamma = self.rng.normal(0, numpy.sqrt(self.timestep), (2, 1))
+            omega = self.rng.normal(0, numpy.sqrt(self.timestep), (self.dim, 1))
         else:
-            beta, gamma = numpy.random.normal(0, 0, (2, 1))
-            omega = numpy.random.normal(0, 0, (self.dim, 1))
+            beta, gamma = self.rng.normal(0, 0, (2, 1))
+            omega = self.rng.normal(0, 0, (self.dim, 1))
 
         # Store last_x for render
         self.state_last_x = copy.copy(_x)
@@ -4,6 +4,7 @@
 from abc import ABC, abstractmethod
 from coopihc.base.State import State
 from coopihc.base.StateElement import StateElement
+from coopihc.helpers import spawn_seeds
 import numpy
 
 
@@ -41,6 +42,9 @@ class InteractionTask(ABC):
         self.bundle = None
         self.timestep = 0.1
         self._parameters = {}
+        self.rng = numpy.random.default_rng()
+        # Keys of the state overwritten by reset(), see State.fast_reset
+        self._reset_covered = None
 
         # Render
         self.ax = None
@@ -48,6 +52,18 @@ class InteractionTask(ABC):
     def finit(self):
         return
 
+    def seed(self, seed):
+        """seed
+
+        Seed the task's generator ``self.rng``, which should be used for all sampling done by the task, as well as the spaces of the task state.
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        rng_seed, state_seed = spawn_seeds(seed, 2)
+        self.rng = numpy.random.default_rng(rng_seed)
+        self.state.seed(state_seed)
+
     @property
     def turn_number(self):
         """Turn number.
@@ -149,23 +165,38 @@ class InteractionTask(ABC):
         :meta public:
         """
 
-    def _base_reset(self, dic=None, random=True):
+    def _base_reset(self, dic=None, random=True, fast=False):
         """base reset
 
         Method that wraps the user defined reset() method. Takes care of the
         dictionary reset mechanism and updates rounds.
 
+        In fast mode, the keys of the state whose values are changed by reset() are recorded. At the next resets, only the other states that are not forced by the reset dictionnary are randomized (see :py:meth:`State.fast_reset<coopihc.base.State.State.fast_reset>`). If reset() does not always write the same keys, reset() may be called twice.
+
         :param dic: reset dictionary (passed by bundle),
         :type dic: dictionary, optional
         :param random: whether to randomize task states, defaults to True
         :type random: boolean, optional
+        :param fast: whether to skip randomizing states that are overwritten anyway, defaults to False
+        :type fast: boolean, optional
         """
 
-        if random:
-            # Reset everything randomly before  starting
-            self.state.reset(dic={})
-        # Apply end-user defined reset
-        self.reset(dic=dic)
+        if not fast:
+            if random:
+                # Reset everything randomly before  starting
+                self.state.reset(dic={})
+            # Apply end-user defined reset
+            self.reset(dic=dic)
+        else:
+            skip = ()
+            if dic and self._reset_covered is not None:
+                skip = {key for key, value in dic.items() if value is not None}
+            self._reset_covered = self.state.fast_reset(
+                lambda: self.reset(dic=dic),
+                self._reset_covered,
+                skip=skip,
+                random=random,
+            )
 
         if not dic:
             return
@@ -15,12 +15,15 @@ class PipeTaskWrapper(InteractionTask, ABC):
     :type task: :py:class:`InteractionTask<coopihc.interactiontask.InteractionTask.InteractionTask`
     :param pipe: pipe
     :type pipe: subprocess.Pipe
+    :param codec: binary codec used to encode actions, defaults to None (actions are sent as JSON-compatible dictionnaries, see ``StateElement.serialize``). With a codec, the "value" of action messages is the binary encoding of the action state, which the other end decodes with its own codec (see :py:class:`StateCodec<coopihc.base.StateCodec.StateCodec>`). Only use this with peers that can decode it.
+    :type codec: :py:class:`StateCodec<coopihc.base.StateCodec.StateCodec>`, optional
     """
 
-    def __init__(self, task, pipe):
+    def __init__(self, task, pipe, codec=None):
         self.__dict__ = task.__dict__
         self.task = task
         self.pipe = pipe
+        self.codec = codec
         self.pipe.send({"type": "init", "parameters": self.parameters})
         is_done = False
         while True:
@@ -84,6 +87,11 @@ class PipeTaskWrapper(InteractionTask, ABC):
         """
         pass
 
+    def _serialize_action(self, key):
+        if self.codec is not None:
+            return self.codec.encode(self.bundle.game_state[key])
+        return self.bundle.game_state[key]["action"].serialize()
+
     def on_user_action(self, *args, **kwargs):
         """on_user_action
 
@@ -99,7 +107,7 @@ class PipeTaskWrapper(InteractionTask, ABC):
         super().on_user_action(*args, **kwargs)
         user_action_msg = {
             "type": "user_action",
-            "value": self.bundle.game_state["user_action"]["action"].serialize(),
+            "value": self._serialize_action("user_action"),
         }
         self.pipe.send(user_action_msg)
         self.pipe.poll(None)
@@ -119,7 +127,7 @@ class PipeTaskWrapper(InteractionTask, ABC):
         super().on_assistant_action(*args, **kwargs)
         assistant_action_msg = {
             "type": "assistant_action",
-            "value": self.bundle.game_state["assistant_action"]["action"].serialize(),
+            "value": self._serialize_action("assistant_action"),
         }
         self.pipe.send(assistant_action_msg)
         self.pipe.poll(None)
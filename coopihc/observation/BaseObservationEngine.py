@@ -116,6 +116,16 @@ class BaseObservationEngine:
         """
         return copy.deepcopy(game_state), 0
 
+    def seed(self, seed):
+        """seed
+
+        Seed the engine's generator ``self.rng``, which should be used for all sampling done by the engine.
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        self.rng = numpy.random.default_rng(seed)
+
     def reset(self, random=True):
         """reset _summary_
 
@@ -1,4 +1,5 @@
 from coopihc.observation.BaseObservationEngine import BaseObservationEngine
+from coopihc.helpers import spawn_seeds
 import copy
 
 
@@ -18,6 +19,19 @@ class CascadedObservationEngine(BaseObservationEngine):
         super().__init__(*args, **kwargs)
         self.engine_list = engine_list
 
+    def seed(self, seed):
+        """seed
+
+        Seed this engine and each of the cascaded engines independently.
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        seeds = spawn_seeds(seed, len(self.engine_list) + 1)
+        super().seed(seeds[0])
+        for engine, engine_seed in zip(self.engine_list, seeds[1:]):
+            engine.seed(engine_seed)
+
     def __content__(self):
         """__content__
 
@@ -1,7 +1,14 @@
 from coopihc.base.State import State
+from coopihc.base.StateElement import StateElement
 from coopihc.observation.BaseObservationEngine import BaseObservationEngine
-from coopihc.observation.utils import base_task_engine_specification
+from coopihc.observation.utils import (
+    base_task_engine_specification,
+    LinearRule,
+    GaussianNoiseRule,
+)
 import copy
+import numpy
+import warnings
 
 
 class RuleObservationEngine(BaseObservationEngine):
@@ -129,6 +136,14 @@ class RuleObservationEngine(BaseObservationEngine):
 
         This observation engine handles deep copies, to make sure operations based on observations don't mess up the actual states. This might be slow though.
 
+    The mapping is compiled into a plan on first use (see ``compile_mapping``). Rules given as :py:class:`LinearRule<coopihc.observation.utils.LinearRule>` and :py:class:`GaussianNoiseRule<coopihc.observation.utils.GaussianNoiseRule>` are compiled into a matrix product and a transform of a single standard normal sample drawn for all noise rules at once, instead of one Python call (and one multivariate normal draw) per rule. Compiled rules also work on batched game states (see ``observe_batch``); other callables are applied as usual.
+
+    In incremental mode (``incremental=True``), the observation tree and its StateElements are allocated once, on the first call. Later calls copy the new values into them in place, and skip the elements whose source in the game state has not been written to since the last call (see ``StateElement._version``). Elements with extra rules are always recomputed. Since the same observation object is returned on each call, incremental mode is disabled (with a warning) if the host's inference engine keeps more than one observation in its buffer.
+
+    .. note::
+
+        Writes are tracked when they go through a StateElement (``x[...] = value``, ``x += value``), a view obtained from it (``x[0:2][...] = value``; handing out the view counts as a write) or a State (``state[key] = value``, ``state[key] += value``). Writes that bypass these, e.g. ``numpy.copyto(x, value)`` or writes to ``x.view(numpy.ndarray)``, are not seen; call ``invalidate()`` after those.
+
 
     :param deterministic_specification: deterministic rules, defaults to base_task_engine_specification
     :type deterministic_specification: list(tuples), optional
@@ -138,6 +153,8 @@ class RuleObservationEngine(BaseObservationEngine):
     :type extraprobabilisticrules: dict, optional
     :param mapping: mapping, defaults to None
     :type mapping: iterable, optional
+    :param incremental: whether to reuse the observation object between calls, defaults to False
+    :type incremental: bool, optional
     """
 
     def __init__(
@@ -147,6 +164,7 @@ class RuleObservationEngine(BaseObservationEngine):
         extradeterministicrules={},
         extraprobabilisticrules={},
         mapping=None,
+        incremental=False,
         **kwargs
     ):
         super().__init__(*args, **kwargs)
@@ -154,6 +172,19 @@ class RuleObservationEngine(BaseObservationEngine):
         self.extradeterministicrules = extradeterministicrules
         self.extraprobabilisticrules = extraprobabilisticrules
         self.mapping = mapping
+        self.incremental = incremental
+        self._plan = None
+        self._plan_mapping = None
+        self.invalidate()
+
+    def invalidate(self):
+        """invalidate
+
+        Drop the observation reused in incremental mode, so that it is fully recomputed on the next call.
+        """
+        self._observation = None
+        self._observed_state = None
+        self._sources = None
 
     # @BaseObservationEngine.get_params
     @BaseObservationEngine.default_value
@@ -169,68 +200,280 @@ class RuleObservationEngine(BaseObservationEngine):
         """
         if self.mapping is None:
             self.mapping = self.create_mapping(game_state)
+        if self.incremental and self._check_incremental():
+            return self.apply_mapping_incremental(game_state), 0
         obs = self.apply_mapping(game_state)
         return obs, 0
 
-    def apply_mapping(self, game_state):
-        """apply_mapping
-
-        Apply the rule mapping
+    def _check_incremental(self):
+        try:
+            buffer_depth = self.host.inference_engine.buffer_depth
+        except AttributeError:
+            return True
+        if buffer_depth > 1:
+            warnings.warn(
+                "The inference engine of {} keeps {} observations in its buffer, but an incremental RuleObservationEngine reuses the same observation object. Incremental mode is disabled.".format(
+                    type(self.host).__name__, buffer_depth
+                )
+            )
+            self.incremental = False
+            return False
+        return True
+
+    def apply_mapping_incremental(self, game_state):
+        """apply_mapping_incremental
+
+        Apply the rule mapping, reusing the observation produced by the previous call. See the incremental mode in the class documentation.
 
         :param game_state: game state
         :type game_state: :py:class:`State <coopihc.base.State.State>`
         :return: observation
         :rtype: :py:class:`State <coopihc.base.State.State>`
         """
-        observation = State()
-        for (
+        if self._observation is None or game_state is not self._observed_state:
+            return self._build_incremental(game_state)
+
+        observation = self._observation
+        for n, (
             substate,
             subsubstate,
-            _slice,
-            _func,
-            _args,
-            _nfunc,
-            _nargs,
-        ) in self.mapping:
+            source,
+            version,
+            index,
+            has_rules,
+        ) in enumerate(self._sources):
+            try:
+                value = game_state[substate][subsubstate]
+            except KeyError:
+                continue
+            if value is source and value._version == version and not has_rules:
+                continue
+            target = observation[substate][subsubstate]
+            if has_rules:
+                _obs = self._apply_entry(game_state, self.mapping[n])
+            else:
+                _obs = value.view(numpy.ndarray)[index]
+            if _obs.shape != target.shape or value is not source:
+                # The source element was replaced, possibly with another space
+                if not has_rules:
+                    _obs = value[index, {"space": True}]
+                target = _obs.copy()
+                dict.__setitem__(observation[substate], subsubstate, target)
+            else:
+                numpy.copyto(target.view(numpy.ndarray), _obs, casting="unsafe")
+            self._sources[n] = (
+                substate,
+                subsubstate,
+                value,
+                value._version,
+                index,
+                has_rules,
+            )
+        return observation
 
+    def _build_incremental(self, game_state):
+        observation = State()
+        sources = []
+        for entry in self.mapping:
+            substate, subsubstate, _slice, _func, _args, _nfunc, _nargs = entry
             if observation.get(substate) is None:
                 observation[substate] = State()
             try:
-                _obs = game_state[substate][subsubstate][_slice, {"space": True}]
-            except IndexError:  # 0-D arrays
-                _obs = game_state[substate][subsubstate][..., {"space": True}]
+                value = game_state[substate][subsubstate]
             except KeyError:  # If incomplete state is passed
                 continue
+            try:
+                value.view(numpy.ndarray)[_slice]
+                index = _slice
+            except IndexError:  # 0-D arrays
+                index = Ellipsis
+            _obs = self._apply_entry(game_state, entry)
+            # Own copy, updated in place on later calls
+            dict.__setitem__(observation[substate], subsubstate, _obs.copy())
+            sources.append(
+                (
+                    substate,
+                    subsubstate,
+                    value,
+                    value._version,
+                    index,
+                    bool(_func or _nfunc),
+                )
+            )
+        self._observation = observation
+        self._observed_state = game_state
+        self._sources = sources
+        return observation
 
-            copied = False
-            if _func:
+    def _apply_entry(self, game_state, entry):
+        substate, subsubstate, _slice, _func, _args, _nfunc, _nargs = entry
+        try:
+            _obs = game_state[substate][subsubstate][_slice, {"space": True}]
+        except IndexError:  # 0-D arrays
+            _obs = game_state[substate][subsubstate][..., {"space": True}]
+        if _func:
+            _obs = copy.copy(_obs)
+            if _args:
+                _obs = _func(_obs, game_state, *_args)
+            else:
+                _obs = _func(_obs, game_state)
+        if _nfunc:
+            if not _func:
                 _obs = copy.copy(_obs)
-                copied = True
-                if _args:
-                    _obs = _func(_obs, game_state, *_args)
-                else:
-                    _obs = _func(_obs, game_state)
+            if isinstance(_nfunc, GaussianNoiseRule):
+                # Drawn with the engine's generator, for seeded runs
+                _obs = _nfunc(_obs, game_state, *(_nargs or ()), rng=self.rng)
+            elif _nargs:
+                _obs = _nfunc(_obs, game_state, *_nargs)
             else:
-                _obs = _obs
-            if _nfunc:
-                if copied == False:
-                    _obs = copy.copy(_obs)
-                if _nargs:
-                    _obs = _nfunc(_obs, game_state, *_nargs)
+                _obs = _nfunc(_obs, game_state)
+        return _obs
+
+    def compile_mapping(self):
+        """compile_mapping
+
+        Compile the mapping into a plan. Each entry of the plan is
+
+        (substate, subsubstate, _slice, matrix, noise, offset, entry)
 
+        where ``matrix`` is the matrix of a :py:class:`LinearRule<coopihc.observation.utils.LinearRule>` (or None), ``noise`` is a :py:class:`GaussianNoiseRule<coopihc.observation.utils.GaussianNoiseRule>` (or None) which uses the standard normal samples ``z[offset: offset + noise.dim]``, and ``entry`` is the original mapping entry if it holds rules that can not be compiled (or None). The plan is recompiled whenever the mapping is replaced.
+
+        :return: (plan, total dimension of the noise)
+        :rtype: tuple(list, int)
+        """
+        if self._plan is not None and self._plan_mapping is self.mapping:
+            return self._plan
+        plan = []
+        noise_dim = 0
+        for entry in self.mapping:
+            substate, subsubstate, _slice, _func, _args, _nfunc, _nargs = entry
+            if (_func and not isinstance(_func, LinearRule)) or (
+                _nfunc and not isinstance(_nfunc, GaussianNoiseRule)
+            ):
+                plan.append((substate, subsubstate, _slice, None, None, 0, entry))
+                continue
+            matrix = _func.C if _func else None
+            noise = _nfunc if _nfunc else None
+            plan.append((substate, subsubstate, _slice, matrix, noise, noise_dim, None))
+            if noise is not None:
+                noise_dim += noise.dim
+        self._plan = (plan, noise_dim)
+        self._plan_mapping = self.mapping
+        return self._plan
+
+    def apply_mapping(self, game_state):
+        """apply_mapping
+
+        Apply the rule mapping
+
+        :param game_state: game state
+        :type game_state: :py:class:`State <coopihc.base.State.State>`
+        :return: observation
+        :rtype: :py:class:`State <coopihc.base.State.State>`
+        """
+        plan, noise_dim = self.compile_mapping()
+        if noise_dim:
+            z = self.rng.standard_normal(noise_dim)
+        observation = State()
+        for substate, subsubstate, _slice, matrix, noise, offset, entry in plan:
+            if observation.get(substate) is None:
+                observation[substate] = State()
+            try:
+                if entry is not None:
+                    _obs = self._apply_entry(game_state, entry)
                 else:
-                    _obs = _nfunc(_obs, game_state)
+                    try:
+                        _obs = game_state[substate][subsubstate][
+                            _slice, {"space": True}
+                        ]
+                    except IndexError:  # 0-D arrays
+                        _obs = game_state[substate][subsubstate][
+                            ..., {"space": True}
+                        ]
+            except KeyError:  # If incomplete state is passed
+                continue
 
-            else:
-                _obs = _obs
+            if matrix is not None or noise is not None:
+                value = _obs.view(numpy.ndarray)
+                if matrix is not None:
+                    value = matrix @ value
+                if noise is not None:
+                    value = value + noise.noise(
+                        z[offset : offset + noise.dim], value.shape
+                    )
+                value = numpy.asarray(value).view(StateElement)
+                value.space = _obs.space
+                value.out_of_bounds_mode = _obs.out_of_bounds_mode
+                _obs = value
 
-            # observation[substate][subsubstate] = copy.copy(
-            #     game_state[substate][subsubstate]
-            # ) # probably useless
             observation[substate][subsubstate] = _obs
 
         return observation
 
+    def observe_batch(self, game_state):
+        """observe_batch
+
+        Batched counterpart of ``observe``, used by :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`. The leaves of ``game_state`` are arrays with a leading batch axis. The mapping is created from the serial game state of the bundle.
+
+        .. note::
+
+            Only compiled rules (see ``compile_mapping``) are supported in batched mode.
+
+        :param game_state: batched game state
+        :type game_state: :py:class:`State <coopihc.base.State.State>`
+        :return: (batched observation, obs reward)
+        :rtype: tuple(:py:class:`State <coopihc.base.State.State>`, float)
+        """
+        if self.mapping is None:
+            self.mapping = self.create_mapping(self.host.bundle.game_state)
+        return self.apply_mapping_batch(game_state), 0
+
+    def apply_mapping_batch(self, game_state):
+        """apply_mapping_batch
+
+        Apply the rule mapping to a batched game state. Slices and rules are applied after the batch axis; the standard normal samples used by all noise rules are drawn in one call.
+
+        :param game_state: batched game state
+        :type game_state: :py:class:`State <coopihc.base.State.State>`
+        :return: batched observation
+        :rtype: :py:class:`State <coopihc.base.State.State>`
+        """
+        plan, noise_dim = self.compile_mapping()
+        z = None
+        observation = State()
+        for substate, subsubstate, _slice, matrix, noise, offset, entry in plan:
+            if entry is not None:
+                raise NotImplementedError(
+                    "Rules of RuleObservationEngine are not supported in batched mode unless they can be compiled ({}, {})".format(
+                        substate, subsubstate
+                    )
+                )
+            try:
+                value = game_state[substate][subsubstate]
+            except KeyError:  # If incomplete state is passed
+                continue
+            if observation.get(substate) is None:
+                observation[substate] = State()
+            if value.ndim > 1:
+                value = value[:, _slice]
+            if matrix is None and noise is None:
+                dict.__setitem__(observation[substate], subsubstate, value.copy())
+                continue
+            if matrix is not None:
+                if value.ndim == 2:  # one vector per game
+                    value = value @ matrix.T
+                else:
+                    value = matrix @ value
+            if noise is not None:
+                if z is None:
+                    z = self.rng.standard_normal((value.shape[0], noise_dim))
+                value = value + noise.noise(
+                    z[:, offset : offset + noise.dim], value.shape[1:]
+                )
+            dict.__setitem__(observation[substate], subsubstate, value)
+
+        return observation
+
     def create_mapping(self, game_state):
         """create_mapping
 
@@ -29,6 +29,9 @@ class WrapAsObservationEngine(BaseObservationEngine):
     def game_state(self):
         return self.bundle.game_state
 
+    def seed(self, seed):
+        self.bundle.seed(seed)
+
     def reset(self, *args, **kwargs):
         return self.bundle.reset(*args, **kwargs)
 
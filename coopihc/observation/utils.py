@@ -47,3 +47,95 @@ base_assistant_engine_specification = [
     ("user_action", "all"),
     ("assistant_action", "all"),
 ]
+
+
+# ========================== Some rules that can be compiled
+
+
+class LinearRule:
+    """LinearRule
+
+    Deterministic rule that observes a linear combination :math:`y = Cx` of a StateElement. Equivalent to the function
+
+    .. code-block:: python
+
+        def linear_combination(_obs, game_state, C):
+            return C @ _obs
+
+    but can be compiled by the :py:class:`RuleObservationEngine<coopihc.observation.RuleObservationEngine.RuleObservationEngine>` into a matrix product, also applied to batched game states.
+
+    .. code-block:: python
+
+        extradeterministicrules = {("task_state", "x"): (LinearRule(C), ())}
+
+    :param C: observation matrix
+    :type C: numpy.ndarray
+    """
+
+    def __init__(self, C):
+        self.C = numpy.asarray(C)
+
+    def __call__(self, _obs, game_state, *args):
+        return self.C @ _obs
+
+
+class GaussianNoiseRule:
+    """GaussianNoiseRule
+
+    Probabilistic rule that adds Gaussian noise :math:`D\\epsilon, \\epsilon \\sim \\mathcal{N}(\\mu, \\Sigma)` to a StateElement. The square root of the covariance is computed once, so that drawing noise only takes a standard normal sample. The :py:class:`RuleObservationEngine<coopihc.observation.RuleObservationEngine.RuleObservationEngine>` compiles these rules so that a single standard normal sample is drawn for all of them.
+
+    .. code-block:: python
+
+        extraprobabilisticrules = {
+            ("task_state", "x"): (GaussianNoiseRule(D, mu, sigma), ())
+        }
+
+    :param D: noise matrix
+    :type D: numpy.ndarray
+    :param mu: mean of :math:`\\epsilon`, defaults to None (zero mean)
+    :type mu: numpy.ndarray, optional
+    :param sigma: covariance of :math:`\\epsilon`, defaults to None (identity)
+    :type sigma: numpy.ndarray, optional
+    """
+
+    def __init__(self, D, mu=None, sigma=None):
+        self.D = numpy.atleast_2d(numpy.asarray(D))
+        dim = self.D.shape[1]
+        if mu is None:
+            mu = numpy.zeros((dim,))
+        if sigma is None:
+            sigma = numpy.eye(dim)
+        self.mu = numpy.asarray(mu, dtype=numpy.float64).reshape(-1)
+        self.sigma = numpy.asarray(sigma, dtype=numpy.float64)
+        try:
+            self.L = numpy.linalg.cholesky(self.sigma)
+        except numpy.linalg.LinAlgError:  # positive semi-definite
+            w, v = numpy.linalg.eigh(self.sigma)
+            self.L = v * numpy.sqrt(numpy.clip(w, 0, None))
+
+    @property
+    def dim(self):
+        """Dimension of :math:`\\epsilon`"""
+        return self.mu.shape[0]
+
+    def noise(self, z, shape):
+        """noise
+
+        Transform standard normal samples into noise.
+
+        :param z: standard normal samples, with shape (dim,) or (n, dim)
+        :type z: numpy.ndarray
+        :param shape: shape of the noise, for one sample
+        :type shape: tuple
+        :return: noise with shape ``shape`` or (n,) + ``shape``
+        :rtype: numpy.ndarray
+        """
+        epsilon = self.mu + z @ self.L.T
+        return (epsilon @ self.D.T).reshape(z.shape[:-1] + tuple(shape))
+
+    def __call__(self, _obs, game_state, *args, rng=None):
+        """Add noise, drawn with ``rng`` (the observation engine passes its own generator), or with numpy's global generator if None."""
+        if rng is None:
+            rng = numpy.random
+        z = rng.standard_normal(self.dim)
+        return _obs + self.noise(z, _obs.shape)
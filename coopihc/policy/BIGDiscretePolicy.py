@@ -4,7 +4,7 @@ import copy
 
 from coopihc.base.Space import Space
 from coopihc.base.State import State
-from coopihc.helpers import sort_two_lists
+from coopihc.helpers import observation_arrays, active_hypotheses
 from coopihc.policy.BasePolicy import BasePolicy
 
 
@@ -32,7 +32,31 @@ class BIGDiscretePolicy(BasePolicy):
         * attach_set_theta, to specify the potential goal states
         * attach_transition_function, to specify how the task state evolves after an assistant action
 
+    In tensorized mode (``tensorized=True``), the likelihoods :math:`p(Y=y|X=x, \\Theta = \\theta)` of all user actions y, for all assistant actions x and all goals :math:`\\theta`, are computed once per turn into a tensor P[x, theta, y] (see ``likelihood_tensor``), and all information gains are computed from it with NumPy reductions, instead of evaluating each likelihood twice per information gain. If a batched transition function and a batched likelihood function are attached (``attach_transition_function_batch``, ``attach_likelihood_function_batch``), the tensor is computed with a single call to each, without building one observation per (x, theta) pair:
 
+    .. code-block:: python
+
+        def transition_function_batch(assistant_actions, observation):
+            # assistant_actions has shape (number of assistant actions, ...)
+            return {
+                ("assistant_action", "action"): assistant_actions.reshape(-1),
+                ("task_state", "position"): assistant_actions.reshape(-1),
+            }
+
+        def likelihood_function_batch(user_actions, observation):
+            # observation values broadcast to shape (x, theta) + value shape
+            goal = observation["user_state"]["goal"][..., numpy.newaxis]
+            position = observation["task_state"]["position"][..., numpy.newaxis]
+            # returns shape (x, theta, y)
+            return numpy.where(
+                numpy.sign(goal - position) == user_actions.reshape(-1), 1, 0
+            )
+
+        policy = BIGDiscretePolicy(action_state, user_policy_model, tensorized=True)
+        policy.attach_transition_function_batch(transition_function_batch)
+        policy.attach_likelihood_function_batch(likelihood_function_batch)
+
+    In sparse mode (``belief_threshold`` or ``top_k`` given), only the active goals, whose belief is above ``belief_threshold`` (and at most the ``top_k`` most likely ones), are tracked explicitly. The other goals are lumped into a single hypothesis which holds their belief mass, and under which the user actions are uniformly distributed (the same lumping as in :py:class:`GoalInferenceWithUserPolicyGiven <coopihc.inference.GoalInferenceWithUserPolicyGiven.GoalInferenceWithUserPolicyGiven>`). Information gains are computed from the likelihood tensor of the active goals, extended with the lump, so that their cost scales with the number of active goals rather than with the number of goals.
 
 
     .. [1] Liu, Wanyu, et al. "Bignav: Bayesian information gain for guiding multiscale navigation." Proceedings of the 2017 CHI Conference on Human Factors in Computing Systems. 2017.
@@ -41,12 +65,31 @@ class BIGDiscretePolicy(BasePolicy):
     :type assistant_action_state: `State<coopihc.base.State.State>`
     :param user_policy_model: user policy model. This may be the real policy of the user, but realistically has to be a model of the user policy. This policy must currently be an `ELLDiscretePolicy<coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`.
     :type user_policy_model: ELLDiscretePolicy<coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`
+    :param threshold: belief above which the most likely goal is selected directly, defaults to 0.8
+    :type threshold: float, optional
+    :param tensorized: whether to compute the information gains from a likelihood tensor, defaults to False. Sparse mode always uses the tensor.
+    :type tensorized: bool, optional
+    :param belief_threshold: in sparse mode, smallest belief of an active goal, defaults to None
+    :type belief_threshold: float, optional
+    :param top_k: in sparse mode, largest number of active goals, defaults to None
+    :type top_k: int, optional
     """
 
     def __init__(
-        self, assistant_action_state, user_policy_model, *args, threshold=0.8, **kwargs
+        self,
+        assistant_action_state,
+        user_policy_model,
+        *args,
+        threshold=0.8,
+        tensorized=False,
+        belief_threshold=None,
+        top_k=None,
+        **kwargs
     ):
         self.threshold = threshold
+        self.tensorized = tensorized
+        self.belief_threshold = belief_threshold
+        self.top_k = top_k
         super().__init__(*args, action_state=assistant_action_state, **kwargs)
 
         self.assistant_action_set = Space.cartesian_product(
@@ -59,6 +102,11 @@ class BIGDiscretePolicy(BasePolicy):
         )[0]
 
         self.user_policy_likelihood_function = user_policy_model.compute_likelihood
+        self.transition_function_batch = None
+        # Batched likelihood of the user model, if it has one
+        self.likelihood_function_batch = getattr(
+            user_policy_model, "compute_likelihood_batch", None
+        )
 
     def attach_set_theta(self, set_theta):
         self.set_theta = set_theta
@@ -66,6 +114,26 @@ class BIGDiscretePolicy(BasePolicy):
     def attach_transition_function(self, trans_func):
         self.transition_function = trans_func
 
+    def attach_transition_function_batch(self, trans_func):
+        """attach_transition_function_batch
+
+        Attach a batched transition function, used in tensorized mode. It is called with the array of all assistant actions (one per row) and the current observation, and returns the observation entries that the actions change, as a dictionnary that maps (substate, key) paths to arrays with one row per action. The observation should not be modified.
+
+        :param trans_func: batched transition function
+        :type trans_func: function
+        """
+        self.transition_function_batch = trans_func
+
+    def attach_likelihood_function_batch(self, _function):
+        """attach_likelihood_function_batch
+
+        Attach a batched user likelihood function, used in tensorized mode. Defaults to the ``compute_likelihood_batch`` method of the user policy model, if it has one (see :py:class:`ELLDiscretePolicy<coopihc.policy.ELLDiscretePolicy.ELLDiscretePolicy>`). It is called with the array of all user actions (one per row) and a stacked observation: a dictionnary of dictionnaries of arrays, with the same keys as the observation, where each value has shape (x, theta) + the shape of the observation value, and where x and theta axes may have size 1 (broadcasting). It returns the likelihoods, an array that broadcasts to shape (x, theta, y).
+
+        :param _function: batched likelihood function
+        :type _function: function
+        """
+        self.likelihood_function_batch = _function
+
     def PYy_Xx(self, user_action, assistant_action, potential_states, beliefs):
         """:math:`P(Y=y|X=x)`
 
@@ -157,12 +225,19 @@ class BIGDiscretePolicy(BasePolicy):
         :rtype: [type]
         """
 
+        potential_states = self._potential_states(assistant_action, observation)
+        return self.HY__Xx(potential_states, assistant_action, beliefs) - self.HY__OoXx(
+            potential_states, beliefs
+        )
+
+    def _potential_states(self, assistant_action, observation, set_theta=None):
+        """Observations expected after the assistant action, one per goal state."""
+        if set_theta is None:
+            set_theta = self.set_theta
         observation = self.transition_function(assistant_action, observation)
         potential_states = []
-        for nt, t in enumerate(self.set_theta):
-            # Deepcopy would be safer, but copy should do. Deepcopy is much more expensive to produce.
-            # potential_state = copy.deepcopy(observation)
-            potential_state = copy.copy(observation)
+        for nt, t in enumerate(set_theta):
+            potential_state = observation.fork()
             for key, value in t.items():
                 try:
                     potential_state[key[0]][key[1]] = value
@@ -171,10 +246,127 @@ class BIGDiscretePolicy(BasePolicy):
                     _state[key[1]] = value
                     potential_state[key[0]] = _state
             potential_states.append(potential_state)
+        return potential_states
 
-        return self.HY__Xx(potential_states, assistant_action, beliefs) - self.HY__OoXx(
-            potential_states, beliefs
+    def stacked_observation(self, observation, set_theta=None):
+        """stacked_observation
+
+        Observation values for all (assistant action, goal) pairs, as passed to the batched likelihood function: the values of the observation, overwritten by those returned by the batched transition function (on axis x) and by the goal states (on axis theta). Values are broadcast, not copied: each value has shape (x, theta) + value shape, where the x and theta axes have size 1 if the value does not depend on them.
+
+        :param observation: current assistant observation
+        :type observation: `State<coopihc.base.State.State>`
+        :param set_theta: goal states, defaults to None (all goal states)
+        :type set_theta: list, optional
+        :return: stacked observation
+        :rtype: dict
+        """
+        if set_theta is None:
+            set_theta = self.set_theta
+        n_x = len(self.assistant_action_set)
+        n_theta = len(set_theta)
+        stacked = observation_arrays(observation, ndim=2)
+        transitions = self.transition_function_batch(
+            numpy.asarray(self.assistant_action_set), observation
+        )
+        for (substate, key), values in transitions.items():
+            values = numpy.asarray(values)
+            stacked.setdefault(substate, {})[key] = values.reshape(
+                (n_x, 1) + values.shape[1:]
+            )
+        for substate, key in set_theta[0]:
+            values = numpy.stack([numpy.asarray(t[(substate, key)]) for t in set_theta])
+            stacked.setdefault(substate, {})[key] = values.reshape(
+                (1, n_theta) + values.shape[1:]
+            )
+        return stacked
+
+    def likelihood_tensor(self, observation, set_theta=None):
+        """likelihood_tensor
+
+        Likelihood tensor P[x, theta, y] = :math:`p(Y=y|X=x, \\Theta = \\theta)`, for every assistant action x, goal state theta and user action y. Computed with a single call to the batched likelihood function if both batched functions are attached, else with one call to the likelihood function per (x, theta, y) triplet.
+
+        :param observation: current assistant observation
+        :type observation: `State<coopihc.base.State.State>`
+        :param set_theta: goal states, defaults to None (all goal states)
+        :type set_theta: list, optional
+        :return: likelihood tensor
+        :rtype: numpy.ndarray
+        """
+        if set_theta is None:
+            set_theta = self.set_theta
+        shape = (
+            len(self.assistant_action_set),
+            len(set_theta),
+            len(self.user_action_set),
         )
+        if (
+            self.transition_function_batch is not None
+            and self.likelihood_function_batch is not None
+        ):
+            P = self.likelihood_function_batch(
+                numpy.asarray(self.user_action_set),
+                self.stacked_observation(observation, set_theta=set_theta),
+            )
+            return numpy.broadcast_to(numpy.asarray(P, dtype=numpy.float64), shape)
+
+        P = numpy.empty(shape)
+        for nx, assistant_action in enumerate(self.assistant_action_set):
+            potential_states = self._potential_states(
+                assistant_action, observation, set_theta=set_theta
+            )
+            for nt, potential_state in enumerate(potential_states):
+                for ny, user_action in enumerate(self.user_action_set):
+                    P[nx, nt, ny] = self.user_policy_likelihood_function(
+                        user_action, potential_state
+                    )
+        return P
+
+    @staticmethod
+    def information_gains(P, beliefs):
+        """information_gains
+
+        Expected information gain :math:`\\mathrm{IG}(X=x) = H(Y |X=x) - H(Y |\\Theta = \\theta, X=x)` of every assistant action x, from the likelihood tensor.
+
+        :param P: likelihood tensor P[x, theta, y], see ``likelihood_tensor``
+        :type P: numpy.ndarray
+        :param beliefs: beliefs for each goal state
+        :type beliefs: numpy.ndarray
+        :return: information gain of each assistant action
+        :rtype: numpy.ndarray
+        """
+        beliefs = numpy.asarray(beliefs, dtype=numpy.float64).reshape(-1)
+        # P(Y=y|X=x)
+        PY_X = numpy.einsum("xty,t->xy", P, beliefs)
+        # convention: 0 log 0 = 0
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            PlogP = numpy.where(P > 0, P * numpy.log2(P), 0)
+            PY_XlogPY_X = numpy.where(PY_X > 0, PY_X * numpy.log2(PY_X), 0)
+        HY__Xx = -PY_XlogPY_X.sum(axis=-1)
+        HY__OoXx = -numpy.einsum("t,xty->x", beliefs, PlogP)
+        return HY__Xx - HY__OoXx
+
+    def sparse_information_gains(self, observation, beliefs, active):
+        """sparse_information_gains
+
+        Information gains of every assistant action in sparse mode, where the goals that are not active are lumped into a single hypothesis with uniform user action likelihoods.
+
+        :param observation: current assistant observation
+        :type observation: `State<coopihc.base.State.State>`
+        :param beliefs: beliefs for each goal state
+        :type beliefs: numpy.ndarray
+        :param active: indices of the active goal states
+        :type active: numpy.ndarray
+        :return: information gain of each assistant action
+        :rtype: numpy.ndarray
+        """
+        beliefs = numpy.asarray(beliefs, dtype=numpy.float64).reshape(-1)[active]
+        P = self.likelihood_tensor(
+            observation, set_theta=[self.set_theta[i] for i in active]
+        )
+        n_x, n_theta, n_y = P.shape
+        P = numpy.concatenate((P, numpy.full((n_x, 1, n_y), 1 / n_y)), axis=1)
+        beliefs = numpy.append(beliefs, max(1 - beliefs.sum(), 0))
+        return self.information_gains(P, beliefs)
 
     def find_best_action(self):
         """find_best_action
@@ -197,16 +389,25 @@ class BIGDiscretePolicy(BasePolicy):
         else:
             observation = self.observation
 
-        IG_storage = [
-            self.IG(action, observation, beliefs.squeeze().tolist())
-            for action in self.assistant_action_set
-        ]
+        active = active_hypotheses(beliefs, self.belief_threshold, self.top_k)
+        if active is not None:
+            IG_storage = self.sparse_information_gains(observation, beliefs, active)
+        elif self.tensorized:
+            IG_storage = self.information_gains(
+                self.likelihood_tensor(observation), beliefs.view(numpy.ndarray)
+            )
+        else:
+            IG_storage = numpy.array(
+                [
+                    self.IG(action, observation, beliefs.squeeze().tolist())
+                    for action in self.assistant_action_set
+                ]
+            )
 
-        _IG, action = sort_two_lists(
-            IG_storage, self.assistant_action_set, lambda pair: pair[0]
-        )
-        action.reverse(), _IG.reverse()
-        return action, _IG
+        # From the most to the least informative. Among equal information gains, the last action comes first.
+        order = numpy.argsort(IG_storage, kind="stable")[::-1]
+        action = [self.assistant_action_set[i] for i in order]
+        return action, IG_storage[order].tolist()
 
     @BasePolicy.default_value
     def sample(self, agent_observation=None, agent_state=None):
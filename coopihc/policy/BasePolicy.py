@@ -2,6 +2,7 @@ import numpy
 import copy
 
 from coopihc.base.State import State
+from coopihc.helpers import spawn_seeds
 from coopihc.base.elements import discrete_array_element, array_element, cat_element
 from coopihc.base.elements import cat_element
 
@@ -27,6 +28,7 @@ class BasePolicy:
 
         self.action_state = action_state
         self.host = None
+        self.rng = numpy.random.default_rng()
 
     # https://stackoverflow.com/questions/1015307/python-bind-an-unbound-method
     def _bind(self, func, as_name=None):
@@ -132,6 +134,18 @@ class BasePolicy:
         if random:
             self.action_state.reset()
 
+    def seed(self, seed):
+        """seed
+
+        Seed the policy's generator ``self.rng``, which should be used for all sampling done by the policy, as well as the spaces of the action state.
+
+        :param seed: seed
+        :type seed: int or numpy.random.SeedSequence
+        """
+        rng_seed, state_seed = spawn_seeds(seed, 2)
+        self.rng = numpy.random.default_rng(rng_seed)
+        self.action_state.seed(state_seed)
+
     def _base_sample(self, agent_observation=None, agent_state=None):
         action, reward = self.sample(
             agent_observation=agent_observation, agent_state=agent_state
@@ -154,6 +168,27 @@ class BasePolicy:
             self.action.reset()
         return self.action, 0
 
+    def sample_batch(self, agent_observation, agent_state, n=1):
+        """sample_batch
+
+        Batched counterpart of ``sample``, used by :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`. (Randomly) sample n actions from the action state.
+
+        :param agent_observation: batched observation
+        :type agent_observation: `State<coopihc.base.State.State>`
+        :param agent_state: batched agent state
+        :type agent_state: `State<coopihc.base.State.State>`
+        :param n: number of games, defaults to 1
+        :type n: int, optional
+        :return: (actions, action reward), where actions have a leading batch axis of size n. If the action state has several actions, a tuple of arrays is returned.
+        :rtype: (numpy.ndarray, float)
+        """
+        actions = tuple(
+            _action.space.sample(n) for _action in self.action_state.values()
+        )
+        if len(actions) == 1:
+            return actions[0], 0
+        return actions, 0
+
     def __repr__(self):
         try:
             return self.action_state.__str__()
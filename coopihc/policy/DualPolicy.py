@@ -1,6 +1,9 @@
 from coopihc.base.State import State
 from coopihc.base.elements import cat_element
 from coopihc.policy.BasePolicy import BasePolicy
+from coopihc.helpers import spawn_seeds
+
+import numpy
 
 
 # ============== General Policies ===============
@@ -33,6 +36,12 @@ class DualPolicy(BasePolicy):
     def mode(self):
         return self._mode
 
+    def seed(self, seed):
+        rng_seed, primary_seed, dual_seed = spawn_seeds(seed, 3)
+        self.rng = numpy.random.default_rng(rng_seed)
+        self.primary_policy.seed(primary_seed)
+        self.dual_policy.seed(dual_seed)
+
     @property
     def host(self):
         return self._host
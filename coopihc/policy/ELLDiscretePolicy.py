@@ -1,6 +1,8 @@
 import numpy
+from collections import OrderedDict
 from coopihc.policy.BasePolicy import BasePolicy
 from coopihc.base.Space import Space
+from coopihc.helpers import observation_arrays
 
 
 class BadlyDefinedLikelihoodError(Exception):
@@ -50,6 +52,25 @@ class ELLDiscretePolicy(BasePolicy):
 
         The signature of the likelihood model should be the same signature as a bound method (i.e. the first argument is self)
 
+    Likelihoods can be memoized: if the likelihood model only depends on a few entries of the observation, declare them with ``memoize_likelihood``. Likelihoods are then cached in an LRU cache keyed on the action and on the values of these entries, and so are the likelihoods of all actions computed by ``forward_summary``. Since the bound ``compute_likelihood`` is replaced by its memoized version, users of the model such as :py:class:`BIGDiscretePolicy<coopihc.policy.BIGDiscretePolicy.BIGDiscretePolicy>` and :py:class:`GoalInferenceWithUserPolicyGiven<coopihc.inference.GoalInferenceWithUserPolicyGiven.GoalInferenceWithUserPolicyGiven>` benefit from the cache as well.
+
+    .. code-block:: python
+
+        policy.attach_likelihood_function(likelihood_model)
+        policy.memoize_likelihood([("user_state", "goal"), ("task_state", "position")])
+
+    A batched likelihood model can be attached as well, with ``attach_likelihood_function_batch``. It computes the likelihoods of many actions, for many observations, at once. It is called with the array of actions (one action per row) and the observation values given as nested dictionnaries of numpy arrays (see :py:func:`observation_arrays<coopihc.helpers.observation_arrays>`), where each value may have extra leading (batch) axes, and should return the array of likelihoods with shape (batch shape) + (number of actions,), where the batch shape is the broadcast of the batch axes of the values. When it is present, it is used by ``forward_summary``, ``sample`` and ``sample_batch`` (which then samples all games at once), and by :py:class:`BIGDiscretePolicy<coopihc.policy.BIGDiscretePolicy.BIGDiscretePolicy>` and :py:class:`GoalInferenceWithUserPolicyGiven<coopihc.inference.GoalInferenceWithUserPolicyGiven.GoalInferenceWithUserPolicyGiven>`, which evaluate the likelihood for all goals at once. It should give the same likelihoods as the likelihood model. For the model above:
+
+    .. code-block:: python
+
+        def likelihood_model_batch(self, actions, observation, *args, **kwargs):
+            probabilities = numpy.array(
+                [1 / 7, 1 / 7 + 0.05, 1 / 7 - 0.05, 1 / 7 + 0.1, 1 / 7 - 0.1, 1 / 7 + 0.075, 1 / 7 - 0.075]
+            )
+            return probabilities[actions.reshape(-1)]
+
+        policy.attach_likelihood_function_batch(likelihood_model_batch)
+
     :param action_state: See the BasePolicy keyword argument with the same name
     :type action_state: See the BasePolicy keyword argument with the same name
     :param seed: seed for the RNG
@@ -61,16 +82,111 @@ class ELLDiscretePolicy(BasePolicy):
         super().__init__(*args, action_state=action_state, **kwargs)
         self.explicit_likelihood = True
         self.rng = numpy.random.default_rng(seed)
+        self.likelihood_paths = None
+        self.likelihood_cache_size = None
+        self._action_set = None
 
     def attach_likelihood_function(self, _function):
         """attach_likelihood_function
 
-        Bind the likelihood model by calling BasePolicy's _bind method.
+        Bind the likelihood model by calling BasePolicy's _bind method. If the likelihood is memoized, the cache is cleared and the new model is memoized.
 
         :param _function: likelihood model to bind to the policy
         :type _function: function
         """
         self._bind(_function, "compute_likelihood")
+        if self.likelihood_paths is not None:
+            self._memoize()
+
+    def attach_likelihood_function_batch(self, _function):
+        """attach_likelihood_function_batch
+
+        Bind the batched likelihood model as ``compute_likelihood_batch``, see the class documentation.
+
+        :param _function: batched likelihood model to bind to the policy
+        :type _function: function
+        """
+        self._bind(_function, "compute_likelihood_batch")
+
+    def memoize_likelihood(self, paths, maxsize=4096):
+        """memoize_likelihood
+
+        Cache the likelihoods computed by the likelihood model. The model should be deterministic, and only depend on the action and on the observation entries given by ``paths``: likelihoods are cached by values of the action and of these entries. Calls with extra arguments are not cached.
+
+        :param paths: paths (substate, key) of the observation entries on which the likelihood depends
+        :type paths: list(tuple)
+        :param maxsize: maximum number of cached likelihoods, and of cached likelihood vectors (see ``forward_summary``), defaults to 4096
+        :type maxsize: int, optional
+        """
+        self.likelihood_paths = [tuple(path) for path in paths]
+        self.likelihood_cache_size = maxsize
+        if "compute_likelihood" in self.__dict__:
+            self._memoize()
+
+    def _memoize(self):
+        function = self.__dict__["compute_likelihood"]
+        if (
+            getattr(function, "__func__", None)
+            is ELLDiscretePolicy._memoized_likelihood
+        ):
+            function = self._likelihood_function
+        self._likelihood_function = function
+        self._likelihood_cache = OrderedDict()
+        self._summary_cache = OrderedDict()
+        self.compute_likelihood = self._memoized_likelihood
+
+    def _likelihood_key(self, observation):
+        return tuple(
+            numpy.asarray(observation[substate][key]).tobytes()
+            for substate, key in self.likelihood_paths
+        )
+
+    @staticmethod
+    def _lru_get(cache, key):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _lru_set(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.likelihood_cache_size:
+            cache.popitem(last=False)
+
+    def _memoized_likelihood(self, action, observation, *args, **kwargs):
+        if args or kwargs:
+            return self._likelihood_function(action, observation, *args, **kwargs)
+        key = (numpy.asarray(action).tobytes(),) + self._likelihood_key(observation)
+        value = self._lru_get(self._likelihood_cache, key)
+        if value is None:
+            value = self._likelihood_function(action, observation)
+            self._lru_set(self._likelihood_cache, key, value)
+        return value
+
+    @property
+    def action_set(self):
+        """All the actions of the action space, computed once per action space
+
+        :return: actions
+        :rtype: list(numpy.ndarray)
+        """
+        return self._actions()[0]
+
+    def _actions(self):
+        """The action set, as a list and as an array with one action per row."""
+        space = self.action_state["action"].space
+        if self._action_set is None or self._action_set[0] is not space:
+            actions = Space.cartesian_product(space)[0]
+            self._action_set = (space, list(actions), numpy.asarray(actions))
+        return self._action_set[1:]
+
+    def _check_likelihood(self, llh):
+        ACCEPTABLE_ERROR = 1e-13
+        error = numpy.abs(1 - numpy.sum(llh, axis=-1))
+        if numpy.any(error > ACCEPTABLE_ERROR):
+            raise BadlyDefinedLikelihoodError(
+                "Likelihood does not sum to 1: {}".format(llh)
+            )
 
     @BasePolicy.default_value
     def sample(self, agent_observation=None, agent_state=None):
@@ -85,31 +201,76 @@ class ELLDiscretePolicy(BasePolicy):
         """
 
         actions, llh = self.forward_summary(agent_observation)
-        action = actions[self.rng.choice(len(llh), p=llh)]
+        # copied, the action set is shared between calls
+        action = actions[self.rng.choice(len(llh), p=llh)].copy()
 
         return action, 0
 
+    def sample_batch(self, agent_observation, agent_state, n=1):
+        """sample_batch
+
+        Batched counterpart of ``sample``, used by :py:class:`BatchedBundle<coopihc.bundle.BatchedBundle.BatchedBundle>`. If a batched likelihood model is attached (see ``attach_likelihood_function_batch``), it is evaluated once on the whole batched observation, and the actions of all games are drawn at once by inverse transform sampling. Otherwise, the likelihood model is evaluated game by game, on the rows of the batched observation.
+
+        :param agent_observation: batched observation
+        :type agent_observation: `State<coopihc.base.State.State>`
+        :param agent_state: batched agent state
+        :type agent_state: `State<coopihc.base.State.State>`
+        :param n: number of games, defaults to 1
+        :type n: int, optional
+        :return: actions, reward
+        :rtype: tuple(numpy.ndarray, float)
+        """
+        if hasattr(self, "compute_likelihood_batch"):
+            actions, action_array = self._actions()
+            llh = numpy.broadcast_to(
+                self.compute_likelihood_batch(
+                    action_array, observation_arrays(agent_observation)
+                ),
+                (n, len(actions)),
+            )
+            self._check_likelihood(llh)
+            # Inverse transform sampling, one uniform draw per game
+            draws = self.rng.random((n, 1))
+            index = (numpy.cumsum(llh, axis=1) < draws).sum(axis=1)
+            return action_array[numpy.minimum(index, len(actions) - 1)], 0
+
+        sampled = []
+        for i in range(n):
+            observation = {
+                substate: {key: value[i] for key, value in subvalue.items()}
+                for substate, subvalue in agent_observation.items()
+            }
+            actions, llh = self.forward_summary(observation)
+            sampled.append(actions[self.rng.choice(len(llh), p=llh)])
+        return numpy.stack(sampled), 0
+
     def forward_summary(self, observation):
         """forward_summary
 
-        Compute the likelihood of each action, given the current observation
+        Compute the likelihood of each action, given the current observation, with the batched likelihood model if there is one. If the likelihood is memoized (see ``memoize_likelihood``), the likelihoods of all actions are cached together.
 
         :param observation: current agent observation
         :type observation: `State<coopihc.base.State.State>`
-        :return: [description]
-        :rtype: [type]
+        :return: actions (shared between calls, should not be modified) and their likelihoods
+        :rtype: tuple(list, list)
         """
-        llh, actions = [], []
-        action_stateelement = self.action_state["action"]
-        action_space = action_stateelement.space
+        actions = self.action_set
+        if self.likelihood_paths is not None:
+            key = self._likelihood_key(observation)
+            llh = self._lru_get(self._summary_cache, key)
+            if llh is not None:
+                return actions, list(llh)
 
-        for action in Space.cartesian_product(action_space)[0]:
-            llh.append(self.compute_likelihood(action, observation))
-            actions.append(action)
-        ACCEPTABLE_ERROR = 1e-13
-        error = abs(1 - sum(llh))
-        if error > ACCEPTABLE_ERROR:
-            raise BadlyDefinedLikelihoodError(
-                "Likelihood does not sum to 1: {}".format(llh)
-            )
+        if hasattr(self, "compute_likelihood_batch"):
+            llh = numpy.broadcast_to(
+                self.compute_likelihood_batch(
+                    self._actions()[1], observation_arrays(observation)
+                ),
+                (len(actions),),
+            ).tolist()
+        else:
+            llh = [self.compute_likelihood(action, observation) for action in actions]
+        self._check_likelihood(llh)
+        if self.likelihood_paths is not None:
+            self._lru_set(self._summary_cache, key, tuple(llh))
         return actions, llh
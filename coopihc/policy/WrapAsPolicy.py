@@ -34,6 +34,9 @@ class WrapAsPolicy(BasePolicy, ABC):
     def game_state(self):
         return self.bundle.game_state
 
+    def seed(self, seed):
+        self.bundle.seed(seed)
+
     def reset(self, *args, **kwargs):
         return self.bundle.reset(*args, **kwargs)
 
@@ -0,0 +1,32 @@
+import numpy
+
+from coopihc.bundle.Bundle import Bundle
+from coopihc.examples.simplepointing.envs import SimplePointingTask
+from coopihc.examples.simplepointing.users import CarefulPointer
+from coopihc.examples.simplepointing.assistants import BIGGain
+
+
+def test_reset_step():
+    task = SimplePointingTask(gridsize=31, number_of_targets=8, mode="position")
+    bundle = Bundle(
+        task=task,
+        user=CarefulPointer(error_rate=0.05),
+        assistant=BIGGain(),
+        seed=0,
+    )
+    # finit builds the assistant action over the grid, not over the default binary space
+    space = bundle.assistant.policy.action_state["action"].space
+    assert space.low == 0
+    assert space.high == task.gridsize - 1
+    bundle.reset()
+    assert numpy.allclose(bundle.assistant.state["beliefs"], 1 / 8)
+    bundle.step()
+    assert 0 <= bundle.game_state["assistant_action"]["action"] <= task.gridsize - 1
+    assert (
+        bundle.task.state["position"] == bundle.game_state["assistant_action"]["action"]
+    )
+    assert numpy.isclose(numpy.sum(bundle.assistant.state["beliefs"]), 1)
+
+
+if __name__ == "__main__":
+    test_reset_step()
@@ -0,0 +1,88 @@
+import numpy
+
+from coopihc.bundle.Bundle import Bundle
+from coopihc.interactiontask.ClassicControlTask import ClassicControlTask
+from coopihc.agents.lqrcontrollers.IHCT_LQGController import IHCT_LQGController
+
+
+def make_lqg_bundle():
+    # Same model as in coopihc/examples/simple_examples/lqg_example.py
+    I, b, ta, te = 0.25, 0.2, 0.03, 0.04
+    a1 = b / (ta * te * I)
+    a2 = 1 / (ta * te) + (1 / ta + 1 / te) * b / I
+    a3 = b / I + 1 / ta + 1 / te
+    bu = 1 / (ta * te * I)
+    timestep = 0.01
+
+    Ac = numpy.array([[0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1], [0, -a1, -a2, -a3]])
+    Bc = numpy.array([[0, 0, 0, bu]]).reshape((-1, 1))
+    F = numpy.diag([0, 0, 0, 0.001])
+    G = 0.03 * numpy.diag([1, 1, 0, 0])
+    C = numpy.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 0]])
+    H = numpy.array(0.08)
+    D = numpy.array([[0.01, 0, 0, 0], [0, 0.01, 0, 0], [0, 0, 0.05, 0], [0, 0, 0, 0]])
+    Q = numpy.diag([1, 0.01, 0, 0])
+    R = numpy.array([[1e-3]])
+    U = numpy.diag([1, 0.1, 0.01, 0])
+
+    task = ClassicControlTask(
+        timestep,
+        Ac,
+        Bc,
+        F=F,
+        G=G,
+        H=H,
+        discrete_dynamics=False,
+        noise="off",
+        timespace="continuous",
+    )
+    user = IHCT_LQGController("user", timestep, Q, R, U, C, D, noise="on")
+    return Bundle(task=task, user=user, seed=0)
+
+
+def test_finit_twice():
+    bundle = make_lqg_bundle()
+    user = bundle.user
+    K, L = user.K, user.L
+    # The matrices taken from the task are set by the first call, they were compared to None with == on the second one
+    user.finit()
+    assert user.Acontroller is bundle.task.A
+    assert K.shape == user.K.shape
+    assert L.shape == user.L.shape
+
+
+def test_Kalman_retry():
+    bundle = make_lqg_bundle()
+    user = bundle.user
+    matrices = user._MContainer(
+        user.Acontroller,
+        user.Bcontroller,
+        user.C,
+        user.D,
+        user.Gcontroller,
+        user.Hcontroller,
+        user.Q,
+        user.R,
+        user.U,
+    ).pass_args()
+
+    searches = []
+    compute = user._compute_Kalman_matrices
+
+    def _compute_Kalman_matrices(matrices, N=20):
+        searches.append(N)
+        return compute(matrices, N=N)
+
+    user._compute_Kalman_matrices = _compute_Kalman_matrices
+    # Too few iterations to converge, the search is retried with more iterations and its result is returned
+    K, L = user._compute_Kalman_matrices(matrices, N=6)
+    assert len(searches) > 1
+    assert searches == sorted(searches)
+    assert searches[1] == int(1.3 * 6)
+    assert K.shape == user.K.shape
+    assert L.shape == user.L.shape
+
+
+if __name__ == "__main__":
+    test_finit_twice()
+    test_Kalman_retry()
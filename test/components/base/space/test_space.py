@@ -116,10 +116,28 @@ def test_sample_Numeric():
         assert s.sample() in s
 
 
+def test_sample_batch():
+    s = Space(array=numpy.array([1, 2, 3], dtype=numpy.int16))
+    samples = s.sample(1000)
+    assert samples.shape == (1000,)
+    assert samples.dtype == numpy.int16
+    assert set(samples.tolist()) == {1, 2, 3}
+    s = integer_space(N=3, start=-1, dtype=numpy.int8)
+    samples = s.sample(size=(10, 5))
+    assert samples.shape == (10, 5)
+    assert samples.dtype == numpy.int8
+    assert set(samples.ravel().tolist()) == {-1, 0, 1}
+    s = Space(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)))
+    samples = s.sample(100)
+    assert samples.shape == (100, 2, 2)
+    assert (samples >= -1).all() and (samples <= 1).all()
+
+
 def test_sample():
     test_sample_CatSet()
     test_sample_shortcuts()
     test_sample_Numeric()
+    test_sample_batch()
 
 
 def test_dtype_CatSet():
@@ -376,6 +394,85 @@ def test_array_Numeric():
     assert s.dtype == s.array.dtype
 
 
+def test_subspace():
+    s = Space(
+        low=-numpy.ones((2, 2), dtype=numpy.float32),
+        high=numpy.ones((2, 2), dtype=numpy.float32),
+    )
+    assert s.subspace((slice(None), 0)) == s[:, 0]
+    assert s.subspace((slice(None), 0)) is s.subspace((slice(None), 0))
+    assert s.subspace(...) is s.subspace(...)
+    # fancy indexing is not cached
+    assert s.subspace(numpy.array([0, 1])) == s[numpy.array([0, 1])]
+    c = Space(array=numpy.array([1, 2, 3], dtype=numpy.int16))
+    assert c.subspace(...) is c
+    with pytest.raises(SpaceNotSeparableError):
+        c.subspace(0)
+
+
+def test_check():
+    s = Space(low=numpy.array(-2), high=numpy.array(3), dtype=numpy.int8)
+    assert s.check(numpy.array(0, dtype=numpy.int8))
+    assert not s.check(numpy.array(4, dtype=numpy.int8))
+    s = Space(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)))
+    assert s.check(numpy.zeros((2, 2)))
+    assert not s.check(2 * numpy.ones((2, 2)))
+    c = Space(array=numpy.array([1, 2, 3], dtype=numpy.int16))
+    assert c.check(numpy.array(1, dtype=numpy.int16))
+    assert not c.check(numpy.array(4, dtype=numpy.int16))
+    assert c.check(numpy.array([2]))
+
+
+def test_lazy_rng():
+    s = Space(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)), seed=123)
+    assert s._rng is None
+    sub = s[0]
+    sub.sample()
+    # sub-spaces share the generator of their parent
+    assert sub.rng is s.rng
+    assert s._rng is not None
+    q = Space(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)), seed=123)
+    assert (
+        q.sample()
+        == Space(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)), seed=123).sample()
+    ).all()
+
+
+def test_subspace_cache():
+    s = Space(low=numpy.zeros((100,)), high=numpy.ones((100,)))
+    assert s[0] is s[0]
+    assert next(iter(s)) is s[0]
+    for i in range(100):
+        s[i]
+    assert len(s._subspaces) == s.subspace_cache_size
+    assert s[99] == Space(low=numpy.float64(0), high=numpy.float64(1))
+    # booleans are not integers
+    s = Space(low=numpy.zeros((3,)), high=numpy.ones((3,)))
+    assert s[1].shape == ()
+    assert s[True].shape == (1, 3)
+    assert s[numpy.True_].shape == (1, 3)
+    assert s[1].shape == ()
+
+
+def test_contains_batch():
+    s = Space(array=numpy.array([5, 1, 3], dtype=numpy.int16))
+    assert (
+        s.contains_batch(numpy.array([1, 2, 3, 5, 6, 0]))
+        == numpy.array([True, False, True, True, False, False])
+    ).all()
+    assert (
+        s.contains_batch(numpy.array([[1], [4]])) == numpy.array([True, False])
+    ).all()
+    s = Space(low=-numpy.ones((2, 2)), high=numpy.ones((2, 2)))
+    values = numpy.zeros((3, 2, 2))
+    values[1, 0, 1] = 2
+    assert (s.contains_batch(values) == numpy.array([True, False, True])).all()
+    s = Space(low=numpy.array(-2), high=numpy.array(3), dtype=numpy.int8)
+    assert (
+        s.contains_batch(numpy.array([-3, 0, 3])) == numpy.array([False, True, True])
+    ).all()
+
+
 if __name__ == "__main__":
     test_CatSet()
     test_Numeric()
@@ -388,3 +485,8 @@ if __name__ == "__main__":
     test__getitem__()
     test_N_Numeric()
     test_array_Numeric()
+    test_subspace()
+    test_check()
+    test_lazy_rng()
+    test_subspace_cache()
+    test_contains_batch()
@@ -13,6 +13,8 @@ from coopihc.base.elements import example_game_state
 
 
 import numpy
+import copy
+import pytest
 from tabulate import tabulate
 
 s = 0
@@ -163,6 +165,83 @@ def test_assign_after():
     assert numpy.issubdtype(S["x"].dtype, numpy.integer)
 
 
+def test_sample_batch():
+    batch = state.sample_batch(100)
+    assert isinstance(batch, State)
+    assert batch["sub1"]["x1"].shape == (100,)
+    assert batch["sub1"]["x3"].shape == (100, 2, 2)
+    assert set(batch["sub2"]["y1"].tolist()) <= {1, 2, 3}
+    assert (batch["sub1"]["x3"] >= 1).all() and (batch["sub1"]["x3"] <= 2).all()
+
+
+def test_fork():
+    _state = copy.deepcopy(state)
+    _state["sub1"]["x1"] = 1
+    _state["sub1"]["x3"] = 1.5 * numpy.ones((2, 2))
+    fork = _state.fork()
+    assert fork == _state
+    assert numpy.shares_memory(fork["sub1"]["x3"], _state["sub1"]["x3"])
+    fork["sub1"]["x1"] = 3
+    fork["sub1"]["x3"] = 2 * numpy.ones((2, 2))
+    assert fork["sub1"]["x1"] == 3
+    assert _state["sub1"]["x1"] == 1
+    assert (_state["sub1"]["x3"] == 1.5).all()
+    # unmodified elements are still shared
+    assert numpy.shares_memory(fork["sub2"]["y1"], _state["sub2"]["y1"])
+    # modified elements are detached and writable
+    fork["sub1"]["x3"][0, 0] = 1
+    assert _state["sub1"]["x3"][0, 0] == 1.5
+    with pytest.raises(ValueError):
+        fork["sub2"]["y1"][...] = 2
+    fork["new_substate"] = State()
+    assert "new_substate" not in _state
+
+
+def test_snapshot():
+    _state = copy.deepcopy(state)
+    _state["sub1"]["x1"] = 1
+    snapshot = _state.snapshot()
+    _state["sub1"]["x1"] = 2
+    assert snapshot["sub1"]["x1"] == 1
+    assert snapshot["sub1"]["x1"].space is _state["sub1"]["x1"].space
+    snapshot["sub1"]["x1"] = 3
+    assert _state["sub1"]["x1"] == 2
+
+
+def test_seed():
+    state = State()
+    state["x"] = discrete_array_element(low=0, high=100)
+    state["sub"] = State()
+    state["sub"]["y"] = array_element(low=numpy.zeros((3,)), high=numpy.ones((3,)))
+    state.seed(1)
+    assert state["x"].space.rng is state["sub"]["y"].space.rng
+    samples = [state["x"].space.sample(), state["sub"]["y"].space.sample()]
+    state.seed(1)
+    assert state["x"].space.sample() == samples[0]
+    assert (state["sub"]["y"].space.sample() == samples[1]).all()
+
+
+def test_resample():
+    state = State()
+    state["x"] = discrete_array_element(init=0, low=0, high=100)
+    state["y"] = discrete_array_element(init=0, low=0, high=100)
+    state["sub"] = State()
+    state["sub"]["z"] = array_element(
+        init=numpy.zeros((3,)), low=numpy.zeros((3,)), high=numpy.ones((3,))
+    )
+    state.seed(0)
+    versions = state.versions()
+    state.resample(skip={"y"})
+    assert state["y"] == 0
+    assert state["sub"]["z"] in state["sub"]["z"].space
+    assert state.written_since(versions) == {"x"}
+    # snapshots are copy-on-write
+    snapshot = state.snapshot()
+    snapshot.resample()
+    assert snapshot["y"] in snapshot["y"].space
+    assert state["y"] == 0
+
+
 if __name__ == "__main__":
     test__init__()
     # test_filter()
@@ -171,3 +250,8 @@ if __name__ == "__main__":
     test_reset_full()
     test_tabulate()
     test_equals()
+    test_sample_batch()
+    test_fork()
+    test_snapshot()
+    test_seed()
+    test_resample()
@@ -0,0 +1,106 @@
+import numpy
+import pytest
+
+from coopihc.base.elements import discrete_array_element, array_element, cat_element
+from coopihc.base.State import State
+from coopihc.base.StateCodec import StateCodec
+from coopihc.base.utils import UnknownSchemaError, NotKnownSerializationWarning
+
+
+def make_state():
+    state = State()
+    substate = State()
+    substate["x1"] = discrete_array_element(init=1, low=1, high=3)
+    substate["x3"] = array_element(
+        init=1.5 * numpy.ones((2, 2)),
+        low=numpy.ones((2, 2)),
+        high=2 * numpy.ones((2, 2)),
+    )
+    substate2 = State()
+    substate2["y1"] = cat_element(N=3, init=2, out_of_bounds_mode="raw")
+    state["sub1"] = substate
+    state["sub2"] = substate2
+    return state
+
+
+def test_roundtrip():
+    state = make_state()
+    encoder, decoder = StateCodec(), StateCodec()
+    data = encoder.encode(state)
+    assert data[:1] == b"S"
+    new_state = decoder.decode(data)
+    assert new_state.equals(state, mode="hard")
+    assert new_state["sub2"]["y1"].out_of_bounds_mode == "raw"
+    # values are not shared with the message
+    new_state["sub1"]["x1"] = 2
+    assert state["sub1"]["x1"] == 1
+
+
+def test_schema_once():
+    state = make_state()
+    encoder, decoder = StateCodec(), StateCodec()
+    first = encoder.encode(state)
+    decoder.decode(first)
+    state["sub1"]["x1"] = 3
+    data = encoder.encode(state)
+    assert data[:1] == b"V"
+    # hash and raw values only
+    assert len(data) == 1 + 8 + 8 + 4 * 8 + 8
+    assert len(data) < len(first)
+    new_state = decoder.decode(data)
+    assert new_state["sub1"]["x1"] == 3
+    # spaces are rebuilt once per schema
+    assert new_state["sub1"]["x3"].space is decoder.decode(data)["sub1"]["x3"].space
+
+
+def test_decode_in_place():
+    state = make_state()
+    encoder, decoder = StateCodec(), StateCodec()
+    target = decoder.decode(encoder.encode(state))
+    x3 = target["sub1"]["x3"]
+    state["sub1"]["x3"] = 2 * numpy.ones((2, 2))
+    decoded = State.deserialize(state.serialize(codec=encoder), decoder, state=target)
+    assert decoded is target
+    assert target["sub1"]["x3"] is x3
+    assert (x3 == 2).all()
+
+
+def test_unknown_schema():
+    state = make_state()
+    encoder = StateCodec()
+    encoder.encode(state)
+    with pytest.raises(UnknownSchemaError):
+        StateCodec().decode(encoder.encode(state))
+
+
+def test_new_schema():
+    state = make_state()
+    encoder, decoder = StateCodec(), StateCodec()
+    decoder.decode(encoder.encode(state))
+    state["sub2"]["y2"] = discrete_array_element(init=0, low=0, high=1)
+    data = encoder.encode(state)
+    assert data[:1] == b"S"
+    assert decoder.decode(data)["sub2"]["y2"] == 0
+
+
+class Custom:
+    def __init__(self):
+        self.a = 1
+
+
+def test_serialize_unknown():
+    state = make_state()
+    state["other"] = Custom()
+    with pytest.warns(NotKnownSerializationWarning):
+        serialized = state.serialize()
+    assert serialized["other"] == {"a": 1}
+    assert serialized["sub1"]["x1"]["values"] == 1
+
+
+if __name__ == "__main__":
+    test_roundtrip()
+    test_schema_once()
+    test_decode_in_place()
+    test_unknown_schema()
+    test_new_schema()
+    test_serialize_unknown()
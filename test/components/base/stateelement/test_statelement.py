@@ -9,6 +9,7 @@ import numpy
 import pytest
 import json
 import copy
+import pickle
 from tabulate import tabulate
 
 
@@ -565,9 +566,45 @@ def test__setitem__numeric():
     ).all()
 
 
+def test__setitem__clip():
+    x = StateElement(
+        numpy.zeros((2, 2)), box_space(numpy.ones((2, 2))), out_of_bounds_mode="clip"
+    )
+    values = x.view(numpy.ndarray)
+    new_values = numpy.array([[2.0, 0.5], [-3.0, 0.2]])
+    x[...] = new_values
+    # clipped into the values of the element, the input is left untouched
+    assert x.view(numpy.ndarray) is not values
+    assert numpy.shares_memory(x, values)
+    assert (values == numpy.array([[1, 0.5], [-1, 0.2]])).all()
+    assert new_values[0, 0] == 2.0
+    x[1, :] = numpy.array([5.0, 5.0])
+    assert (values[1] == 1).all()
+
+
 def test__setitem__():
     test__setitem__integer()
     test__setitem__numeric()
+    test__setitem__clip()
+
+
+def test_pickle():
+    x = StateElement(
+        numpy.zeros((2, 2)), box_space(numpy.ones((2, 2))), out_of_bounds_mode="clip"
+    )
+    # validated writes build the space's checker and sub-spaces
+    x[...] = numpy.array([[2.0, 0.5], [-3.0, 0.2]])
+    x[0, :] = numpy.array([0.1, 0.1])
+    assert x.space._checker is not None
+    y = pickle.loads(pickle.dumps(x))
+    assert isinstance(y, StateElement)
+    assert (y == x).all()
+    assert y.space == x.space
+    assert y.out_of_bounds_mode == "clip"
+    y[...] = numpy.array([[5.0, 0.5], [0.0, 0.0]])
+    assert y[0, 0] == 1
+    y[1, :] = numpy.array([-5.0, 0.3])
+    assert (y.view(numpy.ndarray)[1] == numpy.array([-1, 0.3])).all()
 
 
 def test_reset_integer():
@@ -713,11 +750,58 @@ def test_cast_discr_to_discr():
         assert ret_stateElement == x + 10
 
 
+def test_cast_array():
+    discr_box_space = box_space(low=numpy.int8(1), high=numpy.int8(3))
+    cont_box_space = box_space(low=numpy.float64(-1.5), high=numpy.float64(1.5))
+    values = StateElement.cast_array(
+        numpy.array([1, 2, 3, 2]), discr_box_space, cont_box_space, mode="center"
+    )
+    assert (values == numpy.array([-1, 0, 1, 0])).all()
+    values = StateElement.cast_array(
+        numpy.array([1, 2, 3]), discr_box_space, cont_box_space, mode="edges"
+    )
+    assert (values == numpy.array([-1.5, 0, 1.5])).all()
+    with pytest.raises(ValueError):
+        StateElement.cast_array(numpy.array([4]), discr_box_space, cont_box_space)
+
+    inputs = numpy.linspace(-1.5, 1.5, 100)
+    values = StateElement.cast_array(inputs, cont_box_space, discr_box_space)
+    for i, value in zip(inputs, values):
+        assert value == StateElement(i, cont_box_space).cast(discr_box_space)
+
+    other_discr_box_space = box_space(low=numpy.int8(11), high=numpy.int8(13))
+    values = StateElement.cast_array(
+        numpy.array([[1, 2], [3, 1]]), discr_box_space, other_discr_box_space
+    )
+    assert (values == numpy.array([[11, 12], [13, 11]])).all()
+
+
+def test_cast_cache():
+    discr_box_space = box_space(low=numpy.int8(1), high=numpy.int8(3))
+    cont_box_space = box_space(low=numpy.float64(-1.5), high=numpy.float64(1.5))
+    x = StateElement(numpy.array(2), discr_box_space)
+    assert x.cast(cont_box_space) == 0
+    # casters are closures, they are not pickled
+    y = pickle.loads(pickle.dumps(x))
+    assert len(y.space._cast_cache) == 0
+    assert y.cast(cont_box_space) == 0
+    # only the casters to the last cast_cache_size target spaces are kept
+    for n in range(2 * discr_box_space.cast_cache_size):
+        StateElement.cast_array(
+            numpy.array([1, 3]),
+            discr_box_space,
+            box_space(low=numpy.float64(-n - 1), high=numpy.float64(n + 1)),
+        )
+    assert len(discr_box_space._cast_cache) == discr_box_space.cast_cache_size
+
+
 def test_cast():
     test_cast_discrete_to_cont()
     test_cast_cont_to_discrete()
     test_cast_cont_to_cont()
     test_cast_discr_to_discr()
+    test_cast_array()
+    test_cast_cache()
 
 
 if __name__ == "__main__":
@@ -733,6 +817,7 @@ if __name__ == "__main__":
     test__repr__()
     test_serialize()
     test__setitem__()
+    test_pickle()
     test__getitem__()
     test_reset()
     test_tabulate()
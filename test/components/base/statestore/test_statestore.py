@@ -0,0 +1,134 @@
+import copy
+import numpy
+import pytest
+
+from coopihc.base.elements import discrete_array_element, array_element
+from coopihc.base.State import State
+from coopihc.base.StateElement import StateElement
+from coopihc.base.StateStore import StateStore
+from coopihc.base.utils import StateNotContainedWarning
+from coopihc.bundle.Bundle import Bundle
+from coopihc.interactiontask.ExampleTask import ExampleTask
+
+
+def make_state():
+    state = State()
+    substate = State()
+    substate["x1"] = discrete_array_element(init=1, low=1, high=3)
+    substate["x3"] = array_element(
+        init=1.5 * numpy.ones((2, 2)),
+        low=numpy.ones((2, 2)),
+        high=2 * numpy.ones((2, 2)),
+    )
+    substate2 = State()
+    substate2["y1"] = discrete_array_element(init=2, low=1, high=3)
+    state["sub1"] = substate
+    state["sub2"] = substate2
+    return state
+
+
+def test_init():
+    state = make_state()
+    store = StateStore(state)
+    assert set(store.layout.keys()) == {("sub1", "x1"), ("sub1", "x3"), ("sub2", "y1")}
+    assert store.layout[("sub1", "x3")]["shape"] == (2, 2)
+    x1 = state["sub1"]["x1"]
+    assert isinstance(x1, StateElement)
+    assert x1 == 1
+    assert numpy.shares_memory(x1, store.buffer)
+    assert (state["sub1"]["x3"] == 1.5).all()
+    assert state["sub2"]["y1"] == 2
+
+
+def test_write_through():
+    state = make_state()
+    store = StateStore(state)
+    state["sub1"]["x1"] = 3
+    assert store.buffer["sub1/x1"] == 3
+    # same space: the StateElement is kept and values are copied in place
+    x1 = state["sub1"]["x1"]
+    state["sub1"]["x1"] = discrete_array_element(init=2, low=1, high=3)
+    assert state["sub1"]["x1"] is x1
+    assert store.buffer["sub1/x1"] == 2
+    # writes are still validated
+    with pytest.warns(StateNotContainedWarning):
+        state["sub2"]["y1"] = 5
+
+
+def test_snapshot_restore():
+    state = make_state()
+    store = StateStore(state)
+    snapshot = store.snapshot()
+    state["sub1"]["x1"] = 3
+    state["sub1"]["x3"] = 2 * numpy.ones((2, 2))
+    store.restore(snapshot)
+    assert state["sub1"]["x1"] == 1
+    assert (state["sub1"]["x3"] == 1.5).all()
+
+
+def test_bytes():
+    state = make_state()
+    store = StateStore(state)
+    data = store.tobytes()
+    assert len(data) == store.nbytes
+    state["sub2"]["y1"] = 1
+    store.frombytes(data)
+    assert state["sub2"]["y1"] == 2
+
+
+def test_relayout():
+    state = make_state()
+    store = StateStore(state)
+    snapshot = store.snapshot()
+    state["sub2"]["y2"] = discrete_array_element(init=1, low=1, high=3)
+    assert ("sub2", "y2") in store.layout
+    assert numpy.shares_memory(state["sub2"]["y2"], store.buffer)
+    assert state["sub1"]["x1"] == 1
+    with pytest.raises(ValueError):
+        store.restore(snapshot)
+
+
+def test_clone():
+    state = make_state()
+    store = StateStore(state)
+    new_state = store.clone()
+    assert new_state == state
+    new_state["sub1"]["x1"] = 3
+    assert state["sub1"]["x1"] == 1
+    assert new_state._store is not store
+
+
+def test_deepcopy():
+    state = make_state()
+    StateStore(state)
+    new_state = copy.deepcopy(state)
+    assert new_state._store is None
+    new_state["sub1"]["x1"] = 3
+    assert state["sub1"]["x1"] == 1
+
+
+def test_bundle():
+    bundle = Bundle(task=ExampleTask(), compact_state=True)
+    assert bundle.store is not None
+    bundle.reset()
+    data = bundle.store.tobytes()
+    snapshot = bundle.store.snapshot()
+    bundle.step()
+    assert bundle.round_number == 1
+    bundle.store.restore(snapshot)
+    assert bundle.round_number == 0
+    assert bundle.store.tobytes() == data
+
+
+# +----------------------+
+# +        MAIN          +
+# +----------------------+
+if __name__ == "__main__":
+    test_init()
+    test_write_through()
+    test_snapshot_restore()
+    test_bytes()
+    test_relayout()
+    test_clone()
+    test_deepcopy()
+    test_bundle()
@@ -0,0 +1,39 @@
+import pytest
+
+from coopihc import Bundle, ExampleTask, BaseAgent, BasePolicy, State
+from coopihc.base.elements import discrete_array_element
+from coopihc.examples.simplepointing.envs import SimplePointingTask
+from coopihc.examples.simplepointing.users import CarefulPointer
+from coopihc.examples.simplepointing.assistants import ConstantCDGain
+
+
+def make_example_bundle(user_action=1):
+    """ExampleTask, with a user that always takes ``user_action`` and no assistant. x goes up by user_action each round, and the game finishes when x = 4."""
+    action_state = State()
+    action_state["action"] = discrete_array_element(
+        init=user_action, low=user_action, high=user_action
+    )
+    return Bundle(
+        task=ExampleTask(),
+        user=BaseAgent("user", agent_policy=BasePolicy(action_state=action_state)),
+    )
+
+
+def make_pointing_bundle(error_rate=0.1, **kwargs):
+    """SimplePointingTask with 8 targets on a grid of size 31, a CarefulPointer and a ConstantCDGain assistant. Keyword arguments are passed to the Bundle."""
+    return Bundle(
+        task=SimplePointingTask(gridsize=31, number_of_targets=8),
+        user=CarefulPointer(error_rate=error_rate),
+        assistant=ConstantCDGain(1),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def example_bundle():
+    return make_example_bundle
+
+
+@pytest.fixture
+def pointing_bundle():
+    return make_pointing_bundle
@@ -415,7 +415,77 @@ def test_step():
     agent_step()
 
 
+def test_turn_plan():
+    global bundle
+    plan = bundle._turn_plan
+    assert plan == [
+        bundle._play_user_observation,
+        bundle._play_user_action,
+        bundle._play_assistant_observation,
+        bundle._play_assistant_action,
+    ]
+    useronly = Bundle(task=ExampleTask(), user=BaseAgent("user"))
+    assert useronly._turn_plan[2] == useronly._play_round_end
+    assert useronly._turn_plan[3] is None
+    assistantonly = Bundle(task=ExampleTask(), assistant=BaseAgent("assistant"))
+    assert assistantonly._turn_plan[:2] == [None, None]
+
+
+def test_counters():
+    global bundle
+    bundle.reset(go_to=0)
+    # null actions, so that the game does not finish in the middle of a round
+    actions = {"user_action": 0, "assistant_action": 0}
+    state, rewards, is_done = bundle.step(**actions)
+    assert isinstance(bundle._round_number, int)
+    assert bundle.round_number == 1
+    assert bundle.game_state["game_info"]["round_index"] == 1
+    # rewards are not shared between steps
+    rewards["first_task_reward"] = 10
+    state, new_rewards, is_done = bundle.step(**actions)
+    assert new_rewards is not rewards
+    assert new_rewards["first_task_reward"] != 10
+    # writes that bypass the counters are picked up
+    bundle.game_state["game_info"]["turn_index"][...] = 2
+    bundle.game_state["game_info"]["round_index"][...] = 5
+    state, rewards, is_done = bundle.step(**actions)
+    assert bundle.turn_number == 2
+    assert bundle.round_number == 6
+
+
+def test_lazy_counters():
+    global bundle
+    bundle.reset(go_to=0)
+    turn_index = bundle.game_state["game_info"]["turn_index"]
+    round_index = bundle.game_state["game_info"]["round_index"]
+    version = turn_index._version, round_index._version
+    # changes to the counters are not written until the game state is handed out
+    bundle.turn_number = 1
+    bundle.turn_number = 3
+    bundle.round_number = 4
+    assert (turn_index._version, round_index._version) == version
+    assert bundle.game_state["game_info"]["turn_index"] == 3
+    assert bundle.game_state["game_info"]["round_index"] == 4
+    assert turn_index._version == version[0] + 1
+    assert round_index._version == version[1] + 1
+    # reading the game_info values does not undo pending changes
+    bundle.turn_number = 1
+    turn_index[...]
+    assert bundle.game_state["game_info"]["turn_index"] == 1
+    # pending changes are written to checkpoints, and do not override restores
+    token = bundle.checkpoint()
+    bundle.turn_number = 2
+    bundle.round_number = 7
+    bundle.restore(token)
+    assert bundle._turn_number == 1
+    assert bundle.round_number == 4
+    assert bundle.game_state["game_info"]["turn_index"] == 1
+
+
 if __name__ == "__main__":
     test_init()
     test_reset()
     test_step()
+    test_turn_plan()
+    test_counters()
+    test_lazy_counters()
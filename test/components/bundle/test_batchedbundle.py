@@ -0,0 +1,105 @@
+import numpy
+import pytest
+
+from coopihc import BatchedBundle, Bundle, State, ExampleTask, BaseAgent, BasePolicy
+from coopihc.base.elements import discrete_array_element
+from coopihc.examples.simplepointing.envs import SimplePointingTask
+from coopihc.examples.simplepointing.users import CarefulPointer
+
+N = 64
+
+
+def make_bundle(n=N, auto_reset=True):
+    # unit gain assistant
+    action_state = State()
+    action_state["action"] = discrete_array_element(init=1, low=1, high=1)
+    return BatchedBundle(
+        task=SimplePointingTask(gridsize=31, number_of_targets=8),
+        user=CarefulPointer(error_rate=0),
+        assistant=BaseAgent(
+            "assistant", agent_policy=BasePolicy(action_state=action_state)
+        ),
+        n=n,
+        auto_reset=auto_reset,
+    )
+
+
+def test_init():
+    bundle = make_bundle()
+    assert isinstance(bundle.game_state, State)
+    assert bundle.game_state["task_state"]["position"].shape == (N,)
+    assert bundle.game_state["task_state"]["targets"].shape == (N, 8)
+    assert bundle.game_state["user_action"]["action"].shape == (N,)
+    assert isinstance(bundle.bundle, Bundle)
+
+
+def test_reset():
+    bundle = make_bundle()
+    game_state = bundle.reset()
+    targets = game_state["task_state"]["targets"]
+    position = game_state["task_state"]["position"]
+    goal = game_state["user_state"]["goal"]
+    assert (numpy.diff(targets, axis=1) > 0).all()
+    assert not (targets == position[:, numpy.newaxis]).any(axis=1).any()
+    assert (targets == goal[:, numpy.newaxis]).any(axis=1).all()
+    assert (game_state["game_info"]["round_index"] == 0).all()
+
+
+def test_reset_mask():
+    bundle = make_bundle()
+    bundle.reset()
+    targets = bundle.game_state["task_state"]["targets"].copy()
+    mask = numpy.zeros((N,), dtype=bool)
+    mask[0] = True
+    bundle.reset(mask=mask)
+    numpy.testing.assert_array_equal(
+        bundle.game_state["task_state"]["targets"][1:], targets[1:]
+    )
+
+
+def test_step():
+    bundle = make_bundle(auto_reset=False)
+    game_state = bundle.reset()
+    # without errors the user goes straight to the goal
+    lengths = numpy.abs(
+        game_state["user_state"]["goal"] - game_state["task_state"]["position"]
+    )
+    finished = numpy.zeros((N,), dtype=bool)
+    for i in range(31):
+        game_state, rewards, is_done = bundle.step()
+        assert set(rewards.keys()) == set(BatchedBundle.reward_keys)
+        assert rewards["first_task_reward"].shape == (N,)
+        numpy.testing.assert_array_equal(is_done[~finished], (lengths == i)[~finished])
+        finished |= is_done
+    assert finished.all()
+    numpy.testing.assert_array_equal(
+        game_state["task_state"]["position"], game_state["user_state"]["goal"]
+    )
+    numpy.testing.assert_array_equal(game_state["game_info"]["round_index"], lengths)
+
+
+def test_auto_reset():
+    bundle = make_bundle()
+    bundle.reset()
+    for i in range(31):
+        game_state, rewards, is_done = bundle.step()
+        assert (game_state["game_info"]["round_index"][is_done] == 0).all()
+
+
+def test_not_batched():
+    with pytest.raises(NotImplementedError):
+        BatchedBundle(
+            task=ExampleTask(), user=BaseAgent("user"), assistant=BaseAgent("assistant")
+        )
+
+
+# +----------------------+
+# +        MAIN          +
+# +----------------------+
+if __name__ == "__main__":
+    test_init()
+    test_reset()
+    test_reset_mask()
+    test_step()
+    test_auto_reset()
+    test_not_batched()
@@ -0,0 +1,81 @@
+import numpy
+import pytest
+
+from coopihc import Checkpoint
+from coopihc.base.elements import discrete_array_element
+
+record = [("task_state", "position"), ("user_state", "goal")]
+
+
+def branch(bundle, checkpoint):
+    bundle.restore(checkpoint)
+    return bundle.rollout(20, record=record, reset=False)
+
+
+def test_checkpoint(pointing_bundle):
+    bundle = pointing_bundle(error_rate=0.3, seed=2)
+    bundle.reset(go_to=1)
+    bundle.step()
+    checkpoint = bundle.checkpoint()
+    assert isinstance(checkpoint, Checkpoint)
+    position = int(bundle.game_state["task_state"]["position"])
+    observation = bundle.user.observation
+    bundle.step()
+    bundle.step()
+    bundle.restore(checkpoint)
+    assert bundle.round_number == 1
+    assert bundle.turn_number == 1
+    assert bundle.game_state["task_state"]["position"] == position
+    assert bundle.user.observation is observation
+
+
+def check_branches(bundle):
+    bundle.reset(go_to=1)
+    checkpoint = bundle.checkpoint()
+    first = branch(bundle, checkpoint)
+    second = branch(bundle, checkpoint)
+    # random generators are restored as well, so branches replay identically
+    assert len(first) == len(second)
+    for path in first.keys():
+        numpy.testing.assert_array_equal(first[path], second[path])
+
+
+def test_branches(pointing_bundle):
+    check_branches(pointing_bundle(error_rate=0.3, seed=2))
+
+
+def test_branches_compact(pointing_bundle):
+    check_branches(pointing_bundle(error_rate=0.3, seed=2, compact_state=True))
+
+
+def test_incremental(pointing_bundle):
+    bundle = pointing_bundle(error_rate=0.3, seed=2)
+    bundle.user.observation_engine.incremental = True
+    bundle.reset(go_to=1)
+    checkpoint = bundle.checkpoint()
+    position = int(bundle.user.observation["task_state"]["position"])
+    bundle.step()
+    bundle.step()
+    bundle.restore(checkpoint)
+    assert bundle.user.observation["task_state"]["position"] == position
+
+
+def test_layout_changed(pointing_bundle):
+    bundle = pointing_bundle(error_rate=0.3, seed=2)
+    bundle.reset()
+    checkpoint = bundle.checkpoint()
+    bundle.game_state["task_state"]["extra"] = discrete_array_element(
+        init=0, low=0, high=1
+    )
+    with pytest.raises(ValueError):
+        bundle.restore(checkpoint)
+
+
+if __name__ == "__main__":
+    from conftest import make_pointing_bundle
+
+    test_checkpoint(make_pointing_bundle)
+    test_branches(make_pointing_bundle)
+    test_branches_compact(make_pointing_bundle)
+    test_incremental(make_pointing_bundle)
+    test_layout_changed(make_pointing_bundle)
@@ -0,0 +1,161 @@
+import numpy
+
+from coopihc import Bundle, BaseAgent, InteractionTask
+from coopihc.base.elements import discrete_array_element, array_element
+from coopihc.examples.simplepointing.envs import SimplePointingTask
+from coopihc.examples.simplepointing.users import CarefulPointer
+from coopihc.examples.simplepointing.assistants import ConstantCDGain
+
+
+class CountingTask(InteractionTask):
+    """Task whose reset only writes to "written"; "free" is left to the random reset."""
+
+    def __init__(self):
+        super().__init__()
+        self.state["written"] = discrete_array_element(init=0, low=0, high=100)
+        self.state["free"] = discrete_array_element(init=0, low=0, high=100)
+        self.state["vector"] = array_element(
+            init=numpy.zeros((3,)), low=numpy.zeros((3,)), high=numpy.ones((3,))
+        )
+        self.resets = 0
+
+    def reset(self, dic=None):
+        self.resets += 1
+        self.state["written"] = self.resets
+
+    def on_user_action(self, *args, **kwargs):
+        return self.state, 0, False
+
+    def on_assistant_action(self, *args, **kwargs):
+        return self.state, 0, False
+
+
+class CountingUser(BaseAgent):
+    def __init__(self):
+        super().__init__("user")
+        self.state["written"] = discrete_array_element(init=0, low=0, high=100)
+        self.state["free"] = discrete_array_element(init=0, low=0, high=100)
+
+    def reset(self, dic=None):
+        self.state["written"] = 7
+
+
+class ReadingTask(CountingTask):
+    """Task whose reset reads "vector" through a view, and only sometimes writes "free"."""
+
+    def __init__(self):
+        super().__init__()
+        self.state["sum"] = array_element(init=0.0, low=0.0, high=3.0)
+
+    def reset(self, dic=None):
+        super().reset(dic=dic)
+        self.state["sum"] = float(self.state["vector"][0:2].sum())
+        if self.resets % 2:
+            self.state["free"] = 50
+
+
+def make_bundle(**kwargs):
+    return Bundle(task=CountingTask(), user=CountingUser(), seed=0, **kwargs)
+
+
+def test_covered():
+    bundle = make_bundle(reset_random=True, reset_fast=True)
+    bundle.reset()
+    assert bundle.task._reset_covered == {"written"}
+    assert bundle.user._reset_covered == {"written"}
+    frees = set()
+    for i in range(20):
+        bundle.reset()
+        assert bundle.task.state["written"] == bundle.task.resets
+        assert bundle.user.state["written"] == 7
+        assert bundle.task.state["vector"] in bundle.task.state["vector"].space
+        frees.add(int(bundle.task.state["free"]))
+    # uncovered states are still randomized
+    assert len(frees) > 1
+
+
+def test_covered_not_sampled():
+    def writes(fast):
+        bundle = make_bundle(reset_random=True, reset_fast=fast)
+        bundle.reset()
+        written = bundle.task.state["written"]
+        version = written._version
+        bundle.reset()
+        return written._version - version
+
+    # written by reset() only, instead of sampled then written
+    assert writes(True) < writes(False)
+
+
+def test_dic():
+    bundle = make_bundle(reset_random=True, reset_fast=True)
+    bundle.reset()
+    for i in range(5):
+        bundle.reset(dic={"task_state": {"free": numpy.array(42)}})
+        assert bundle.task.state["free"] == 42
+        assert bundle.task.state["written"] == bundle.task.resets
+
+
+def test_not_random():
+    bundle = make_bundle(reset_fast=True)
+    bundle.task.state["free"] = 3
+    for i in range(3):
+        bundle.reset()
+        assert bundle.task.state["free"] == 3
+
+
+def test_same_as_reset():
+    # Fast and normal resets lead to valid game states with the same structure
+    kwargs = dict(
+        task=SimplePointingTask(gridsize=31, number_of_targets=8),
+        user=CarefulPointer(error_rate=0.1),
+        assistant=ConstantCDGain(1),
+        reset_random=True,
+    )
+    bundle = Bundle(**kwargs)
+    for go_to in (0, 1, 3):
+        for fast in (False, True, True):
+            game_state = bundle.reset(go_to=go_to, fast=fast)
+            targets = game_state["task_state"]["targets"]
+            assert game_state["user_state"]["goal"] in targets.tolist()
+            assert game_state["task_state"]["position"] not in targets.tolist()
+            assert len(set(targets.tolist())) == 8
+            assert bundle.turn_number == go_to
+
+
+def test_read_only():
+    bundle = Bundle(task=ReadingTask(), user=CountingUser(), seed=0)
+    vectors = set()
+    for i in range(5):
+        bundle.reset(random_reset=True, fast=True)
+        vector = bundle.task.state["vector"]
+        vectors.add(tuple(vector.tolist()))
+        assert bundle.task.state["sum"] == vector[0:2].sum()
+    # read, not written: still randomized
+    assert "vector" not in bundle.task._reset_covered
+    assert len(vectors) == 5
+
+
+def test_conditional_write():
+    bundle = Bundle(task=ReadingTask(), user=CountingUser(), seed=0)
+    bundle.reset(random_reset=True, fast=True)
+    assert bundle.task.state["free"] == 50
+    assert "free" in bundle.task._reset_covered
+    frees = set()
+    for i in range(10):
+        bundle.reset(random_reset=True, fast=True)
+        frees.add(int(bundle.task.state["free"]))
+    # not written at every reset: randomized again
+    assert "free" not in bundle.task._reset_covered
+    assert len(frees) > 2
+    assert bundle.task._reset_covered == {"written", "sum"}
+
+
+if __name__ == "__main__":
+    test_covered()
+    test_covered_not_sampled()
+    test_dic()
+    test_not_random()
+    test_same_as_reset()
+    test_read_only()
+    test_conditional_write()
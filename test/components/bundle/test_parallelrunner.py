@@ -0,0 +1,80 @@
+import pickle
+import numpy
+
+from coopihc import ParallelRunner, Trajectory
+from coopihc.bundle.ParallelRunner import _bundle_cache
+
+jobs = [(seed, None, {"user_action": seed % 2}) for seed in range(12)]
+
+
+def check_trajectories(trajectories):
+    assert len(trajectories) == len(jobs)
+    for (seed, dic, parameters), trajectory in zip(jobs, trajectories):
+        assert isinstance(trajectory, Trajectory)
+        if parameters["user_action"] == 1:
+            assert trajectory.is_done
+            numpy.testing.assert_array_equal(trajectory["task_state/x"], [1, 2, 3, 4])
+        else:
+            assert not trajectory.is_done
+            assert len(trajectory) == 5
+
+
+def test_serial(example_bundle):
+    _bundle_cache.clear()
+    runner = ParallelRunner(
+        example_bundle, 5, record=[("task_state", "x")], max_workers=0, chunksize=4
+    )
+    check_trajectories(runner.map(jobs))
+    # one bundle per set of parameters
+    assert len(_bundle_cache) == 2
+
+
+def test_parallel(example_bundle):
+    runner = ParallelRunner(
+        example_bundle, 5, record=[("task_state", "x")], max_workers=2, chunksize=3
+    )
+    indices = [index for index, trajectory in runner.run(jobs)]
+    assert sorted(indices) == list(range(len(jobs)))
+    check_trajectories(runner.map(jobs))
+
+
+def test_reset_dic(example_bundle):
+    runner = ParallelRunner(
+        example_bundle, 5, record=[("task_state", "x")], max_workers=0
+    )
+    (trajectory,) = runner.map([(0, {"task_state": {"x": numpy.array(2)}}, None)])
+    numpy.testing.assert_array_equal(trajectory["task_state/x"], [3, 4])
+
+
+def test_pickle_trajectory(example_bundle):
+    trajectory = example_bundle().rollout(100, record=[("task_state", "x")])
+    new_trajectory = pickle.loads(pickle.dumps(trajectory))
+    assert new_trajectory._columns[("task_state", "x")].shape == (4,)
+    numpy.testing.assert_array_equal(new_trajectory["task_state/x"], [1, 2, 3, 4])
+
+
+def test_workers_independent(pointing_bundle):
+    record = [("task_state", "position"), ("task_state", "targets")]
+    pointing_jobs = [(seed, None, None) for seed in range(8)]
+    serial = ParallelRunner(pointing_bundle, 20, record=record, max_workers=0)
+    parallel = ParallelRunner(
+        pointing_bundle, 20, record=record, max_workers=2, chunksize=3
+    )
+    for trajectory, other in zip(
+        serial.map(pointing_jobs), parallel.map(pointing_jobs)
+    ):
+        for path in record:
+            numpy.testing.assert_array_equal(trajectory[path], other[path])
+
+
+# +----------------------+
+# +        MAIN          +
+# +----------------------+
+if __name__ == "__main__":
+    from conftest import make_example_bundle, make_pointing_bundle
+
+    test_serial(make_example_bundle)
+    test_parallel(make_example_bundle)
+    test_reset_dic(make_example_bundle)
+    test_pickle_trajectory(make_example_bundle)
+    test_workers_independent(make_pointing_bundle)
@@ -0,0 +1,66 @@
+import copy
+
+
+def test_stats(pointing_bundle):
+    bundle = pointing_bundle(seed=2, profile=True)
+    assert bundle.profiler.enabled
+    trajectory = bundle.rollout(100)
+    stats = bundle.stats()
+    assert set(stats) == {"user", "assistant", "task"}
+    assert stats["user"]["take_action"]["calls"] == len(trajectory)
+    assert stats["task"]["base_on_user_action"]["calls"] == len(trajectory)
+    infer = stats["assistant"]["infer"]
+    assert infer["min_ns"] <= infer["mean_ns"] <= infer["max_ns"]
+    assert sum(count for bound, count in infer["histogram"]) == infer["calls"]
+    assert all(bound >= infer["min_ns"] for bound, count in infer["histogram"])
+
+    bundle.profiler.clear()
+    assert bundle.stats()["user"]["observe"]["calls"] == 0
+
+
+def test_disabled(pointing_bundle):
+    bundle = pointing_bundle(seed=2)
+    assert not bundle.profiler.enabled
+    assert bundle.stats() == {}
+    # nothing is installed on the components
+    assert "observe" not in bundle.user.__dict__
+
+    bundle.profiler.enable()
+    bundle.rollout(5, reset=False)
+    calls = bundle.stats()["user"]["observe"]["calls"]
+    assert calls > 0
+    bundle.profiler.disable()
+    assert "observe" not in bundle.user.__dict__
+    assert "base_on_user_action" not in bundle.task.__dict__
+    bundle.rollout(5)
+    assert bundle.stats()["user"]["observe"]["calls"] == calls
+
+
+def test_same_game(pointing_bundle):
+    # profiling does not change the game
+    trajectory = pointing_bundle(seed=2).rollout(
+        50, record=[("task_state", "position")]
+    )
+    profiled = pointing_bundle(seed=2, profile=True).rollout(
+        50, record=[("task_state", "position")]
+    )
+    assert (trajectory["task_state/position"] == profiled["task_state/position"]).all()
+
+
+def test_copy(pointing_bundle):
+    bundle = pointing_bundle(seed=2, profile=True)
+    new_bundle = copy.deepcopy(bundle)
+    timer = new_bundle.user.__dict__["take_action"]
+    # the timer of the copy times the copy
+    assert timer.owner is new_bundle.user
+    new_bundle.rollout(5)
+    assert bundle.stats()["user"]["take_action"]["calls"] == 0
+
+
+if __name__ == "__main__":
+    from conftest import make_pointing_bundle
+
+    test_stats(make_pointing_bundle)
+    test_disabled(make_pointing_bundle)
+    test_same_game(make_pointing_bundle)
+    test_copy(make_pointing_bundle)
@@ -0,0 +1,81 @@
+import json
+import os
+
+import numpy
+
+from coopihc import Bundle, Recorder
+from coopihc.interactiontask.ExampleTask import ExampleTask
+
+record = [("task_state", "position"), ("task_state", "targets")]
+
+
+def test_record(tmp_path, pointing_bundle):
+    directory = str(tmp_path / "log")
+    bundle = pointing_bundle(
+        seed=4, recorder=Recorder(directory, paths=record, chunk_size=7)
+    )
+    trajectories = [bundle.rollout(60, record=record) for i in range(3)]
+    bundle.close()
+
+    log = Recorder.load(directory)
+    assert len(log) == sum(len(trajectory) for trajectory in trajectories)
+    assert isinstance(log["task_state/position"], numpy.memmap)
+    assert log["task_state/targets"].shape == (len(log), 8)
+    for path in record:
+        numpy.testing.assert_array_equal(
+            log[path],
+            numpy.concatenate([trajectory[path] for trajectory in trajectories]),
+        )
+    numpy.testing.assert_array_equal(
+        log.rewards["first_task_reward"],
+        numpy.concatenate(
+            [trajectory.rewards["first_task_reward"] for trajectory in trajectories]
+        ),
+    )
+
+
+def test_schema(tmp_path):
+    directory = str(tmp_path / "log")
+    bundle = Bundle(task=ExampleTask())
+    with Recorder(directory, rewards=False) as recorder:
+        bundle.recorder = recorder
+        bundle.reset()
+        for i in range(5):
+            # null actions, so that each step plays exactly one round
+            bundle.step(user_action=0, assistant_action=0)
+        # not flushed yet
+        assert len(Recorder.load(directory)) == 0
+    with open(os.path.join(directory, Recorder.schema_file)) as _file:
+        schema = json.load(_file)
+    assert schema["rounds"] == 5
+    assert schema["rewards"] == []
+    paths = [tuple(column["path"]) for column in schema["columns"]]
+    assert ("game_info", "round_index") in paths
+    assert ("task_state", "x") in paths
+    log = Recorder.load(directory)
+    numpy.testing.assert_array_equal(log["game_info/round_index"], [1, 2, 3, 4, 5])
+    numpy.testing.assert_array_equal(log["task_state/x"], numpy.zeros(5))
+
+
+def test_flush(tmp_path, pointing_bundle):
+    directory = str(tmp_path / "log")
+    recorder = Recorder(directory, paths=record, chunk_size=1000)
+    bundle = pointing_bundle(seed=4, recorder=recorder)
+    bundle.rollout(10)
+    recorder.flush()
+    assert len(Recorder.load(directory)) == 10
+    bundle.rollout(10)
+    recorder.close()
+    assert len(Recorder.load(directory)) == 20
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    from conftest import make_pointing_bundle
+
+    with tempfile.TemporaryDirectory() as directory:
+        test_record(pathlib.Path(directory) / "1", make_pointing_bundle)
+        test_schema(pathlib.Path(directory) / "2")
+        test_flush(pathlib.Path(directory) / "3", make_pointing_bundle)
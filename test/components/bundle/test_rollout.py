@@ -0,0 +1,60 @@
+import numpy
+
+from coopihc import Bundle, Trajectory
+
+
+def test_rollout(example_bundle):
+    bundle = example_bundle()
+    trajectory = bundle.rollout(10, record=[("task_state", "x")])
+    assert isinstance(trajectory, Trajectory)
+    # x goes up by one each round, and the game finishes when x = 4
+    assert len(trajectory) == 4
+    assert trajectory.is_done
+    numpy.testing.assert_array_equal(trajectory[("task_state", "x")], [1, 2, 3, 4])
+    numpy.testing.assert_array_equal(trajectory["task_state/x"], [1, 2, 3, 4])
+    numpy.testing.assert_array_equal(trajectory["user_action/action"], [1, 1, 1, 1])
+    assert ("assistant_action", "action") in trajectory
+    rewards = trajectory.rewards
+    assert set(rewards.keys()) == set(Bundle.reward_keys)
+    numpy.testing.assert_array_equal(rewards["first_task_reward"], [-1, -1, -1, -1])
+    # no assistant: the assistant's turns are skipped
+    numpy.testing.assert_array_equal(rewards["second_task_reward"], [0, 0, 0, 0])
+    numpy.testing.assert_array_equal(trajectory.total_rewards, [-1, -1, -1, -1])
+
+
+def test_rollout_max_rounds(example_bundle):
+    bundle = example_bundle(user_action=0)
+    trajectory = bundle.rollout(5, record=[("task_state", "x")])
+    assert len(trajectory) == 5
+    assert not trajectory.is_done
+    assert bundle.round_number == 5
+    # buffers are preallocated for max_rounds
+    assert trajectory._columns[("task_state", "x")].shape == (5,)
+    # rollout without reset continues the game
+    trajectory = bundle.rollout(3, reset=False)
+    assert len(trajectory) == 3
+    assert bundle.round_number == 8
+
+
+def test_rollout_matches_step(example_bundle):
+    bundle = example_bundle()
+    bundle.reset()
+    xs = []
+    while True:
+        game_state, rewards, is_done = bundle.step()
+        xs.append(int(game_state["task_state"]["x"]))
+        if is_done:
+            break
+    trajectory = bundle.rollout(10, record=[("task_state", "x")])
+    numpy.testing.assert_array_equal(trajectory["task_state/x"], xs)
+
+
+# +----------------------+
+# +        MAIN          +
+# +----------------------+
+if __name__ == "__main__":
+    from conftest import make_example_bundle
+
+    test_rollout(make_example_bundle)
+    test_rollout_max_rounds(make_example_bundle)
+    test_rollout_matches_step(make_example_bundle)
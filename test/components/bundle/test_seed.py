@@ -0,0 +1,52 @@
+import numpy
+
+record = [("task_state", "position"), ("task_state", "targets"), ("user_state", "goal")]
+
+
+def assert_same(trajectory, other):
+    assert len(trajectory) == len(other)
+    for path in trajectory.keys():
+        numpy.testing.assert_array_equal(trajectory[path], other[path])
+
+
+def test_same_seed(pointing_bundle):
+    trajectory = pointing_bundle(seed=3).rollout(60, record=record)
+    assert_same(trajectory, pointing_bundle(seed=3).rollout(60, record=record))
+    # seeding an existing bundle
+    bundle = pointing_bundle()
+    bundle.rollout(60, record=record)
+    bundle.seed(3)
+    assert_same(trajectory, bundle.rollout(60, record=record))
+
+
+def test_different_seeds(pointing_bundle):
+    targets = [
+        pointing_bundle(seed=seed).reset()["task_state"]["targets"].tolist()
+        for seed in range(5)
+    ]
+    assert len(set(tuple(t) for t in targets)) > 1
+
+
+def test_independent_components(pointing_bundle):
+    bundle = pointing_bundle(seed=3)
+    generators = [
+        bundle.task.rng,
+        bundle.user.rng,
+        bundle.user.policy.rng,
+        bundle.user.observation_engine.rng,
+        bundle.user.inference_engine.rng,
+        bundle.assistant.rng,
+    ]
+    draws = [rng.bit_generator.state["state"]["state"] for rng in generators]
+    assert len(set(draws)) == len(draws)
+
+
+# +----------------------+
+# +        MAIN          +
+# +----------------------+
+if __name__ == "__main__":
+    from conftest import make_pointing_bundle
+
+    test_same_seed(make_pointing_bundle)
+    test_different_seeds(make_pointing_bundle)
+    test_independent_components(make_pointing_bundle)
@@ -1,3 +1,4 @@
+import copy
 import numpy
 from coopihc.inference.GoalInferenceWithUserPolicyGiven import (
     GoalInferenceWithUserPolicyGiven,
@@ -77,6 +78,70 @@ def test_infer():
     )
 
 
+def compute_likelihood_batch(self, actions, observation, error_rate=ERROR_RATE):
+    position = observation["task_state"]["position"][..., numpy.newaxis]
+    return numpy.where(actions.reshape(-1) == -position, 1 - error_rate, error_rate)
+
+
+def test_infer_batch():
+    batch_policy = ELLDiscretePolicy(action_state=action_state)
+    batch_policy.attach_likelihood_function(compute_likelihood)
+    batch_policy.attach_likelihood_function_batch(compute_likelihood_batch)
+    inference_engine = GoalInferenceWithUserPolicyGiven(user_policy_model=user_policy)
+    inference_engine.attach_set_theta(set_theta)
+    batch_engine = GoalInferenceWithUserPolicyGiven(user_policy_model=batch_policy)
+    batch_engine.attach_set_theta(set_theta)
+
+    stacked = batch_engine.stacked_observation(observation)
+    assert stacked["task_state"]["position"].shape == (7,)
+    assert stacked["user_action"]["action"].shape == (1,)
+
+    for engine in [inference_engine, batch_engine]:
+        engine.buffer = [copy.deepcopy(observation)]
+    state, reward = inference_engine.infer()
+    batch_state, reward = batch_engine.infer()
+    assert numpy.allclose(batch_state["beliefs"], state["beliefs"])
+
+
+def test_infer_sparse():
+    calls = []
+
+    def counted_likelihood(self, action, observation):
+        calls.append(observation["task_state"]["position"].tolist())
+        return compute_likelihood(self, action, observation)
+
+    sparse_policy = ELLDiscretePolicy(action_state=action_state)
+    sparse_policy.attach_likelihood_function(counted_likelihood)
+    inference_engine = GoalInferenceWithUserPolicyGiven(
+        user_policy_model=sparse_policy, belief_threshold=0.1
+    )
+    inference_engine.attach_set_theta(set_theta)
+
+    prior = numpy.array([0.02, 0.03, 0.3, 0.4, 0.2, 0.02, 0.03])
+    sparse_observation = copy.deepcopy(observation)
+    sparse_observation["assistant_state"]["beliefs"][...] = prior
+    inference_engine.buffer = [sparse_observation]
+    state, reward = inference_engine.infer()
+    # only the active goals were evaluated
+    assert sorted(calls) == [-1, 0, 1]
+    # lumped goals are updated with a uniform likelihood over the 7 user actions
+    posterior = prior * numpy.array(
+        [1 / 7, 1 / 7, 1 - ERROR_RATE, ERROR_RATE, ERROR_RATE, 1 / 7, 1 / 7]
+    )
+    posterior /= posterior.sum()
+    assert numpy.allclose(state["beliefs"], posterior)
+
+    # top_k
+    inference_engine.belief_threshold = None
+    inference_engine.top_k = 1
+    assert inference_engine.active_goals(prior).tolist() == [3]
+    # dense
+    inference_engine.top_k = None
+    assert inference_engine.active_goals(prior) is None
+
+
 if __name__ == "__main__":
     test_init()
     test_infer()
+    test_infer_batch()
+    test_infer_sparse()
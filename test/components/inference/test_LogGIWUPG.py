@@ -0,0 +1,128 @@
+import numpy
+import pytest
+
+from coopihc.inference.GoalInferenceWithUserPolicyGiven import (
+    GoalInferenceWithUserPolicyGiven,
+)
+from coopihc.inference.LogGoalInferenceWithUserPolicyGiven import (
+    LogGoalInferenceWithUserPolicyGiven,
+)
+from coopihc.policy.ELLDiscretePolicy import ELLDiscretePolicy
+from coopihc.base.State import State
+from coopihc.base.elements import discrete_array_element, array_element
+
+ERROR_RATE = 0.05
+N = 50
+
+
+def compute_likelihood(self, action, observation, error_rate=ERROR_RATE):
+    position = observation["task_state"]["position"].tolist()
+    if action.squeeze().tolist() == -position:
+        return 1 - error_rate
+    return error_rate
+
+
+def compute_likelihood_batch(self, actions, observation, error_rate=ERROR_RATE):
+    position = observation["task_state"]["position"][..., numpy.newaxis]
+    return numpy.where(actions.reshape(-1) == -position, 1 - error_rate, error_rate)
+
+
+def make_engine(engine_class, batch):
+    action_state = State()
+    action_state["action"] = discrete_array_element(init=0, low=-N, high=N)
+    user_policy = ELLDiscretePolicy(action_state=action_state)
+    user_policy.attach_likelihood_function(compute_likelihood)
+    if batch:
+        user_policy.attach_likelihood_function_batch(compute_likelihood_batch)
+    engine = engine_class(user_policy_model=user_policy)
+    engine.attach_set_theta(
+        [
+            {("task_state", "position"): discrete_array_element(init=t, low=-N, high=N)}
+            for t in range(-N, N + 1)
+        ]
+    )
+    return engine
+
+
+def make_observation(chosen_action):
+    assistant_state = State()
+    assistant_state["beliefs"] = array_element(
+        init=numpy.full((2 * N + 1,), 1 / (2 * N + 1)),
+        low=numpy.zeros((2 * N + 1,)),
+        high=numpy.ones((2 * N + 1,)),
+        out_of_bounds_mode="error",
+    )
+    user_action = State()
+    user_action["action"] = discrete_array_element(init=chosen_action, low=-N, high=N)
+    return State(**{"assistant_state": assistant_state, "user_action": user_action})
+
+
+def infer(engine, observation, steps):
+    for i in range(steps):
+        engine.buffer = [observation]
+        observation["assistant_state"], reward = engine.infer()
+    return observation["assistant_state"]["beliefs"]
+
+
+def test_same_posterior():
+    reference = infer(
+        make_engine(GoalInferenceWithUserPolicyGiven, False), make_observation(3), 5
+    )
+    for batch in [False, True]:
+        engine = make_engine(LogGoalInferenceWithUserPolicyGiven, batch)
+        beliefs = infer(engine, make_observation(3), 5)
+        assert numpy.allclose(beliefs, reference)
+        assert numpy.allclose(numpy.exp(engine.log_beliefs), reference)
+
+
+def test_stable():
+    # beliefs of all goals but one underflow to 0
+    engine = make_engine(LogGoalInferenceWithUserPolicyGiven, True)
+    observation = make_observation(3)
+    beliefs = infer(engine, observation, 300)
+    assert beliefs[N - 3] == 1
+    assert (beliefs[numpy.arange(2 * N + 1) != N - 3] == 0).all()
+    # but are still tracked, and ranked
+    assert numpy.isfinite(engine.log_beliefs).all()
+
+    observation["user_action"]["action"] = 4
+    beliefs = infer(engine, observation, 600)
+    assert beliefs[N - 4] == 1
+    log_beliefs = engine.log_beliefs
+    others = numpy.delete(log_beliefs, [N - 4, N - 3])
+    assert log_beliefs[N - 4] > log_beliefs[N - 3] > others.max()
+    assert numpy.allclose(others, others[0])
+    assert numpy.isclose(
+        log_beliefs[N - 3] - others[0], 300 * numpy.log((1 - ERROR_RATE) / ERROR_RATE)
+    )
+
+
+def test_beliefs_written():
+    engine = make_engine(LogGoalInferenceWithUserPolicyGiven, True)
+    observation = make_observation(3)
+    infer(engine, observation, 300)
+    # e.g. agent reset: start again from the beliefs
+    observation["assistant_state"]["beliefs"][...] = 1 / (2 * N + 1)
+    beliefs = infer(engine, observation, 1)
+    reference = infer(
+        make_engine(GoalInferenceWithUserPolicyGiven, False), make_observation(3), 1
+    )
+    assert numpy.allclose(beliefs, reference)
+
+
+def test_impossible():
+    engine = make_engine(LogGoalInferenceWithUserPolicyGiven, True)
+    engine.user_policy_model.attach_likelihood_function_batch(
+        lambda self, actions, observation: numpy.zeros((2 * N + 1, 1))
+    )
+    observation = make_observation(3)
+    with pytest.warns(RuntimeWarning):
+        beliefs = infer(engine, observation, 1)
+    assert numpy.allclose(beliefs, 1 / (2 * N + 1))
+
+
+if __name__ == "__main__":
+    test_same_posterior()
+    test_stable()
+    test_beliefs_written()
+    test_impossible()
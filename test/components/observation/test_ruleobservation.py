@@ -2,7 +2,9 @@
 coopihc package."""
 
 from coopihc.observation.RuleObservationEngine import RuleObservationEngine
-from coopihc.base.elements import example_game_state
+from coopihc.base.elements import example_game_state, array_element
+from coopihc.base.State import State
+import numpy
 import random
 import pytest
 
@@ -475,6 +477,194 @@ def test_observe():
     assert _example_state.equals(obs, mode="hard")
 
 
+def test_incremental():
+    gamestate = example_game_state()
+    obs_eng = RuleObservationEngine(incremental=True)
+    obs, reward = obs_eng.observe(game_state=gamestate)
+    assert obs["task_state"]["position"] == gamestate["task_state"]["position"]
+    # the engine owns its StateElements
+    assert obs["task_state"]["position"] is not gamestate["task_state"]["position"]
+    targets = obs["task_state"]["targets"]
+
+    gamestate["task_state"]["position"] = 3
+    new_obs, reward = obs_eng.observe(game_state=gamestate)
+    assert new_obs is obs
+    assert new_obs["task_state"]["position"] == 3
+    assert new_obs["task_state"]["targets"] is targets
+
+    gamestate["task_state"]["position"] += 1
+    new_obs, reward = obs_eng.observe(game_state=gamestate)
+    assert new_obs["task_state"]["position"] == 4
+
+    gamestate["task_state"]["position"][...] = 2
+    new_obs, reward = obs_eng.observe(game_state=gamestate)
+    assert new_obs["task_state"]["position"] == 2
+
+    # non incremental engine gives the same observation
+    ref_obs, reward = RuleObservationEngine().observe(game_state=gamestate)
+    assert ref_obs == new_obs
+
+
+def test_incremental_invalidate():
+    gamestate = example_game_state()
+    obs_eng = RuleObservationEngine(incremental=True)
+    obs, reward = obs_eng.observe(game_state=gamestate)
+    # bypasses the StateElement, not tracked
+    numpy.copyto(gamestate["task_state"]["position"].view(numpy.ndarray), 3)
+    obs_eng.invalidate()
+    new_obs, reward = obs_eng.observe(game_state=gamestate)
+    assert new_obs is not obs
+    assert new_obs["task_state"]["position"] == 3
+
+
+def test_incremental_views():
+    gamestate = example_game_state()
+    gamestate["task_state"]["x"] = array_element(
+        init=numpy.zeros((3,)), low=-10, high=10
+    )
+    obs_eng = RuleObservationEngine(incremental=True)
+    obs, reward = obs_eng.observe(game_state=gamestate)
+    x = gamestate["task_state"]["x"]
+
+    # write through a sub-view
+    x[0:2][...] = 5
+    obs, reward = obs_eng.observe(game_state=gamestate)
+    assert obs["task_state"]["x"].tolist() == [5, 5, 0]
+
+    # in-place operator on the element
+    x += 1
+    obs, reward = obs_eng.observe(game_state=gamestate)
+    assert obs["task_state"]["x"].tolist() == [6, 6, 1]
+
+
+def test_incremental_buffer_depth():
+    from coopihc.agents.BaseAgent import BaseAgent
+    from coopihc.inference.BaseInferenceEngine import BaseInferenceEngine
+
+    obs_eng = RuleObservationEngine(incremental=True)
+    BaseAgent(
+        "user",
+        agent_observation_engine=obs_eng,
+        agent_inference_engine=BaseInferenceEngine(buffer_depth=2),
+    )
+    gamestate = example_game_state()
+    with pytest.warns(UserWarning):
+        obs, reward = obs_eng.observe(game_state=gamestate)
+    assert not obs_eng.incremental
+    new_obs, reward = obs_eng.observe(game_state=gamestate)
+    assert new_obs is not obs
+
+
+def test_compiled_rules():
+    from coopihc.observation.utils import LinearRule, GaussianNoiseRule
+
+    C = numpy.array([[2, 0], [1, 1]])
+    linear_rule = LinearRule(C)
+    mapping = [
+        ("task_state", "targets", slice(0, 2, 1), linear_rule, (), None, None),
+        ("user_state", "goal", slice(0, 1, 1), None, None, None, None),
+    ]
+    obs_eng = RuleObservationEngine(mapping=mapping)
+    plan, noise_dim = obs_eng.compile_mapping()
+    assert noise_dim == 0
+    assert plan[0][3] is linear_rule.C
+    gamestate = example_game_state()
+    obs, reward = obs_eng.observe(game_state=gamestate)
+    targets = gamestate["task_state"]["targets"]
+    assert (obs["task_state"]["targets"] == C @ targets).all()
+    assert obs["task_state"]["targets"].space == targets.space
+    # same result as the uncompiled rule
+    assert (linear_rule(targets, gamestate) == obs["task_state"]["targets"]).all()
+
+    # one draw for all noise rules
+    noise_rule = GaussianNoiseRule(numpy.eye(2), sigma=numpy.diag([1, 4]))
+    mapping = [
+        ("task_state", "targets", slice(0, 2, 1), None, None, noise_rule, ()),
+        (
+            "task_state",
+            "position",
+            slice(0, 1, 1),
+            None,
+            None,
+            GaussianNoiseRule(1),
+            (),
+        ),
+    ]
+    obs_eng = RuleObservationEngine(mapping=mapping)
+    assert obs_eng.compile_mapping()[1] == 3
+    samples = numpy.array(
+        [
+            obs_eng.observe(game_state=gamestate)[0]["task_state"]["targets"] - targets
+            for i in range(2000)
+        ]
+    )
+    assert numpy.allclose(samples.std(axis=0), [1, 2], rtol=0.1)
+
+    # mapping replaced: recompiled
+    obs_eng.mapping = mapping[:1]
+    assert obs_eng.compile_mapping()[1] == 2
+
+
+def test_compiled_rules_batch():
+    from coopihc.observation.utils import LinearRule, GaussianNoiseRule
+
+    n = 1000
+    game_state = State()
+    game_state["task_state"] = State()
+    game_state["task_state"]["x"] = numpy.ones((n, 2, 1))
+    game_state["task_state"]["y"] = numpy.ones((n, 2))
+    C = numpy.array([[1, 1], [0, 1]])
+    mapping = [
+        ("task_state", "x", slice(0, 2, 1), LinearRule(C), (), None, None),
+        (
+            "task_state",
+            "y",
+            slice(0, 2, 1),
+            LinearRule(C),
+            (),
+            GaussianNoiseRule(numpy.eye(2)),
+            (),
+        ),
+    ]
+    obs_eng = RuleObservationEngine(mapping=mapping)
+    obs = obs_eng.apply_mapping_batch(game_state)
+    assert obs["task_state"]["x"].shape == (n, 2, 1)
+    assert (obs["task_state"]["x"][:, :, 0] == [2, 1]).all()
+    y = obs["task_state"]["y"]
+    assert y.shape == (n, 2)
+    assert numpy.allclose(y.mean(axis=0), [2, 1], atol=0.2)
+    assert numpy.allclose(y.std(axis=0), [1, 1], rtol=0.1)
+
+
+def test_incremental_seed():
+    from coopihc.observation.utils import GaussianNoiseRule
+
+    mapping = [
+        (
+            "task_state",
+            "position",
+            slice(0, 1, 1),
+            None,
+            None,
+            GaussianNoiseRule(1),
+            (),
+        ),
+    ]
+    observations = []
+    for run in range(2):
+        obs_eng = RuleObservationEngine(mapping=mapping, incremental=True, seed=0)
+        gamestate = example_game_state()
+        values = []
+        for i in range(5):
+            gamestate["task_state"]["position"] = i
+            obs, reward = obs_eng.observe(game_state=gamestate)
+            values.append(float(obs["task_state"]["position"]))
+        observations.append(values)
+    assert observations[0] == observations[1]
+    # noisy
+    assert observations[0] != list(range(5))
+
+
 # +----------------------+
 # +        MAIN          +
 # +----------------------+
@@ -484,3 +674,10 @@ if __name__ == "__main__":
     test_apply_mapping()
     test_preimplemented_rules()
     test_observe()
+    test_incremental()
+    test_incremental_invalidate()
+    test_incremental_views()
+    test_incremental_buffer_depth()
+    test_compiled_rules()
+    test_compiled_rules_batch()
+    test_incremental_seed()
@@ -0,0 +1,91 @@
+import numpy
+
+from coopihc import Bundle
+from coopihc.examples.simplepointing.envs import SimplePointingTask
+from coopihc.examples.simplepointing.users import CarefulPointer
+from coopihc.examples.simplepointing.assistants import BIGGain
+from coopihc.policy.BIGDiscretePolicy import BIGDiscretePolicy
+
+
+def make_policy():
+    bundle = Bundle(
+        task=SimplePointingTask(gridsize=31, number_of_targets=8, mode="position"),
+        user=CarefulPointer(error_rate=0.05),
+        assistant=BIGGain(),
+        seed=0,
+    )
+    bundle.reset(go_to=3)
+    # beliefs which are not uniform
+    beliefs = numpy.arange(1, 9) / 36
+    bundle.assistant.state["beliefs"][...] = beliefs
+    return bundle.assistant.policy
+
+
+def test_information_gains():
+    P = numpy.array([[[0.5, 0.5], [0.5, 0.5]], [[1, 0], [0, 1]]])
+    beliefs = numpy.array([0.5, 0.5])
+    # uninformative, and one bit of information
+    assert numpy.allclose(BIGDiscretePolicy.information_gains(P, beliefs), [0, 1])
+
+
+def test_tensorized():
+    policy = make_policy()
+    policy.tensorized = False
+    actions, IG = policy.find_best_action()
+    assert IG == sorted(IG, reverse=True)
+
+    policy.tensorized = True
+    policy.transition_function_batch = None
+    tensor_actions, tensor_IG = policy.find_best_action()
+    assert numpy.allclose(tensor_IG, IG)
+    assert [int(a) for a in tensor_actions] == [int(a) for a in actions]
+
+
+def test_tensorized_batch():
+    policy = make_policy()
+    # CarefulPointer's batched likelihood
+    assert policy.likelihood_function_batch is not None
+    likelihood_function_batch = policy.likelihood_function_batch
+    policy.likelihood_function_batch = None
+    observation = policy.observation
+    P = policy.likelihood_tensor(observation)
+    actions, IG = policy.find_best_action()
+
+    policy.attach_likelihood_function_batch(likelihood_function_batch)
+    stacked = policy.stacked_observation(observation)
+    assert stacked["task_state"]["position"].shape == (31, 1)
+    assert stacked["user_state"]["goal"].shape == (1, 8)
+    assert stacked["task_state"]["targets"].shape == (1, 1, 8)
+    numpy.testing.assert_array_equal(policy.likelihood_tensor(observation), P)
+    batch_actions, batch_IG = policy.find_best_action()
+    assert numpy.allclose(batch_IG, IG)
+    assert [int(a) for a in batch_actions] == [int(a) for a in actions]
+
+
+def test_sparse():
+    policy = make_policy()
+    beliefs = policy.host.state["beliefs"].view(numpy.ndarray).reshape(-1)
+    P = policy.likelihood_tensor(policy.observation)
+    actions, IG = policy.find_best_action()
+
+    # all goals active, and an empty lump
+    policy.top_k = 8
+    sparse_actions, sparse_IG = policy.find_best_action()
+    assert numpy.allclose(sparse_IG, IG)
+
+    # the 3 most likely goals are active, the others are lumped
+    policy.top_k = 3
+    sparse_actions, sparse_IG = policy.find_best_action()
+    lumped_P = P.copy()
+    lumped_P[:, :5, :] = 1 / P.shape[2]
+    lumped_IG = policy.information_gains(lumped_P, beliefs)
+    order = numpy.argsort(lumped_IG, kind="stable")[::-1]
+    assert numpy.allclose(sparse_IG, lumped_IG[order])
+    assert [int(a) for a in sparse_actions] == order.tolist()
+
+
+if __name__ == "__main__":
+    test_information_gains()
+    test_tensorized()
+    test_tensorized_batch()
+    test_sparse()
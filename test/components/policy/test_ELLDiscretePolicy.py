@@ -101,8 +101,98 @@ def test_sample():
     assert numpy.linalg.norm((empirical_probs - llh)) < 0.01
 
 
+def test_memoize_likelihood():
+    calls = []
+
+    def likelihood_model(self, action, observation):
+        calls.append(action)
+        if action == observation["task_state"]["x"]:
+            return 1
+        return 0
+
+    action_state = State(**{"action": cat_element(N=3)})
+    memoized_policy = ELLDiscretePolicy(action_state, seed=1)
+    memoized_policy.attach_likelihood_function(likelihood_model)
+    memoized_policy.memoize_likelihood([("task_state", "x")], maxsize=2)
+    observation = State()
+    observation["task_state"] = State()
+    observation["task_state"]["x"] = discrete_array_element(init=1, low=0, high=2)
+    observation["task_state"]["y"] = discrete_array_element(init=0, low=0, high=2)
+
+    actions, llh = memoized_policy.forward_summary(observation)
+    assert llh == [0, 1, 0]
+    assert len(calls) == 3
+    # not a dependency of the likelihood
+    observation["task_state"]["y"] = 2
+    assert memoized_policy.forward_summary(observation)[1] == [0, 1, 0]
+    assert memoized_policy.compute_likelihood(actions[1], observation) == 1
+    assert len(calls) == 3
+    # the action set is computed once
+    assert memoized_policy.forward_summary(observation)[0] is actions
+
+    observation["task_state"]["x"] = 2
+    assert memoized_policy.compute_likelihood(actions[2], observation) == 1
+    assert len(calls) == 4
+    action, reward = memoized_policy.sample(
+        agent_observation=observation, agent_state={}
+    )
+    assert action == 2
+
+    # least recently used entries are dropped
+    observation["task_state"]["x"] = 0
+    memoized_policy.forward_summary(observation)
+    assert len(memoized_policy._likelihood_cache) == 2
+    assert len(memoized_policy._summary_cache) == 2
+
+    # a new likelihood model is memoized, with an empty cache
+    memoized_policy.attach_likelihood_function(likelihood_model)
+    assert memoized_policy.compute_likelihood(actions[0], observation) == 1
+    assert len(memoized_policy._likelihood_cache) == 1
+
+
+def compute_likelihood_batch(self, actions, observation):
+    probabilities = numpy.array(
+        [
+            1 / 7,
+            1 / 7 + 0.05,
+            1 / 7 - 0.05,
+            1 / 7 + 0.1,
+            1 / 7 - 0.1,
+            1 / 7 + 0.075,
+            1 / 7 - 0.075,
+        ]
+    )
+    # observations have a batch axis
+    batch_shape = observation["task_state"]["x"].shape
+    return numpy.broadcast_to(
+        probabilities[actions.reshape(-1)], batch_shape + (actions.shape[0],)
+    )
+
+
+def test_likelihood_batch():
+    action_state = State(**{"action": cat_element(N=7)})
+    batch_policy = ELLDiscretePolicy(action_state, seed=3)
+    batch_policy.attach_likelihood_function(compute_likelihood)
+    batch_policy.attach_likelihood_function_batch(compute_likelihood_batch)
+    observation = State()
+    observation["task_state"] = State()
+    observation["task_state"]["x"] = discrete_array_element(init=0, low=0, high=2)
+    actions, llh = batch_policy.forward_summary(observation)
+    assert numpy.allclose(llh, [compute_likelihood(None, a, None) for a in actions])
+
+    # all games are sampled at once
+    n = 100000
+    batched_observation = {"task_state": {"x": numpy.zeros((n,), dtype=numpy.int64)}}
+    sampled, reward = batch_policy.sample_batch(batched_observation, {}, n=n)
+    assert sampled.shape == (n, 1)
+    empirical_probs = numpy.bincount(sampled.reshape(-1), minlength=7) / n
+    assert numpy.linalg.norm(empirical_probs - numpy.array(llh)) < 0.01
+
+
 if __name__ == "__main__":
     test_init()
     test_attach_likelihood_function()
     test_forward_summary()
     test_sample()
+    test_memoize_likelihood()
+    test_likelihood_batch()